@@ -0,0 +1,72 @@
+"""
+Document classification throughput (extractor/classifier.py), optionally
+against classify_doc at another git ref.
+
+Documents: the corpus.py texts, the text of each recorded OCR fixture and
+the sample company profile grown to --copies director/shareholder blocks
+(classification reads a bounded prefix, so its cost should not grow with
+it). Reports per-document latency, then docs/s and MB/s over the whole set,
+and lists any document the baseline classifies differently.
+
+Usage:
+    python scripts/benchmarks/classifier.py [--baseline HEAD~1] [--copies 20] [--repeat 200]
+"""
+from __future__ import annotations
+import argparse
+import importlib
+
+from common import timeit, report, load_extractor_at
+
+import corpus
+from extractor.classifier import rank_doc_types
+from extractor.rules_base import classify_doc
+
+
+def documents(copies: int) -> dict[str, str]:
+    docs = dict(corpus.documents())
+    for fixture in corpus.ocr_fixtures():
+        docs[fixture["file"]] = corpus.fixture_text(fixture)
+    docs[f"CORPORATE_INFO x{copies}"] = corpus.large_corporate_info_text(copies)
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="git ref to compare against (e.g. HEAD~1)")
+    parser.add_argument("--copies", type=int, default=20, help="Director/shareholder blocks in the large profile")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = documents(args.copies)
+    old_classify = None
+    if args.baseline:
+        pkg = load_extractor_at(args.baseline)
+        old_classify = importlib.import_module(f"{pkg.__name__}.rules_base").classify_doc
+
+    mismatches = []
+    for name, text in docs.items():
+        ranked = rank_doc_types(text)
+        top = ", ".join(f"{r['docType']} {r['confidence']:.2f}" for r in ranked[:2]) or "UNKNOWN"
+        base_stats = None
+        if old_classify:
+            if old_classify(text) != classify_doc(text):
+                mismatches.append(f"{name} ({old_classify(text)} -> {classify_doc(text)})")
+            base_stats = timeit(lambda: old_classify(text), repeat=args.repeat)
+            report(f"{name[:20]} @{args.baseline}", base_stats)
+        stats = timeit(lambda: rank_doc_types(text), repeat=args.repeat)
+        report(f"{name[:28]}", stats, base_stats)
+        print(f"{'':<28} {len(text):>8} chars  {top}")
+
+    total_chars = sum(len(text) for text in docs.values())
+    run_all = lambda fn: (lambda: [fn(text) for text in docs.values()])
+    for label, fn in ([(f"@{args.baseline}", old_classify)] if old_classify else []) + [("current", rank_doc_types)]:
+        seconds = timeit(run_all(fn), repeat=args.repeat)["p50_ms"] / 1000
+        print(f"all {len(docs)} docs {label:<14} {len(docs) / seconds:>10.0f} docs/s  "
+              f"{total_chars / seconds / 1e6:>8.1f} MB/s")
+
+    if mismatches:
+        print(f"Classified differently at {args.baseline}: {'; '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Shared helpers for the scripts/benchmarks/* micro-benchmarks.
+"""
+from __future__ import annotations
+import os
+import statistics
+import sys
+import time
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+SAMPLE_DIR = os.path.join(REPO_ROOT, "sample", "SSM Cert")
+SAMPLE_PDF = os.path.join(SAMPLE_DIR, "1144519-K_CP_19112025_EN.pdf")
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+
+def timeit(fn, repeat: int = 5, warmup: int = 1) -> dict:
+    """Runs fn() warmup + repeat times; returns wall-clock stats in ms."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 2),
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "max_ms": round(samples[-1], 2),
+        "total_ms": round(sum(samples), 2),
+    }
+
+
+def percentile(sorted_samples: list[float], p: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    rank = (len(sorted_samples) - 1) * p / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(sorted_samples) - 1)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (rank - lo)
+
+
+def report(name: str, stats: dict, baseline: dict | None = None):
+    line = f"{name:<28} p50 {stats['p50_ms']:>9.2f}ms  min {stats['min_ms']:>9.2f}ms"
+    if baseline:
+        line += f"  x{baseline['p50_ms'] / stats['p50_ms']:.2f}"
+    print(line)
+
+
+def load_extractor_at(ref: str, name: str = "extractor_baseline"):
+    """
+    Imports scripts/extractor as it was at git `ref` under package `name`,
+    for before/after comparisons. Returns the package module.
+    """
+    import importlib
+    import subprocess
+    import tempfile
+
+    files = subprocess.run(["git", "ls-tree", "--name-only", ref, "scripts/extractor/"], cwd=REPO_ROOT,
+                           capture_output=True, text=True, check=True).stdout.split()
+    root = tempfile.mkdtemp(prefix="bench-")
+    pkg_dir = os.path.join(root, name)
+    os.makedirs(pkg_dir)
+    for path in files:
+        if path.endswith((".py", ".json")):
+            source = subprocess.run(["git", "show", f"{ref}:{path}"], cwd=REPO_ROOT,
+                                    capture_output=True, check=True).stdout
+            with open(os.path.join(pkg_dir, os.path.basename(path)), "wb") as f:
+                f.write(source)
+    sys.path.insert(0, root)
+    return importlib.import_module(name)
+
+
+def load_function_at(ref: str, path: str, func_name: str, namespace: dict | None = None):
+    """Returns `func_name` as defined in `path` at git `ref` (module-level def, exec'd standalone)."""
+    import ast
+    import subprocess
+
+    source = subprocess.run(["git", "show", f"{ref}:{path}"], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.FunctionDef) and node.name == func_name:
+            scope = dict(namespace or {})
+            exec(compile(ast.Module(body=[node], type_ignores=[]), path, "exec"), scope)
+            return scope[func_name]
+    raise LookupError(f"{func_name} not found in {path}@{ref}")
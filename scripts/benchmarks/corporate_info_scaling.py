@@ -0,0 +1,49 @@
+"""
+Company profile extraction time as the director and shareholder sections
+grow (the sample's pages repeated 1..N times), optionally against the
+extractor at another git ref. Time per KB should stay flat.
+
+Usage:
+    python scripts/benchmarks/corporate_info_scaling.py [--baseline REF] [--max-copies 32] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import importlib
+
+from common import timeit, report, load_extractor_at
+
+import corpus
+from extractor.corporate_info import extract_corporate_info
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="git ref to compare against (e.g. HEAD~1)")
+    parser.add_argument("--max-copies", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        pkg = load_extractor_at(args.baseline)
+        baseline = importlib.import_module(f"{pkg.__name__}.corporate_info").extract_corporate_info
+
+    copies = 1
+    while copies <= args.max_copies:
+        text = corpus.large_corporate_info_text(copies)
+        result = extract_corporate_info(text)
+        label = f"x{copies} ({len(text) // 1024} KB, {len(result['directors'])} dir, {len(result['shareholders'])} sh)"
+        base_stats = None
+        if baseline:
+            if baseline(text) != result:
+                print(f"{label}: output differs from {args.baseline}")
+            base_stats = timeit(lambda: baseline(text), repeat=args.repeat, warmup=0)
+            report(f"{label} @{args.baseline}", base_stats)
+        stats = timeit(lambda: extract_corporate_info(text), repeat=args.repeat, warmup=0)
+        report(label, stats, base_stats)
+        print(f"{'':28} {stats['p50_ms'] / (len(text) / 1024):.3f} ms/KB")
+        copies *= 2
+
+
+if __name__ == "__main__":
+    main()
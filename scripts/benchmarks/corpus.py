@@ -0,0 +1,122 @@
+"""
+Benchmark documents: one OCR-style text per supported doc type.
+
+Form 9 / Form D / LLP are representative remote-OCR line lists; the company
+profile is the native text of the sample PDF. ocr_fixtures() adds the
+recorded remote /ocr responses for the sample certificate images
+(tests/fixtures/ocr).
+"""
+from __future__ import annotations
+import os
+from functools import lru_cache
+
+from common import REPO_ROOT, SAMPLE_PDF
+
+FIXTURE_DIR = os.path.join(REPO_ROOT, "tests", "fixtures", "ocr")
+
+FORM_9_LINES = [
+    "COMPANIES ACT 2016 (ACT 777)",
+    "CERTIFICATE OF INCORPORATION OF PRIVATE COMPANY",
+    "This is to certify that",
+    "ANALOGDATA SDNBHD",
+    "190933432134 (1234567-H)",
+    "is, on and from the 7th day of June 2007, incorporated under the Companies Act 1965,",
+    "and that the company is a company limited by shares and that the company is 2 private company.",
+    "Dated at KE this 7* day of June 2007.",
+    "DATUK NOR ABDUL AZIZ",
+    "REGISTRAR OF COMPANIES MALAYSLA",
+    "SURUHANJAYA SYARIKAT MALAYSIA COMMISSIONOFMALAYSLA",
+]
+
+FORM_D_LINES = [
+    "FORM D (RULE 13)",
+    "CERTIFICATE OF REGISTRATION",
+    "THE REGISTRATION OF BUSINESSES ACT 1956 (ACT 197)",
+    "This is to certify that",
+    "the business carried on under the name",
+    "KEDAI RUNCIT TERUSMAJU",
+    "REGISTRATION NO : 202003000123 (JM0912345-M)",
+    "has this day been registered with the principal place ofbusiness at",
+    "NO 12 JALAN 3TMN SKUDAITAMAN",
+    "81300 SKUDAI JOHORBAHRU",
+    "and branch at 15 &amp; 17, JALAN CYBER 16",
+    "registered until 11 March 2027",
+    "Dated at KUALALUMPUR this 02 MARCH 2017",
+    "COA DATUK NOR AZIMAH ABDUL AZIZ",
+    "REGISTRAR OF BUSINESSES",
+]
+
+LLP_LINES = [
+    "LIMITED LIABILITY PARTNERSHIPS ACT 2012 (ACT 743)",
+    "CERTIFICATE OF REGISTRATION OF",
+    "LIMITED LIABILITY PARTNERSHIP",
+    "This is to certify that",
+    "MAJU JAYA PLT 202204000123 (LLP0031234-LGN)",
+    "was registered on the 11th day of January 2022",
+    "Dated at KUALA LUMPUR this 19th day of September 2022",
+    "DATUK NOR AZIMAH ABDUL AZIZ",
+    "Registrar of Limited Liability Partnerships",
+    "MALAYSIA",
+]
+
+
+@lru_cache(maxsize=None)
+def corporate_info_text() -> str:
+    import pdf_text
+    return pdf_text.join_pages(pdf_text.extract_pages(SAMPLE_PDF, workers=1, backend="pdfplumber"))
+
+
+def _line_start(text: str, needle: str) -> int:
+    return text.rfind("\n", 0, text.index(needle)) + 1
+
+
+@lru_cache(maxsize=None)
+def large_corporate_info_text(copies: int) -> str:
+    """
+    The sample profile with its director pages and shareholder rows repeated
+    `copies` times, for groups with dozens of officers and members.
+    """
+    text = corporate_info_text()
+    dir_start = _line_start(text, "CHONG SIW CHIN")
+    holders_start = _line_start(text, "SHAREHOLDERS/MEMBERS")
+    rows_start = _line_start(text, "710615-08-5992      CHONG SIW CHIN")
+    charges_start = _line_start(text, "COMPANY CHARGES")
+    return (text[:dir_start] + text[dir_start:holders_start] * copies
+            + text[holders_start:rows_start] + text[rows_start:charges_start] * copies
+            + text[charges_start:])
+
+
+def documents() -> dict[str, str]:
+    """doc type -> full text, as passed to the extractors."""
+    return {
+        "FORM_9": "\n".join(FORM_9_LINES),
+        "FORM_D": "\n".join(FORM_D_LINES),
+        "LLP_CERT": "\n".join(LLP_LINES),
+        "CORPORATE_INFO": corporate_info_text(),
+    }
+
+
+def ocr_lines() -> list[str]:
+    """Every line from the OCR-style documents, as seen by clean_merged_text."""
+    return FORM_9_LINES + FORM_D_LINES + LLP_LINES
+
+
+@lru_cache(maxsize=None)
+def _load_fixtures() -> tuple:
+    from ocr_fixtures import load_fixtures
+    return tuple(load_fixtures(FIXTURE_DIR).values())
+
+
+def ocr_fixtures() -> list[dict]:
+    """
+    Recorded OCR fixtures for the sample images (format in ocr_fixtures.py);
+    these all carry an "expected" block.
+    """
+    return list(_load_fixtures())
+
+
+def fixture_text(fixture: dict) -> str:
+    """The OCR text process_document builds from a fixture's response."""
+    from ocr_service import parse_remote_response, no_trace
+    lines, _, _ = parse_remote_response(fixture["response"], no_trace)
+    return "\n".join(line["text"] for line in lines)
@@ -0,0 +1,55 @@
+"""
+Early-exit page scanning (OCR_EARLY_EXIT) on an uploaded-bundle shaped PDF.
+
+Builds a bundle by appending `--copies` extra copies of the sample company
+profile, then compares reading the whole file against stopping at the first
+"END OF REPORT". The early-exit text must equal the single report's text.
+
+Usage:
+    python scripts/benchmarks/early_exit.py [--copies 3] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+
+from common import SAMPLE_PDF, timeit, report
+
+import pdf_text
+
+
+def build_bundle(source: str, copies: int, out_path: str):
+    import pypdfium2 as pdfium
+    src = pdfium.PdfDocument(source)
+    bundle = pdfium.PdfDocument.new()
+    for _ in range(copies + 1):
+        bundle.import_pages(src)
+    bundle.save(out_path)
+    bundle.close()
+    src.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--copies", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle = os.path.join(tmp, "bundle.pdf")
+        build_bundle(SAMPLE_PDF, args.copies, bundle)
+
+        expected = pdf_text.extract_text(SAMPLE_PDF, early_exit=False)[0]
+        pages, backend, n_pages = pdf_text.extract_text(bundle, early_exit=True)
+        assert pages == expected, "early exit text differs from the single report"
+        print(f"bundle: {n_pages} pages, early exit keeps {len(pages)} ({backend})")
+
+        for name in ("auto", "pdfium"):
+            full = timeit(lambda: pdf_text.extract_text(bundle, backend=name, early_exit=False), repeat=args.repeat)
+            early = timeit(lambda: pdf_text.extract_text(bundle, backend=name, early_exit=True), repeat=args.repeat)
+            report(f"{name} full", full)
+            report(f"{name} early exit", early, full)
+
+
+if __name__ == "__main__":
+    main()
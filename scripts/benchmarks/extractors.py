@@ -0,0 +1,96 @@
+"""
+Per-document extraction time for each doc type, optionally against the
+extractor package at another git ref.
+
+--purge clears re's module-level pattern cache before every document, which
+is what a busy worker running other regex-heavy code sees; precompiled
+patterns are unaffected by it, inline re.search() calls recompile.
+
+Usage:
+    python scripts/benchmarks/extractors.py [--baseline REF] [--purge] [--repeat 20]
+"""
+from __future__ import annotations
+import argparse
+import re
+
+from common import timeit, report, load_extractor_at, load_function_at
+
+import corpus
+from extractor.form_9 import extract_form_9
+from extractor.form_d import extract_form_d
+from extractor.llp import extract_llp
+from extractor.corporate_info import extract_corporate_info
+import ocr_service
+from ocr_service import clean_merged_text
+
+EXTRACTORS = {
+    "FORM_9": ("form_9", "extract_form_9"),
+    "FORM_D": ("form_d", "extract_form_d"),
+    "LLP_CERT": ("llp", "extract_llp"),
+    "CORPORATE_INFO": ("corporate_info", "extract_corporate_info"),
+}
+
+CURRENT = {
+    "FORM_9": extract_form_9,
+    "FORM_D": extract_form_d,
+    "LLP_CERT": extract_llp,
+    "CORPORATE_INFO": extract_corporate_info,
+}
+
+
+def _baseline_extractors(ref: str) -> dict:
+    import importlib
+    pkg = load_extractor_at(ref)
+    return {
+        doc_type: getattr(importlib.import_module(f"{pkg.__name__}.{module}"), func)
+        for doc_type, (module, func) in EXTRACTORS.items()
+    }
+
+
+def _runner(fn, arg, purge: bool):
+    if purge:
+        return lambda: (re.purge(), fn(arg))
+    return lambda: fn(arg)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", help="git ref to compare against (e.g. HEAD~1)")
+    parser.add_argument("--purge", action="store_true", help="re.purge() before every document")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    docs = corpus.documents()
+    baseline = _baseline_extractors(args.baseline) if args.baseline else {}
+    old_clean = load_function_at(args.baseline, "scripts/ocr_service.py", "clean_merged_text",
+                                 {**vars(ocr_service), "re": re}) \
+        if args.baseline else None
+
+    mismatches = []
+    for doc_type, text in docs.items():
+        new = CURRENT[doc_type](text)
+        base_stats = None
+        if doc_type in baseline:
+            if baseline[doc_type](text) != new:
+                mismatches.append(doc_type)
+            base_stats = timeit(_runner(baseline[doc_type], text, args.purge), repeat=args.repeat)
+            report(f"{doc_type} @{args.baseline}", base_stats)
+        report(f"{doc_type}", timeit(_runner(CURRENT[doc_type], text, args.purge), repeat=args.repeat), base_stats)
+
+    lines = corpus.ocr_lines()
+    run_all = lambda fn: (lambda: [fn(line) for line in lines])
+    base_stats = None
+    if old_clean:
+        changed = sum(old_clean(line) != clean_merged_text(line) for line in lines)
+        if changed:
+            mismatches.append(f"clean_merged_text ({changed} of {len(lines)} lines)")
+        base_stats = timeit(run_all(old_clean), repeat=args.repeat)
+        report(f"clean_merged_text @{args.baseline}", base_stats)
+    report(f"clean_merged_text x{len(lines)}", timeit(run_all(clean_merged_text), repeat=args.repeat), base_stats)
+
+    if mismatches:
+        print(f"Output differs from {args.baseline}: {', '.join(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+In-memory documents (ocr_input.py) against staging uploads in a temp file.
+
+For each sample, process_document on:
+  temp file - the upload written to a private temp file, processed by path
+              and removed (what ocr_pool._run_bytes used to do)
+  bytes     - the upload handed over as bytes, never written to disk
+with the cache off and remote OCR replayed from the recorded fixtures, plus
+the size of what each one writes to disk per document.
+
+Usage:
+    python scripts/benchmarks/in_memory.py [--repeat 10]
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+
+from common import SAMPLE_DIR, timeit, report
+
+import corpus
+
+STUB_URL = "http://ocr-in-memory.local"
+
+
+def _stub():
+    import httpx
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app
+    app = create_app(fixtures={f["sha256"]: f for f in corpus.ocr_fixtures()})
+    register_client(RemoteOcrClient(STUB_URL, transport=httpx.ASGITransport(app=app), max_retries=0))
+
+
+def via_temp_file(process_document, data: bytes, filename: str) -> dict:
+    fd, path = tempfile.mkstemp(prefix="ocr_upload_", suffix=os.path.splitext(filename)[1])
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return process_document(path, trace=False)
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.update(OCR_CACHE="off", HF_API_URL=STUB_URL)
+    from ocr_service import process_document
+    _stub()
+
+    for name in sorted(os.listdir(SAMPLE_DIR)):
+        with open(os.path.join(SAMPLE_DIR, name), "rb") as f:
+            data = f.read()
+        staged = timeit(lambda: via_temp_file(process_document, data, name), repeat=args.repeat)
+        in_memory = timeit(lambda: process_document(data, filename=name, trace=False), repeat=args.repeat)
+        print(f"{name} ({len(data) // 1024} KB; temp file writes {len(data) // 1024} KB per document)")
+        report("  temp file", staged)
+        report("  bytes", in_memory, staged)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Confidence + text assembly for remote OCR results of growing size: the dict
+loop in ocr_service vs the NumPy columns in ocr_lines (column build included).
+Used to pick OCR_VECTOR_MIN_LINES.
+
+Usage:
+    python scripts/benchmarks/line_stats.py [--pages 10] [--repeat 20]
+"""
+from __future__ import annotations
+import argparse
+import math
+import random
+
+from common import timeit, report
+
+import corpus
+from ocr_lines import LineTable
+from ocr_service import calculate_weighted_confidence
+
+
+def synthetic_lines(n: int, seed: int = 7) -> list[dict]:
+    """n OCR-style lines: corpus text plus short noise, confidences 0.3-1.0."""
+    rng = random.Random(seed)
+    pool = corpus.ocr_lines() + ["1", "|", "a.", "II", "SSM"]
+    return [{"text": rng.choice(pool), "conf": round(rng.uniform(0.3, 1.0), 4)} for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for n in (50, 200, 1000, 5000, 20000):
+        lines = synthetic_lines(n)
+        per_page = n // args.pages
+        page_sizes = [per_page] * (args.pages - 1) + [n - per_page * (args.pages - 1)]
+
+        def loop():
+            return "\n".join(item["text"] for item in lines), calculate_weighted_confidence(lines)
+
+        def columns():
+            table = LineTable.from_lines(lines)
+            return table.text(), table.weighted_confidence()
+
+        def columns_pages():
+            table = LineTable.from_lines(lines, page_sizes)
+            return table.text(), table.weighted_confidence(), table.page_stats()
+
+        (text_a, conf_a), (text_b, conf_b) = loop(), columns()
+        if text_a != text_b or not math.isclose(conf_a, conf_b, rel_tol=1e-9):
+            print(f"{n} lines: results differ ({conf_a} vs {conf_b})")
+        base = timeit(loop, repeat=args.repeat)
+        report(f"{n} lines dict loop", base)
+        report(f"{n} lines columns", timeit(columns, repeat=args.repeat), base)
+        report(f"{n} lines columns+pages", timeit(columns_pages, repeat=args.repeat), base)
+
+
+if __name__ == "__main__":
+    main()
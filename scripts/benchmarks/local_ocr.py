@@ -0,0 +1,84 @@
+"""
+Local CPU OCR throughput (ocr_local.py) in pages per second per core.
+
+The sample documents are turned into the cleaned page images local OCR reads
+(ocr_preprocess.page_images: every PDF page and image), then recognized by an
+EnginePool for each --engines layout, the cores split evenly between the
+instances (threads = --cores / engines). Model loading is reported apart and
+not timed; each layout gets one warm-up pass over the pages.
+
+  pages/s        wall-clock throughput of the whole pool
+  pages/s/core   the same divided by the cores it was given
+
+Also prints the per-page latency a single document sees, which is what
+choose_engine() weighs against OCR_REMOTE_SLOW_MS.
+
+Usage:
+    python scripts/benchmarks/local_ocr.py [--backend rapidocr] [--engines 1,2,4] [--cores N] [--repeat 3]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+from common import SAMPLE_DIR
+
+import ocr_local
+from ocr_preprocess import page_images
+
+
+def load_pages(limit: int | None = None) -> list:
+    images = []
+    for name in sorted(os.listdir(SAMPLE_DIR)):
+        images += [image for _, image in page_images(os.path.join(SAMPLE_DIR, name))]
+    return images[:limit] if limit else images
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default=None, help="Backend name (default: OCR_LOCAL_BACKEND / first installed)")
+    parser.add_argument("--engines", default=None, help="Comma-separated pool sizes (default: 1 and the core count)")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pages", type=int, default=None, help="Use at most this many pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["OCR_LOCAL_BACKEND"] = args.backend
+    backend = ocr_local.backend_name()
+    if backend is None:
+        sys.exit(f"No local OCR backend installed (one of: {', '.join(ocr_local.BACKENDS)})")
+
+    pages = load_pages(args.pages)
+    sizes = [int(n) for n in args.engines.split(",")] if args.engines else sorted({1, args.cores})
+    print(f"{backend}: {len(pages)} page(s), {args.cores} core(s)")
+
+    for engines in sizes:
+        threads = max(1, args.cores // engines)
+        pool = ocr_local.EnginePool(backend, size=engines, threads=threads)
+        pool.start()
+        pool.recognize(pages)
+        runs = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            result = pool.recognize(pages)
+            runs.append(time.perf_counter() - t0)
+        best = min(runs)
+        lines = sum(len(page) for page in result)
+        cores = min(args.cores, engines * threads)
+        print(f"  {engines} engine(s) x {threads} thread(s): load {pool.load_seconds:6.2f}s  "
+              f"{len(pages) / best:6.2f} pages/s  {len(pages) / best / cores:6.3f} pages/s/core  "
+              f"{best * 1000 / len(pages):8.1f} ms/page  ({lines} lines)")
+
+    # One page at a time through a single engine: latency, not throughput
+    pool = ocr_local.EnginePool(backend, size=1, threads=args.cores).start()
+    pool.recognize(pages[:1])
+    t0 = time.perf_counter()
+    for page in pages:
+        pool.recognize([page])
+    print(f"  single-page latency: {(time.perf_counter() - t0) * 1000 / len(pages):.1f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
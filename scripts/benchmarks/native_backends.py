@@ -0,0 +1,63 @@
+"""
+pdfium vs pdfplumber native text backends (scripts/pdf_text.py).
+
+For every PDF: times both backends, runs classification + extraction on each
+text, and lists the fields that differ. The parity check requires the "auto"
+backend to produce the same extraction as pdfplumber layout mode; exits 1
+otherwise.
+
+Usage:
+    python scripts/benchmarks/native_backends.py [pdf or dir ...] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import glob
+import os
+import sys
+
+from common import SAMPLE_DIR, timeit, report
+
+import pdf_text
+from ocr_service import run_extraction, no_trace
+
+
+def _extract(path: str, backend: str) -> tuple[str, dict]:
+    pages, _, _ = pdf_text.extract_text(path, backend=backend, workers=1)
+    return run_extraction(pdf_text.join_pages(pages), add_trace=no_trace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", default=[SAMPLE_DIR])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pdfs = []
+    for spec in args.inputs:
+        pdfs += sorted(glob.glob(os.path.join(spec, "*.pdf"))) if os.path.isdir(spec) else [spec]
+
+    failed = False
+    for path in pdfs:
+        print(f"\n{os.path.basename(path)} ({pdf_text.page_count(path)} pages)")
+        baseline = timeit(lambda: pdf_text.extract_text(path, backend="pdfplumber", workers=1), repeat=args.repeat)
+        report("pdfplumber (layout)", baseline)
+        report("pdfium", timeit(lambda: pdf_text.extract_text(path, backend="pdfium"), repeat=args.repeat), baseline)
+        report("auto", timeit(lambda: pdf_text.extract_text(path, backend="auto", workers=1), repeat=args.repeat), baseline)
+
+        doc_type, reference = _extract(path, "pdfplumber")
+        pdfium_type, pdfium_fields = _extract(path, "pdfium")
+        diff = sorted(k for k in set(reference) | set(pdfium_fields) if reference.get(k) != pdfium_fields.get(k))
+        print(f"  doc type: pdfplumber={doc_type} pdfium={pdfium_type}")
+        print(f"  pdfium field differences: {', '.join(diff) if diff else 'none'}")
+
+        _, chosen, _ = pdf_text.extract_text(path, backend="auto", workers=1)
+        auto_fields = _extract(path, "auto")[1]
+        parity = auto_fields == reference
+        failed |= not parity
+        print(f"  auto -> {chosen}: {'parity OK' if parity else 'PARITY MISMATCH'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Serial vs parallel native PDF text extraction (scripts/pdf_text.py).
+
+Checks that every worker count produces byte-identical text to the serial
+path, then reports wall-clock per document.
+
+Usage:
+    python scripts/benchmarks/native_pages.py [pdf] [--workers 1 2 4] [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import os
+
+from common import SAMPLE_PDF, timeit, report
+
+import pdf_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", default=SAMPLE_PDF)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    n_pages = pdf_text.page_count(args.pdf)
+    print(f"{os.path.basename(args.pdf)}: {n_pages} pages, {os.cpu_count()} CPU(s)")
+
+    expected = pdf_text.join_pages(pdf_text.extract_pages(args.pdf, workers=1))
+    baseline = None
+    for workers in args.workers:
+        text = pdf_text.join_pages(pdf_text.extract_pages(args.pdf, workers=workers))
+        assert text == expected, f"workers={workers} produced different text"
+        stats = timeit(lambda: pdf_text.extract_pages(args.pdf, workers=workers), repeat=args.repeat)
+        report(f"workers={workers}", stats, baseline)
+        baseline = baseline or stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Company profile directors/shareholders: layout-text regexes vs pdfplumber
+word coordinates (extractor/layout_tables.py), for speed and accuracy.
+
+Accuracy is scored on the sample profile and on copies of its table pages
+with columns that wrap (a two-row designation, a two-row shareholder name).
+Both paths see the same document: the layout text for the regex path is
+rendered from the (edited) words, one row per line at its x position.
+
+Usage:
+    python scripts/benchmarks/officer_tables.py [--repeat 10]
+"""
+from __future__ import annotations
+import argparse
+import copy
+
+from common import timeit, report, SAMPLE_PDF
+
+import pdf_text
+from ocr_model import OcrLine, group_rows
+from extractor.corporate_info import extract_corporate_info
+from extractor.layout_tables import table_page_range
+
+# Hand-checked against the sample PDF
+EXPECTED_DIRECTORS = [
+    ("CHONG SIW CHIN", "710615-08-5992", "DIRECTOR", "01-08-2019", "183 KUALA KUANG\nMALAYSIA\n31200 CHEMOR\nPERAK"),
+    ("CHONG WOEI SOON", "980202-38-5495", "DIRECTOR", "04-04-2024", "77 JALAN KUBANG BUAYA\nMALAYSIA\n25250 KUANTAN\nPAHANG"),
+    ("ROSTILA BINTI IBRAHIM", "771020-06-5908", "SECRETARY", "04-11-2024", "A137-1, JALAN TUN ISMAIL 6,\n25000 KUANTAN\nPAHANG"),
+    ("MAZLAN BIN MOHD NOOR", "740227-06-5049", "DIRECTOR", "13-11-2025",
+     "NO. 10, LORONG BUKIT SETONGKOL 44\nTAMAN CENDERAWASIH INDAH\nMALAYSIA\n25200 KUANTAN\nPAHANG"),
+]
+EXPECTED_SHAREHOLDERS = [
+    ("CHONG SIW CHIN", "710615-08-5992", 650001),
+    ("CHONG WOEI SOON", "980202-38-5495", 350000),
+    ("LEE YUAN YIN", "710402-06-5330", 1),
+]
+
+# Points per character column when rendering words back to layout text
+CHAR_WIDTH = 6.0
+
+
+def render_layout(pages_words: list[list[dict]]) -> str:
+    lines = []
+    for words in pages_words:
+        rows = group_rows([OcrLine(w["text"], 1.0, (w["x0"], w["top"], w["x1"], w["bottom"])) for w in words])
+        for row in rows:
+            line = ""
+            for word in row:
+                column = int(word.bbox[0] / CHAR_WIDTH)
+                line = line.ljust(column - 1) + " " + word.text if line else " " * column + word.text
+            lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _find(words: list[dict], text: str) -> dict:
+    return next(w for w in words if w["text"] == text)
+
+
+def wrapped(pages_words: list[list[dict]]) -> tuple[list[list[dict]], list, list]:
+    """Copy of the table pages with a wrapped designation and a wrapped shareholder name."""
+    pages = copy.deepcopy(pages_words)
+    directors_page = next(p for p in pages if any(w["text"] == "DIRECTORS/OFFICERS" for w in p))
+    holders_page = next(p for p in pages if any(w["text"] == "SHAREHOLDERS/MEMBERS" for w in p))
+
+    secretary = _find(directors_page, "SECRETARY")
+    directors_page.append(dict(secretary, text="SECRETARY", top=secretary["top"] + 12, bottom=secretary["bottom"] + 12))
+    secretary["text"] = "COMPANY"
+
+    yin = _find(holders_page, "YIN")
+    holders_page.append(dict(yin, text="ABDULLAH", x0=227.0, x1=275.0, top=yin["top"] + 12, bottom=yin["bottom"] + 12))
+
+    directors = list(EXPECTED_DIRECTORS)
+    directors[2] = directors[2][:2] + ("COMPANY SECRETARY",) + directors[2][3:]
+    shareholders = list(EXPECTED_SHAREHOLDERS)
+    shareholders[2] = ("LEE YUAN YIN ABDULLAH",) + shareholders[2][1:]
+    return pages, directors, shareholders
+
+
+def score(result: dict, directors: list, shareholders: list) -> str:
+    got_d = [(d["name"], d["ic"], d["designation"], d["appointmentDate"], d["address"]) for d in result["directors"]]
+    got_s = [(s["name"], s["ic"], s["shares"]) for s in result["shareholders"]]
+    fields = sum(a == b for exp, got in zip(directors, got_d) for a, b in zip(exp, got))
+    fields += sum(a == b for exp, got in zip(shareholders, got_s) for a, b in zip(exp, got))
+    total = len(directors) * 5 + len(shareholders) * 3
+    return f"{fields}/{total} fields, {len(got_d)} directors, {len(got_s)} shareholders"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages, _, _, page_words = pdf_text.extract_text(str(SAMPLE_PDF), backend="pdfplumber", words=True)
+    text = pdf_text.join_pages(pages)
+    start, stop = table_page_range(pages)
+    table_words = page_words[start:stop]
+
+    print("Accuracy")
+    cases = [("sample", text, table_words, EXPECTED_DIRECTORS, EXPECTED_SHAREHOLDERS)]
+    wrapped_words, wrapped_directors, wrapped_holders = wrapped(table_words)
+    cases.append(("wrapped columns", render_layout(wrapped_words), wrapped_words, wrapped_directors, wrapped_holders))
+    for name, case_text, case_words, directors, shareholders in cases:
+        print(f"  {name:<16} text  {score(extract_corporate_info(case_text), directors, shareholders)}")
+        print(f"  {name:<16} words {score(extract_corporate_info(case_text, case_words), directors, shareholders)}")
+
+    print("Speed (sample)")
+    base = timeit(lambda: extract_corporate_info(text), repeat=args.repeat)
+    report("extractor, text tables", base)
+    report("extractor, word tables", timeit(lambda: extract_corporate_info(text, table_words), repeat=args.repeat), base)
+    base = timeit(lambda: pdf_text.extract_text(str(SAMPLE_PDF), backend="pdfplumber"), repeat=3)
+    report("pdfplumber read", base)
+    report("pdfplumber read + words", timeit(
+        lambda: pdf_text.extract_text(str(SAMPLE_PDF), backend="pdfplumber", words=True), repeat=3), base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Per-page PDF triage (OCR_PDF_TRIAGE) on scanned and mixed PDFs.
+
+Builds two PDFs from the samples: a scanned one (the certificate images as
+image-only pages) and a mixed one (the Form 9 scan as a cover page in front
+of the text company profile). Compares:
+
+  - triage_pages() against the native extraction pass it front-runs
+  - stage 1 (run_ocr) with triage off / on, remote OCR replayed in process:
+    the scanned PDF no longer pays for a layout pass that finds no text, and
+    the mixed PDF uploads only its cover page instead of either dropping it
+    (native text passes the length check) or uploading the whole file.
+
+Usage:
+    python scripts/benchmarks/pdf_triage.py [--repeat 5]
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+
+from common import SAMPLE_DIR, SAMPLE_PDF, timeit, report
+
+import corpus
+import pdf_text
+
+STUB_URL = "http://ocr-triage.local"
+
+SCANS = ["sample-cert-form-9-SDN-BHD.jpg", "sample-cert-form-D-ENT.jpg", "sample-cert-LLP.jpg"]
+
+
+def add_scan_page(pdf, image_path: str, width: float = 595, height: float = 842):
+    """Appends an A4 page holding only `image_path`, like a scanner's output."""
+    import pypdfium2 as pdfium
+    image = pdfium.PdfImage.new(pdf)
+    image.load_jpeg(image_path, inline=False)
+    image.set_matrix(pdfium.PdfMatrix().scale(width, height))
+    page = pdf.new_page(width, height)
+    page.insert_obj(image)
+    page.gen_content()
+    page.close()
+
+
+def build_scanned(out_path: str):
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument.new()
+    for name in SCANS:
+        add_scan_page(pdf, os.path.join(SAMPLE_DIR, name))
+    pdf.save(out_path)
+    pdf.close()
+
+
+def build_mixed(out_path: str, cover: str = SCANS[0], source: str = SAMPLE_PDF):
+    """Scanned `cover` followed by every page of `source`."""
+    import pypdfium2 as pdfium
+    src = pdfium.PdfDocument(source)
+    pdf = pdfium.PdfDocument.new()
+    add_scan_page(pdf, os.path.join(SAMPLE_DIR, cover))
+    pdf.import_pages(src)
+    pdf.save(out_path)
+    pdf.close()
+    src.close()
+
+
+def _replay():
+    """Answers every upload with the recorded Form 9 lines, counting uploaded bytes."""
+    import httpx
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app
+
+    form_9 = next(f for f in corpus.ocr_fixtures() if f["expected"]["docType"] == "FORM_9")
+    app = create_app(pages=form_9["response"]["result"])
+    uploaded = {"requests": 0, "bytes": 0}
+
+    class CountingTransport(httpx.ASGITransport):
+        async def handle_async_request(self, request):
+            uploaded["requests"] += 1
+            uploaded["bytes"] += len(await request.aread())
+            return await super().handle_async_request(request)
+
+    register_client(RemoteOcrClient(STUB_URL, transport=CountingTransport(app=app), max_retries=0))
+    return uploaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    import ocr_service
+    os.environ["HF_API_URL"] = STUB_URL
+    uploaded = _replay()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scanned = os.path.join(tmp, "scanned.pdf")
+        mixed = os.path.join(tmp, "mixed.pdf")
+        build_scanned(scanned)
+        build_mixed(mixed)
+
+        for name, path in (("text", SAMPLE_PDF), ("scanned", scanned), ("mixed", mixed)):
+            kinds = pdf_text.triage_pages(path)
+            print(f"{name}: {len(kinds)} pages {kinds}, {os.path.getsize(path) // 1024} KB")
+            extract = timeit(lambda: pdf_text.extract_text(path), repeat=args.repeat)
+            triage = timeit(lambda: pdf_text.triage_pages(path), repeat=args.repeat)
+            report(f"{name} extract_text", extract)
+            report(f"{name} triage_pages", triage, extract)
+
+            results = {}
+            for mode in ("0", "1"):
+                os.environ["OCR_PDF_TRIAGE"] = mode
+                uploaded.update(requests=0, bytes=0)
+                stage1 = ocr_service.run_ocr(path, ocr_service.no_trace)
+                print(f"  triage {'on' if mode == '1' else 'off'}: source={stage1.get('source')} "
+                      f"pages={stage1.get('page_sources') or '-'} uploads={uploaded['requests']} "
+                      f"upload_kb={uploaded['bytes'] / 1024:.0f}")
+                results[mode] = timeit(lambda: ocr_service.run_ocr(path, ocr_service.no_trace), repeat=args.repeat)
+            report(f"{name} run_ocr triage off", results["0"])
+            report(f"{name} run_ocr triage on", results["1"], results["0"])
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Upload preprocessing (ocr_preprocess.py) and per-page parallel upload.
+
+1. Phone-photo shaped inputs: each sample certificate upscaled to a 12 MP
+   colour photo, tilted by --tilt degrees and saved as a high-quality JPEG.
+   Reports what prepare_image() uploads instead (bytes and pixels, the
+   latter being what the Space's detector time scales with), the skew it
+   found and what it cost.
+2. A 3-page scanned PDF against a stub answering after --latency seconds:
+   one upload per page in parallel (remote_ocr_many_sync) against the same
+   pages uploaded one after another.
+
+Usage:
+    python scripts/benchmarks/preprocess.py [--tilt 2.5] [--latency 0.3] [--repeat 3]
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+import time
+
+from common import SAMPLE_DIR, timeit
+
+import ocr_preprocess
+from pdf_triage import SCANS, build_scanned
+
+STUB_URL = "http://ocr-preprocess.local"
+
+
+def phone_photo(path: str, tilt: float) -> bytes:
+    import cv2
+    image = cv2.imread(path)
+    image = cv2.resize(image, (3000, 4000), interpolation=cv2.INTER_CUBIC)
+    matrix = cv2.getRotationMatrix2D((1500, 2000), tilt, 1.0)
+    image = cv2.warpAffine(image, matrix, (3000, 4000), borderValue=(255, 255, 255))
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+    return buffer.tobytes()
+
+
+def _stub(latency: float):
+    import httpx
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app
+    app = create_app(latency=latency)
+    register_client(RemoteOcrClient(STUB_URL, transport=httpx.ASGITransport(app=app), max_retries=0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tilt", type=float, default=2.5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'photo':<34} {'in KB':>7} {'out KB':>7} {'in MP':>6} {'out MP':>6} {'skew':>5} {'p50 ms':>7}")
+    for name in SCANS:
+        photo = phone_photo(os.path.join(SAMPLE_DIR, name), args.tilt)
+        out, info = ocr_preprocess.prepare_image(photo)
+        stats = timeit(lambda: ocr_preprocess.prepare_image(photo), repeat=args.repeat)
+        width, height = info["size"]
+        print(f"{name:<34} {len(photo) // 1024:>7} {len(out) // 1024:>7} {12.0:>6.1f} "
+              f"{width * height / 1e6:>6.1f} {info.get('skew', 0.0):>5.1f} {stats['p50_ms']:>7.1f}")
+
+    from ocr_client import remote_ocr_many_sync, remote_ocr_sync
+    _stub(args.latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        scanned = os.path.join(tmp, "scanned.pdf")
+        build_scanned(scanned)
+        uploads = list(ocr_preprocess.prepare_uploads(scanned))
+        print(f"\nscanned PDF: {len(uploads)} page uploads, {sum(len(d) for d, _ in uploads) // 1024} KB, "
+              f"stub latency {args.latency}s")
+        start = time.perf_counter()
+        for data, filename in uploads:
+            remote_ocr_sync(STUB_URL, None, data, filename)
+        print(f"  sequential: {(time.perf_counter() - start) * 1000:.0f}ms")
+        start = time.perf_counter()
+        remote_ocr_many_sync(STUB_URL, None, ocr_preprocess.prepare_uploads(scanned))
+        print(f"  parallel (rendering overlapped): {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
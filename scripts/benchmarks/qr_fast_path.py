@@ -0,0 +1,116 @@
+"""
+Local QR fast path (ocr_service.qr_fast_path) against remote OCR.
+
+The samples carry no QR code, so each certificate is also rendered with one:
+the payload is built from the corpus' expected fields and pasted into the
+bottom-right corner, the way SSM e-certificates print it. Every document
+(with and without a QR) goes through stage 1 + 2 with remote OCR answered by
+the stub after --latency seconds, and the script reports:
+
+  - the fast-path rate over the whole set and the remote requests it saved
+  - per-document latency on the fast path against the remote path
+  - what the decode attempt costs documents that have no QR code
+  - whether the fields taken from the payload match the expected ones
+
+Usage:
+    python scripts/benchmarks/qr_fast_path.py [--latency 0.5] [--repeat 3]
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import tempfile
+
+from common import SAMPLE_DIR, timeit, report
+
+import corpus
+import ocr_qr
+
+STUB_URL = "http://ocr-qr.local"
+
+# Payload keys per certificate generation; the LLP fixture has no date, so
+# its QR gets one (the payload has to carry all REQUIRED_FIELDS)
+PAYLOAD_FIELDS = {
+    "FORM_9": {"type": "form9", "name": "companyName", "regNo": "registrationNumber",
+               "companyNo": "oldRegistrationNumber", "regDate": "registrationDate"},
+    "FORM_D": {"type": "rob", "name": "entity_name", "regNo": "registration_number_new",
+               "businessNo": "registration_number_old", "regDate": "incorporation_or_registration_date"},
+    "LLP_CERT": {"type": "llp", "name": "companyName", "regNo": "registrationNumber",
+                 "llpNo": "oldRegistrationNumber"},
+}
+
+
+def payload_for(expected: dict) -> str:
+    fields = expected["fields"]
+    keys = PAYLOAD_FIELDS[expected["docType"]]
+    payload = {key: (value if key == "type" else fields[value]) for key, value in keys.items()}
+    payload.setdefault("regDate", "2022-01-10")
+    return json.dumps(payload)
+
+
+def qr_certificate(image_path: str, payload: str, out: str):
+    import cv2
+    image = cv2.imread(image_path)
+    code = cv2.QRCodeEncoder.create().encode(payload)
+    code = cv2.resize(code, None, fx=4, fy=4, interpolation=cv2.INTER_NEAREST)
+    code = cv2.copyMakeBorder(code, 16, 16, 16, 16, cv2.BORDER_CONSTANT, value=255)
+    h, w = code.shape
+    image[-h - 20:-20, -w - 20:-20] = cv2.cvtColor(code, cv2.COLOR_GRAY2BGR)
+    cv2.imwrite(out, image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+
+def _stub(latency: float):
+    import httpx
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app
+    app = create_app(fixtures={f["sha256"]: f for f in corpus.ocr_fixtures()}, latency=latency)
+    register_client(RemoteOcrClient(STUB_URL, transport=httpx.ASGITransport(app=app), max_retries=0))
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    import ocr_service
+    os.environ["HF_API_URL"] = STUB_URL
+    os.environ["OCR_CACHE"] = "off"
+    app = _stub(args.latency)
+
+    def stage12(path):
+        stage1 = ocr_service.run_ocr(path, ocr_service.no_trace)
+        return ocr_service.build_result(stage1, ocr_service.no_trace, [], 0.0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = []
+        for fixture in corpus.ocr_fixtures():
+            source = os.path.join(SAMPLE_DIR, fixture["file"])
+            with_qr = os.path.join(tmp, "qr-" + fixture["file"])
+            qr_certificate(source, payload_for(fixture["expected"]), with_qr)
+            docs += [(fixture["file"], source, fixture["expected"]), ("qr-" + fixture["file"], with_qr, fixture["expected"])]
+
+        fast, mismatches = 0, []
+        for name, path, expected in docs:
+            result = stage12(path)
+            if result.get("fast_path") == "qr":
+                fast += 1
+                data = result["extracted_data"]
+                mismatches += [f"{name}:{key}" for key in PAYLOAD_FIELDS[expected["docType"]].values()
+                               if key in expected["fields"] and data.get(key) != expected["fields"][key]]
+        print(f"fast path: {fast}/{len(docs)} documents ({fast / len(docs):.0%}), "
+              f"remote requests {app.state.requests} for {len(docs)} documents, "
+              f"decoder {'pyzbar' if ocr_qr.HAS_ZBAR else 'cv2'}")
+        print(f"payload fields matching the expected extraction: {'all' if not mismatches else mismatches}\n")
+
+        for name, path, _ in docs:
+            report(f"{name} stage 1+2", timeit(lambda: stage12(path), repeat=args.repeat))
+        for name, path, _ in docs:
+            if not name.startswith("qr-"):
+                report(f"{name} decode attempt (no QR)", timeit(lambda: ocr_qr.decode_document(path),
+                                                                repeat=args.repeat))
+
+
+if __name__ == "__main__":
+    main()
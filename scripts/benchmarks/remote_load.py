@@ -0,0 +1,120 @@
+"""
+Client-side load test of the remote OCR path against ocr_stub_server
+replaying the recorded sample responses (tests/fixtures/ocr), so throughput
+and back-pressure can be measured without the live Space.
+
+The stub runs under uvicorn on a local port (real sockets and keep-alive,
+unlike the in-process transport used by the tests). For each client
+concurrency (OCR_REMOTE_CONCURRENCY) the sample images are uploaded
+--requests times through RemoteOcrClient with the stub injecting latency,
+errors and throttling; the table shows what the client sustains and what it
+cost in retries.
+
+Usage:
+    python scripts/benchmarks/remote_load.py [--requests 40] [--concurrency 1 2 4 8 16]
+        [--latency 0.1] [--jitter 0.05] [--capacity 4] [--error-rate 0.05]
+        [--rate-limit 20] [--burst 5] [--retries 3] [--backoff-base 0.05]
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from collections import Counter
+
+from common import SAMPLE_DIR
+
+import corpus
+from ocr_client import RemoteOcrClient, RemoteOcrError, CircuitOpenError
+from ocr_stub_server import create_app
+
+
+def serve(app):
+    """Starts `app` under uvicorn in a daemon thread; returns (base_url, server)."""
+    import uvicorn
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{sock.getsockname()[1]}", server
+
+
+def uploads() -> list[tuple[str, bytes]]:
+    files = []
+    for fixture in corpus.ocr_fixtures():
+        with open(os.path.join(SAMPLE_DIR, fixture["file"]), "rb") as f:
+            files.append((fixture["file"], f.read()))
+    return files
+
+
+async def drive(client: RemoteOcrClient, files: list, n: int) -> tuple[float, Counter]:
+    outcomes = Counter()
+
+    async def one(i):
+        name, data = files[i % len(files)]
+        try:
+            await client.ocr(data, name)
+            outcomes["ok"] += 1
+        except CircuitOpenError:
+            outcomes["circuit_open"] += 1
+        except RemoteOcrError as e:
+            outcomes[f"http_{e.status}" if e.status else "transport"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    wall = time.perf_counter() - start
+    await client.aclose()
+    return wall, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--capacity", type=int, default=4, help="stub: requests processed at once")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--rate-limit", type=float, default=20.0, help="stub: requests/s (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=5)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff-base", type=float, default=0.05)
+    parser.add_argument("--breaker-threshold", type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger("uvicorn.error").setLevel(logging.WARNING)
+
+    files = uploads()
+    fixtures = {fixture["sha256"]: fixture for fixture in corpus.ocr_fixtures()}
+    print(f"{len(files)} sample image(s), {args.requests} uploads per run; stub latency {args.latency}s"
+          f"+{args.jitter}s, capacity {args.capacity}, error rate {args.error_rate}, "
+          f"rate limit {args.rate_limit}/s burst {args.burst}")
+    print(f"{'client conc':>11} {'docs/s':>8} {'ok':>5} {'failed':>7} {'retries':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'429s':>5} {'5xx':>5} {'stub peak':>9}")
+
+    for concurrency in args.concurrency:
+        app = create_app(fixtures=fixtures, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                         rate_limit=args.rate_limit, burst=args.burst, capacity=args.capacity, seed=1)
+        url, server = serve(app)
+        client = RemoteOcrClient(url, max_concurrency=concurrency, max_retries=args.retries,
+                                 backoff_base=args.backoff_base, breaker_threshold=args.breaker_threshold)
+        wall, outcomes = asyncio.run(drive(client, files, args.requests))
+        server.should_exit = True
+
+        metrics = client.metrics()
+        counts = app.state.counts
+        failed = args.requests - outcomes["ok"]
+        print(f"{concurrency:>11} {outcomes['ok'] / wall:>8.1f} {outcomes['ok']:>5} {failed:>7} "
+              f"{metrics['retries']:>8} {metrics['p50_ms']:>8.0f} {metrics['p95_ms']:>8.0f} "
+              f"{counts['throttled']:>5} {counts['errors']:>5} {counts['peak_in_flight']:>9}"
+              + (f"  {dict(outcomes - Counter(ok=outcomes['ok']))}" if failed else ""))
+
+
+if __name__ == "__main__":
+    main()
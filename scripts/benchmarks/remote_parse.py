@@ -0,0 +1,86 @@
+"""
+Parse cost and memory of a remote /ocr response: the per-line guesser at a
+git ref vs ocr_model.parse_pages (format decided once per response). The
+"no cleanup" rows skip clean_merged_text, which otherwise dominates both.
+
+Memory compares the parsed pages as OcrPage/OcrLine objects against the
+same lines held as dicts (with the bbox as a list where there is one).
+
+Usage:
+    python scripts/benchmarks/remote_parse.py [--baseline REF] [--pages 10] [--lines 400]
+"""
+from __future__ import annotations
+import argparse
+import random
+import re
+import tracemalloc
+
+from common import timeit, report, load_function_at
+
+import corpus
+import ocr_service
+from ocr_model import parse_pages
+from ocr_service import clean_merged_text
+
+
+def response(fmt: str, pages: int, lines: int, seed: int = 11) -> dict:
+    rng = random.Random(seed)
+    pool = corpus.ocr_lines()
+    result = []
+    for _ in range(pages):
+        page = []
+        for i in range(lines):
+            text, conf = rng.choice(pool), round(rng.uniform(0.5, 1.0), 4)
+            if fmt == "boxed":
+                y = 20.0 * i
+                page.append([[[10.0, y], [400.0, y], [400.0, y + 18], [10.0, y + 18]], [text, conf]])
+            else:
+                page.append([text, conf])
+        result.append(page)
+    return {"result": result, "qr_payload": None}
+
+
+def _allocated(build) -> int:
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default="HEAD~1", help="git ref with the per-line parser")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    old_parse = load_function_at(args.baseline, "scripts/ocr_service.py", "parse_remote_response",
+                                 {**vars(ocr_service), "re": re})
+    # Same parser with text cleanup stubbed out: isolates per-line dispatch
+    old_dispatch = load_function_at(args.baseline, "scripts/ocr_service.py", "parse_remote_response",
+                                    {**vars(ocr_service), "re": re, "clean_merged_text": lambda text: text})
+    trace = ocr_service.no_trace
+    n = args.pages * args.lines
+
+    for fmt in ("pair", "boxed"):
+        data = response(fmt, args.pages, args.lines)
+        base = timeit(lambda: old_parse(data, trace), repeat=args.repeat)
+        report(f"{fmt} {n} lines @{args.baseline}", base)
+        report(f"{fmt} {n} lines", timeit(lambda: ocr_service.parse_remote_response(data, trace),
+                                          repeat=args.repeat), base)
+        base = timeit(lambda: old_dispatch(data, trace), repeat=args.repeat)
+        report(f"{fmt} no cleanup @{args.baseline}", base)
+        report(f"{fmt} no cleanup parse_pages", timeit(lambda: parse_pages(data["result"]), repeat=args.repeat), base)
+
+        pages, _ = parse_pages(data["result"], clean_merged_text)
+        as_dicts = _allocated(lambda: [[line.record() for line in page.lines] for page in pages])
+        as_slots = _allocated(lambda: parse_pages(data["result"])[0])
+        print(f"{'':28} memory per page: dicts {as_dicts / args.pages / 1024:.1f} KB, "
+              f"OcrPage {as_slots / args.pages / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark and regression suite over sample/SSM Cert and the recorded OCR
+fixtures (tests/fixtures/ocr).
+
+Cases, grouped by doc type:
+  extract/<TYPE>/<doc>   the extractor alone on the document text (the
+                         corpus.py OCR-style texts and each fixture's text)
+  pipeline/<TYPE>/<file> ocr_service.process_document on a sample file with
+                         the cache off: native text for PDFs; images get
+                         their recorded response, replayed by hash from an
+                         in-process ocr_stub_server
+
+Each case reports p50/p95 latency, peak traced Python memory (tracemalloc,
+in a separate untimed run) and throughput (docs/s over the timed runs).
+Pipeline cases also check docType and the fixture's expected fields.
+
+--save writes the results to baselines/suite.json. --check compares against
+it and exits 1 when a case's latency or peak memory exceeds the baseline by
+more than --threshold. Latency counts as regressed only when both p50 and the
+fastest run are over (p95 is reported, not gated): one slow stretch on a
+shared runner moves the median, a real slowdown moves every run.
+Differences under 1ms / 64KB never count, so sub-millisecond extractors do
+not flap. Baselines are machine-specific: re-save on the
+hardware that runs --check.
+
+Usage:
+    python scripts/benchmarks/suite.py [--repeat 10] [--only extract|pipeline]
+                                       [--save | --check] [--threshold 0.25]
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from common import SAMPLE_DIR, timeit
+
+import corpus
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "suite.json")
+DEFAULT_THRESHOLD = 0.25
+MIN_DELTA_MS = 1.0
+MIN_DELTA_KB = 64.0
+
+STUB_URL = "http://ocr-replay.local"
+
+
+@contextlib.contextmanager
+def _quiet():
+    # ocr_service logs every trace step to stderr
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        yield
+
+
+def peak_kb(fn) -> float:
+    """Peak traced Python allocation of one fn() call, in KB."""
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn, repeat: int) -> dict:
+    stats = timeit(fn, repeat=repeat)
+    return {
+        "min_ms": stats["min_ms"],
+        "p50_ms": stats["p50_ms"],
+        "p95_ms": stats["p95_ms"],
+        "peak_kb": peak_kb(fn),
+        "docs_per_s": round(stats["runs"] / (stats["total_ms"] / 1000), 2) if stats["total_ms"] else 0.0,
+    }
+
+
+def extract_cases() -> list[tuple[str, str, object]]:
+    """(case id, doc type, fn) for every extractor over every text."""
+    from ocr_service import run_extraction, no_trace
+
+    def runner(text):
+        return lambda: run_extraction(text, no_trace)
+
+    cases = [(f"extract/{doc_type}/corpus", doc_type, runner(text))
+             for doc_type, text in corpus.documents().items()]
+    for fixture in corpus.ocr_fixtures():
+        doc_type = fixture["expected"]["docType"]
+        name = os.path.splitext(fixture["file"])[0]
+        cases.append((f"extract/{doc_type}/{name}", doc_type, runner(corpus.fixture_text(fixture))))
+    return cases
+
+
+def _replay():
+    """Routes remote OCR to an in-process stub replaying the fixtures by upload hash."""
+    import httpx
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app
+
+    app = create_app(fixtures={fixture["sha256"]: fixture for fixture in corpus.ocr_fixtures()})
+    register_client(RemoteOcrClient(STUB_URL, transport=httpx.ASGITransport(app=app), max_retries=0))
+
+
+def _check_output(result: dict, doc_type: str, fields: dict) -> list[str]:
+    if "error" in result:
+        return [result["error"]]
+    data = result["extracted_data"]
+    problems = [] if data.get("docType") == doc_type else [f"docType {data.get('docType')} != {doc_type}"]
+    problems += [f"{key}: {data.get(key)!r} != {value!r}" for key, value in fields.items() if data.get(key) != value]
+    return problems
+
+
+def pipeline_cases() -> list[tuple[str, str, str, dict]]:
+    """(case id, doc type, path, expected fields) for every file in sample/SSM Cert."""
+    cases = []
+    fixtures = {fixture["file"]: fixture for fixture in corpus.ocr_fixtures()}
+    for name in sorted(os.listdir(SAMPLE_DIR)):
+        path = os.path.join(SAMPLE_DIR, name)
+        if name.lower().endswith(".pdf"):
+            doc_type, fields = "CORPORATE_INFO", {}
+        elif name in fixtures:
+            expected = fixtures[name]["expected"]
+            doc_type, fields = expected["docType"], expected["fields"]
+        else:
+            print(f"skipping {name}: no recorded OCR fixture", file=sys.stderr)
+            continue
+        cases.append((f"pipeline/{doc_type}/{name}", doc_type, path, fields))
+    return cases
+
+
+def run(repeat: int, only: str | None = None) -> tuple[dict, list[str]]:
+    """Returns ({case id: stats}, output problems)."""
+    # Every pipeline run must do the work; set before ocr_service reads it
+    os.environ["OCR_CACHE"] = "off"
+    results = {}
+    problems = []
+    if only in (None, "extract"):
+        for case, doc_type, fn in extract_cases():
+            with _quiet():
+                results[case] = {"doc_type": doc_type, **measure(fn, repeat)}
+    if only in (None, "pipeline"):
+        os.environ["HF_API_URL"] = STUB_URL
+        os.environ.pop("HF_TOKEN", None)
+        from ocr_service import process_document
+        _replay()
+        for case, doc_type, path, fields in pipeline_cases():
+            with _quiet():
+                output = process_document(path)
+                problems += [f"{case}: {problem}" for problem in _check_output(output, doc_type, fields)]
+                results[case] = {"doc_type": doc_type, **measure(lambda: process_document(path), repeat)}
+    return results, problems
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """Regressions of `results` against baseline["cases"] beyond `threshold` (0.25 = 25% worse)."""
+    regressions = []
+    for case, stats in results.items():
+        base = baseline.get("cases", {}).get(case)
+        if base is None:
+            continue
+        def worse(key, min_delta):
+            old, new = base[key], stats[key]
+            return new > old * (1 + threshold) and new - old > min_delta
+
+        slower = worse("p50_ms", MIN_DELTA_MS) and worse("min_ms", MIN_DELTA_MS)
+        for key, regressed in (("p50_ms", slower), ("peak_kb", worse("peak_kb", MIN_DELTA_KB))):
+            if regressed:
+                old, new = base[key], stats[key]
+                regressions.append(f"{case}: {key} {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_table(results: dict, baseline: dict | None = None):
+    base_cases = (baseline or {}).get("cases", {})
+    print(f"{'case':<58} {'p50 ms':>9} {'p95 ms':>9} {'peak KB':>9} {'docs/s':>9}")
+    for case, stats in sorted(results.items(), key=lambda item: (item[1]["doc_type"], item[0])):
+        line = (f"{case:<58} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{stats['peak_kb']:>9.1f} {stats['docs_per_s']:>9.1f}")
+        if case in base_cases and stats["p50_ms"]:
+            line += f"  x{base_cases[case]['p50_ms'] / stats['p50_ms']:.2f}"
+        print(line)
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", choices=["extract", "pipeline"])
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON (default baselines/suite.json)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    mode.add_argument("--check", action="store_true", help="exit 1 on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif args.check:
+        parser.error(f"no baseline at {args.baseline}; run with --save first")
+
+    results, problems = run(args.repeat, args.only)
+    print_table(results, baseline)
+    for problem in problems:
+        print(f"OUTPUT MISMATCH {problem}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        saved = {"environment": environment(), "repeat": args.repeat,
+                 "created": time.strftime("%Y-%m-%d"), "cases": results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(saved, f, indent=1, sort_keys=True)
+            f.write("\n")
+        print(f"saved baseline to {args.baseline}")
+
+    if args.check:
+        if baseline["environment"] != environment():
+            print(f"note: baseline recorded on {baseline['environment']}")
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions or problems:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
+    elif problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
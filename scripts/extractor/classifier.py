@@ -0,0 +1,210 @@
+"""
+Document type classifier: every doc type scored in one pass over the text.
+
+The doc types live in doc_types.json, not here. Each type has weighted
+signals, and each signal is a list of phrases, any of which counts for it:
+
+    "FORM_9": {
+      "title": "...",
+      "signals": {"certificate": {"weight": 6, "phrases": ["CERTIFICATE OF INCORPORATION", ...]},
+                  "act": {"weight": 2, "phrases": ["COMPANIES ACT", ...]}, ...},
+      "requires": [["certificate", "act"], ["company", "malaysia"]]
+    }
+
+A type is a candidate when all the signals of at least one `requires` group
+are present. Its score is the sum of the weights of the signals found, each
+counted once. Types without an extractor (FORM_24, FORM_49, SECTION_58)
+classify all the same and come back as raw text. More types, or replacements
+for the bundled ones, can be added from JSON files listed in OCR_DOC_TYPES
+(separated like PATH).
+
+Text and phrases are compared as words: upper-cased runs of letters and
+digits, so punctuation and line breaks don't matter ("SDN. BHD." is
+SDN BHD). OCR that merges words needs the merged form listed as a phrase of
+its own ("CERTIFICATEOFINCORPORATION"). Only the first OCR_CLASSIFY_PREFIX
+characters are read (default 8192): the markers sit in the heading of the
+first page, and a 200-page company profile costs the same as a certificate.
+
+Every phrase of every type goes into one Aho-Corasick automaton over words,
+built once, so classification is a single pass over the prefix however many
+types and phrases there are.
+
+Confidence is the type's share of all the candidates' scores times its
+coverage (score / the most it could score).
+"""
+from __future__ import annotations
+import json
+import os
+from collections import deque
+from functools import lru_cache
+
+from .patterns import register
+
+RE_CLASSIFY_WORD = register("classifier.word", r"[A-Z0-9]+")
+
+DOC_TYPES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "doc_types.json")
+DEFAULT_PREFIX = 8192
+
+
+def words(text: str) -> tuple[str, ...]:
+    return tuple(RE_CLASSIFY_WORD.findall(text.upper()))
+
+
+class Automaton:
+    """Aho-Corasick over words: finds every phrase of a word sequence in one pass."""
+
+    __slots__ = ("_goto", "_fail", "_out", "_vocab")
+
+    def __init__(self, phrases: list[tuple[str, ...]]):
+        goto: list[dict[str, int]] = [{}]
+        out: list[list[int]] = [[]]
+        for index, phrase in enumerate(phrases):
+            node = 0
+            for word in phrase:
+                child = goto[node].get(word)
+                if child is None:
+                    child = len(goto)
+                    goto[node][word] = child
+                    goto.append({})
+                    out.append([])
+                node = child
+            out[node].append(index)
+
+        # Breadth-first, so a node's failure link is final before its children need it
+        fail = [0] * len(goto)
+        pending = deque(goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for word, child in goto[node].items():
+                pending.append(child)
+                state = fail[node]
+                while state and word not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(word, 0)
+                out[child] += out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+        self._vocab = frozenset(word for phrase in phrases for word in phrase)
+
+    def find(self, text_words) -> set[int]:
+        """Indexes of the phrases that occur in `text_words`."""
+        goto, fail, out, vocab = self._goto, self._fail, self._out, self._vocab
+        found: set[int] = set()
+        node = 0
+        for word in text_words:
+            if word not in vocab:
+                # No phrase runs through an unknown word
+                node = 0
+                continue
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class DocType:
+    __slots__ = ("name", "title", "weights", "requires", "full_score")
+
+    def __init__(self, name: str, spec: dict):
+        self.name = name
+        self.title = spec.get("title", name)
+        self.weights = {signal: s["weight"] for signal, s in spec["signals"].items()}
+        self.requires = [frozenset(group) for group in spec.get("requires", [])]
+        unknown = {signal for group in self.requires for signal in group} - self.weights.keys()
+        if unknown:
+            raise ValueError(f"{name}: requires unknown signal(s) {sorted(unknown)}")
+        self.full_score = sum(self.weights.values())
+
+    def eligible(self, signals: set[str]) -> bool:
+        return not self.requires or any(group <= signals for group in self.requires)
+
+
+class Classifier:
+    """Ranks doc types for a text; built from doc_types.json-style specs."""
+
+    def __init__(self, specs: dict[str, dict]):
+        self.types = [DocType(name, spec) for name, spec in specs.items()]
+        phrase_ids: dict[tuple[str, ...], int] = {}
+        # phrase index -> (type index, signal) pairs it counts for
+        self._targets: list[list[tuple[int, str]]] = []
+        for t, doc_type in enumerate(self.types):
+            for signal, s in specs[doc_type.name]["signals"].items():
+                for phrase in s["phrases"]:
+                    key = words(phrase)
+                    if not key:
+                        continue
+                    if key not in phrase_ids:
+                        phrase_ids[key] = len(phrase_ids)
+                        self._targets.append([])
+                    self._targets[phrase_ids[key]].append((t, signal))
+        self.automaton = Automaton(list(phrase_ids))
+
+    def rank(self, text: str, prefix: int | None = None) -> list[dict]:
+        """
+        Candidate doc types for `text`, best first (ties keep the order of
+        the specs): [{"docType", "score", "confidence"}, ...]; empty when
+        nothing matches.
+        """
+        limit = classify_prefix() if prefix is None else prefix
+        found = self.automaton.find(words(text[:limit] if limit else text))
+
+        # type index -> signals present
+        signals: dict[int, set[str]] = {}
+        for index in found:
+            for t, signal in self._targets[index]:
+                signals.setdefault(t, set()).add(signal)
+
+        candidates = []
+        for t in sorted(signals):
+            doc_type, present = self.types[t], signals[t]
+            if doc_type.eligible(present):
+                candidates.append((doc_type, sum(doc_type.weights[s] for s in present)))
+        candidates.sort(key=lambda c: -c[1])
+        total = sum(score for _, score in candidates)
+        return [
+            {"docType": d.name, "score": score,
+             "confidence": round(score / total * score / d.full_score, 3)}
+            for d, score in candidates
+        ]
+
+    def classify(self, text: str, prefix: int | None = None) -> str:
+        ranked = self.rank(text, prefix)
+        return ranked[0]["docType"] if ranked else "UNKNOWN"
+
+
+def classify_prefix() -> int:
+    """OCR_CLASSIFY_PREFIX: characters of the text read (0 = all)."""
+    return int(os.environ.get("OCR_CLASSIFY_PREFIX", DEFAULT_PREFIX))
+
+
+def spec_paths() -> list[str]:
+    """doc_types.json, then the OCR_DOC_TYPES files in order."""
+    extra = os.environ.get("OCR_DOC_TYPES", "")
+    return [DOC_TYPES_PATH] + [p for p in extra.split(os.pathsep) if p]
+
+
+def load_specs(paths: list[str]) -> dict[str, dict]:
+    """Doc type specs from `paths`; a later file replaces a type of the same name."""
+    specs: dict[str, dict] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            specs.update(json.load(f))
+    return specs
+
+
+@lru_cache(maxsize=4)
+def _classifier(paths: tuple[str, ...]) -> Classifier:
+    return Classifier(load_specs(list(paths)))
+
+
+def get_classifier() -> Classifier:
+    """The classifier for the current doc type files, built on first use."""
+    return _classifier(tuple(spec_paths()))
+
+
+def rank_doc_types(text: str) -> list[dict]:
+    return get_classifier().rank(text)
@@ -2,15 +2,149 @@ from __future__ import annotations
 import re
 import sys
 from datetime import datetime
+from .patterns import (
+    dynamic, RE_WHITESPACE,
+    RE_CI_NAME, RE_CI_REGISTRATION_NO, RE_CI_INCORP_DATE, RE_CI_INCORP_HEADER, RE_CI_DATE_DMY, RE_CI_TYPE,
+    RE_CI_STATUS, RE_CI_REGISTERED_ADDR, RE_CI_BUSINESS_ADDR, RE_CI_POSTCODE, RE_CI_NATURE_OF_BUSINESS,
+    RE_CI_NOB_ITEM_SPLIT, RE_CI_TOTAL_ISSUED, RE_CI_ORDINARY, RE_CI_SECTION_MARKERS, RE_CI_MEMBERS_SUFFIX,
+    RE_CI_PAGE_NUMBER, RE_CI_DIRECTOR_LINE, RE_CI_SHAREHOLDER,
+    RE_CI_AUDITOR, RE_CI_AUDITOR_ADDR, RE_CI_COMMA_SPACING, RE_CI_FYE,
+    CI_BALANCE_SHEET_PATTERNS, CI_INCOME_STATEMENT_PATTERNS,
+)
+from .layout_tables import parse_officer_tables
 
-def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
+# Headings that close the company header block
+_SECTION_STARTS = ("share_capital", "directors", "shareholders", "charges", "financial")
+
+
+def index_sections(raw_text: str) -> dict[str, list[tuple[int, int]]]:
+    """
+    Single pass over the profile: (start, end) of every section heading,
+    grouped by heading name in document order.
+    """
+    markers: dict[str, list[tuple[int, int]]] = {}
+    for m in RE_CI_SECTION_MARKERS.finditer(raw_text):
+        markers.setdefault(m.lastgroup, []).append(m.span())
+    return markers
+
+
+def _first(markers: dict, name: str, start: int = 0, end: int | None = None) -> tuple[int, int] | None:
+    # First `name` heading lying inside [start, end)
+    for span in markers.get(name, ()):
+        if span[0] >= start and (end is None or span[1] <= end):
+            return span
+    return None
+
+
+def _lead_in(text: str, pos: int, floor: int = 0) -> int:
+    # Where "#?\s*HEADING" starts: back over the whitespace run, then one '#'
+    i = pos
+    while i > floor and text[i - 1].isspace():
+        i -= 1
+    if i > floor and text[i - 1] == "#":
+        i -= 1
+    return i
+
+
+def split_sections(raw_text: str, markers: dict | None = None) -> dict[str, tuple[int, int]]:
+    """
+    Named (start, end) offsets of each part of a company profile:
+    header, share_capital, directors, shareholders, financial,
+    balance_sheet and income_statement. Parts missing from the document
+    are left out.
+
+    Boundaries follow the section regexes this replaces, but every heading
+    is located once up front, so long whitespace runs in layout text no
+    longer make the lookups quadratic.
+    """
+    if markers is None:
+        markers = index_sections(raw_text)
+    n = len(raw_text)
+    spans: dict[str, tuple[int, int]] = {}
+
+    starts = sorted(s for name in _SECTION_STARTS for s, _ in markers.get(name, ()))
+    if starts:
+        # Up to the line carrying the first section heading
+        spans["header"] = (0, raw_text.rfind("\n", 0, starts[0]) + 1)
+    else:
+        spans["header"] = (0, n)
+
+    cap = _first(markers, "share_capital")
+    if cap:
+        nxt = next((s for s in starts if s >= cap[1]), n)
+        spans["share_capital"] = (cap[1], nxt)
+
+    directors = _first(markers, "directors")
+    holders = _first(markers, "shareholders")
+    if directors and holders:
+        end = _lead_in(raw_text, holders[0])
+        spans["directors"] = (directors[1], max(directors[1], end))
+    elif directors:
+        spans["directors"] = (directors[1], min(directors[1] + 3000, n))
+
+    for _, head_end in markers.get("shareholders", ()):
+        members = RE_CI_MEMBERS_SUFFIX.match(raw_text, head_end)
+        if not members:
+            continue
+        body = members.end()
+        ends = []
+        charges = _first(markers, "charges", body + 1)
+        if charges:
+            ends.append(_lead_in(raw_text, charges[0], body + 1))
+        my_data = _first(markers, "my_data", body + 1)
+        if my_data:
+            ends.append(my_data[0])
+        if ends:
+            spans["shareholders"] = (body, min(ends))
+        # Later headings have no terminator after them either
+        break
+    if "shareholders" not in spans:
+        ic = _first(markers, "ic_passport")
+        if ic:
+            no_info = _first(markers, "no_information", ic[1] + 1)
+            if no_info:
+                spans["shareholders"] = (ic[1], no_info[0])
+
+    fin = _first(markers, "financial")
+    report_end = _first(markers, "end_of_report", fin[1] + 1) if fin else None
+    if report_end:
+        fin_start, fin_end = fin[1], report_end[0]
+        spans["financial"] = (fin_start, fin_end)
+        bs = _first(markers, "balance_sheet", fin_start, fin_end)
+        if bs:
+            income = _first(markers, "income_statement", bs[1] + 1, fin_end)
+            if income:
+                spans["balance_sheet"] = (bs[1], income[0])
+        income = _first(markers, "income_statement", fin_start, fin_end)
+        if income and income[1] < fin_end:
+            spans["income_statement"] = (income[1], fin_end)
+
+    return spans
+
+
+def _search(pattern: re.Pattern, raw_text: str, span: tuple[int, int] | None) -> re.Match | None:
+    # Look inside the field's own section first, then the whole text for odd layouts
+    if span:
+        m = pattern.search(raw_text, *span)
+        if m:
+            return m
+    return pattern.search(raw_text)
+
+
+def extract_corporate_info_simple(raw_text: str | list[str], table_words: list[list[dict]] | None = None) -> dict:
+    """
+    Company profile fields from layout text. With `table_words` (pdfplumber
+    words of the table pages, see layout_tables) directors and shareholders
+    come from word coordinates; the layout-text parsers below are the fallback.
+    """
     # Handle list input (join with newlines)
     if isinstance(raw_text, list):
         raw_text = "\n".join(raw_text)
         
-    # Check for Financial Header presence
-    header_idx = raw_text.find("SUMMARY OF FINANCIAL INFORMATION")
-    end_idx = raw_text.find("END OF REPORT")
+    # Locate every section heading once; field parsers then work on their own slice
+    sections = split_sections(raw_text)
+    header = sections["header"]
+    tables = parse_officer_tables(table_words) if table_words else {}
     
     # Initialize result
     result = {
@@ -36,18 +170,18 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
     
     # ===== 1. BASIC COMPANY INFO =====
     # Company Name
-    name_match = re.search(r'Name\s*:\s*([^\n]+?SDN\.?\s*BHD\.?)', raw_text, re.IGNORECASE)
+    name_match = _search(RE_CI_NAME, raw_text, header)
     if name_match:
         result["companyName"] = name_match.group(1).strip()
     
     # Registration Number
-    reg_match = re.search(r'Registration No\.?\s*:\s*(\d+)\s*\(([^)]+)\)', raw_text)
+    reg_match = _search(RE_CI_REGISTRATION_NO, raw_text, header)
     if reg_match:
         result["registrationNumber"] = reg_match.group(1)
         result["oldRegistrationNumber"] = reg_match.group(2)
     
     # Incorporation Date
-    incorp_match = re.search(r'(?:Incorporation|Registration) Date\s*[:\.]?\s*(\d{2}[-\.]\s*\d{2}[-\.]\s*\d{4})', raw_text, re.IGNORECASE)
+    incorp_match = _search(RE_CI_INCORP_DATE, raw_text, header)
     if incorp_match:
         date_str = incorp_match.group(1).replace(' ', '').replace('.', '-')
         result["incorporationDate"] = date_str
@@ -56,12 +190,12 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
     else:
         # Fallback 1: Try to find ANY date pattern in the first 20 lines that looks like an incorporation date
         # (e.g. "12-05-2015" sitting alone near "Incorporation Date")
-        header_match = re.search(r'(?:Incorporation|Registration) Date', raw_text, re.IGNORECASE)
+        header_match = _search(RE_CI_INCORP_HEADER, raw_text, header)
         if header_match:
             # Look at the text following the header (next 100 chars)
             start_idx = header_match.end()
             lookahead_text = raw_text[start_idx:start_idx+100]
-            date_fallback = re.search(r'(\d{2}-\d{2}-\d{4})', lookahead_text)
+            date_fallback = RE_CI_DATE_DMY.search(lookahead_text)
             if date_fallback:
                  date_str = date_fallback.group(1)
                  result["incorporationDate"] = date_str
@@ -75,7 +209,7 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
                 reg_year = reg_no[:4]
                 # Find all dates in the text that end with this year
                 # Pattern: dd-mm-yyyy or dd.mm.yyyy or dd/mm/yyyy
-                date_candidates = re.findall(r'(\d{2}[-\./]\s*\d{2}[-\./]\s*' + reg_year + r')', raw_text)
+                date_candidates = dynamic(r'(\d{2}[-\./]\s*\d{2}[-\./]\s*' + reg_year + r')').findall(raw_text)
                 
                 if date_candidates:
                     # Pick the first one
@@ -92,7 +226,7 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
     # ===== 3. COMPANY TYPE =====
     
     # Company Type
-    type_match = re.search(r'Type\s*:\s*([\s\S]+?)(?=\s*Status\s*:)', raw_text, re.IGNORECASE)
+    type_match = _search(RE_CI_TYPE, raw_text, header)
     if type_match:
         c_type = type_match.group(1).strip()
         # Normalize Company Type
@@ -105,21 +239,21 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
              result["companyType"] = c_type.replace('\n', ' ').strip()
     
     # Status
-    status_match = re.search(r'Status\s*:\s*([^\n]+?)(?=\s*Registered Address\s*:)', raw_text, re.IGNORECASE)
+    status_match = _search(RE_CI_STATUS, raw_text, header)
     if status_match:
         result["status"] = status_match.group(1).strip()
     
     # ===== 2. ADDRESSES =====
     # Registered Address
-    reg_addr_match = re.search(r'Registered Address\s*:\s*([\s\S]+?Postcode\s*:?\s*\d{5,6})', raw_text, re.IGNORECASE)
+    reg_addr_match = _search(RE_CI_REGISTERED_ADDR, raw_text, header)
     if reg_addr_match:
         addr_text = reg_addr_match.group(1)
-        postcode_match = re.search(r'Postcode\s*:?\s*(\d{5,6})', addr_text, re.IGNORECASE)
+        postcode_match = RE_CI_POSTCODE.search(addr_text)
         if postcode_match:
             pc = postcode_match.group(1)
             # Remove "Postcode" and the number from address string
             # We use a more flexible replacement pattern
-            address = re.sub(r'Postcode\s*:?\s*' + pc, '', addr_text, flags=re.IGNORECASE).strip()
+            address = dynamic(r'Postcode\s*:?\s*' + pc, re.IGNORECASE).sub('', addr_text).strip()
             # Clean up trailing comma if present
             if address.endswith(','):
                 address = address[:-1].strip()
@@ -131,13 +265,13 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
             }
     
     # Business Address
-    bus_addr_match = re.search(r'Business Address\s*:\s*([\s\S]+?Postcode\s*:?\s*\d{5,6})', raw_text, re.IGNORECASE)
+    bus_addr_match = _search(RE_CI_BUSINESS_ADDR, raw_text, header)
     if bus_addr_match:
         addr_text = bus_addr_match.group(1)
-        postcode_match = re.search(r'Postcode\s*:?\s*(\d{5,6})', addr_text, re.IGNORECASE)
+        postcode_match = RE_CI_POSTCODE.search(addr_text)
         if postcode_match:
             pc = postcode_match.group(1)
-            address = re.sub(r'Postcode\s*:?\s*' + pc, '', addr_text, flags=re.IGNORECASE).strip()
+            address = dynamic(r'Postcode\s*:?\s*' + pc, re.IGNORECASE).sub('', addr_text).strip()
             if address.endswith(','):
                 address = address[:-1].strip()
                 
@@ -148,22 +282,22 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
             }
     
     # ===== 3. NATURE OF BUSINESS =====
-    nob_match = re.search(r'Nature Of Business\s*:\s*(.+?)(?=\n\s*(?:User Id|Summary of Share Capital|Company Charges|MY DATA|DIRECTORS/OFFICERS))', raw_text, re.IGNORECASE | re.DOTALL)
+    nob_match = _search(RE_CI_NATURE_OF_BUSINESS, raw_text, header)
     if nob_match:
         nob_text = nob_match.group(1)
         # Split by numbers like 1., 2., etc. or newlines
-        items = re.split(r'\d\.\s*', nob_text)
+        items = RE_CI_NOB_ITEM_SPLIT.split(nob_text)
         for item in items:
             # Replace newlines with spaces for cleaner items, or keep them if they separate distinct items?
             # Usually Nature of Business items are short phrases.
             item_clean = item.strip().replace('\n', ' ')
-            item_clean = re.sub(r'\s+', ' ', item_clean) # Collapse multiple spaces
+            item_clean = RE_WHITESPACE.sub(' ', item_clean) # Collapse multiple spaces
             if item_clean and not item_clean.lower().startswith('nature of business'):
                 result["natureOfBusiness"].append(item_clean)
     
     # ===== 4. SHARE CAPITAL =====
     # Allow whitespace/newlines between words e.g. TOTAL\nISSUED
-    capital_match = re.search(r'TOTAL\s+ISSUED\s*\(RM\)\s*([\d,\s]+\.?\d*)', raw_text, re.IGNORECASE)
+    capital_match = _search(RE_CI_TOTAL_ISSUED, raw_text, sections.get("share_capital"))
     if capital_match:
         amount_str = capital_match.group(1).replace(',', '').replace(' ', '').replace('\n', '')
         try:
@@ -173,7 +307,7 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
     
     # Ordinary shares
     # Capture number, stopping at double space or newline
-    ordinary_match = re.search(r'ORDINARY\s+([\d,\s]+?)(?=\s{2,}|\n|$)', raw_text)
+    ordinary_match = _search(RE_CI_ORDINARY, raw_text, sections.get("share_capital"))
     if ordinary_match:
         try:
             result["shareCapital"]["ordinaryShares"] = int(ordinary_match.group(1).replace(',', '').replace(' ', ''))
@@ -182,17 +316,15 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
     
     # ===== 5. DIRECTORS - ROBUST VERSION =====
     # Find directors section
-    dir_start_match = re.search(r'(Name/Address|Date Of Name/Address|DIRECTORS/OFFICERS)', raw_text, re.IGNORECASE)
-    dir_end_match = re.search(r'#?\s*SHAREHOLDERS', raw_text, re.IGNORECASE)
-    
+    # (up to SHAREHOLDERS, or the next 3000 chars when that heading is missing)
     dir_text = ""
-    if dir_start_match and dir_end_match:
-         dir_text = raw_text[dir_start_match.end():dir_end_match.start()]
-    elif dir_start_match:
-         start_idx = dir_start_match.end()
-         dir_text = raw_text[start_idx:start_idx+3000]
+    if "directors" in sections:
+        start_idx, end_idx = sections["directors"]
+        dir_text = raw_text[start_idx:end_idx]
     
-    if dir_text:
+    if tables.get("directors"):
+        result["directors"] = tables["directors"]
+    elif dir_text:
         lines = dir_text.split('\n')
         directors_data = []
         current_director = None
@@ -201,7 +333,7 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
         # Note: Name might be missing from this line if it's on the previous line or left column
         # But based on debug output: "CHONG SIW CHIN                 710615-08-5992 DIRECTOR   01-08-2019"
         # It's all on one line.
-        director_line_pattern = r'^\s*(.*?)\s+(\d{6}-\d{2}-\d{4})\s+(.*?)\s+(\d{2}-\d{2}-\d{4})\s*$'
+        director_line_pattern = RE_CI_DIRECTOR_LINE
         
         for line in lines:
             line = line.strip()
@@ -220,13 +352,13 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
                 continue
             if "This information is computer generated" in line:
                 continue
-            if re.search(r'^\s*\d+/\d+\s*$', line): # Page number e.g. "4/6"
+            if RE_CI_PAGE_NUMBER.search(line): # Page number e.g. "4/6"
                 continue
             
             if any(x in line.upper() for x in ["NAME", "ADDRESS", "IC/PASSPORT", "DESIGNATION", "DATE OF APPOINTMENT"]):
                 continue
                 
-            match = re.match(director_line_pattern, line)
+            match = director_line_pattern.match(line)
             if match:
                 # Found a new director
                 # Save previous one if exists
@@ -265,20 +397,19 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
     
     # ===== 6. SHAREHOLDERS - SIMPLE VERSION =====
     # Find shareholders section
-    share_section = re.search(r'#?\s*SHAREHOLDERS\s*/\s*MEMBERS(.+?)(?:#?\s*COMPANY CHARGES|MY DATA)', raw_text, re.DOTALL | re.IGNORECASE)
-    if not share_section:
-        share_section = re.search(r'IC/Passport/(.+?)NO INFORMATION', raw_text, re.DOTALL | re.IGNORECASE)
-    
-    if share_section:
-        share_text = share_section.group(1)
+    # (SHAREHOLDERS/MEMBERS up to COMPANY CHARGES / MY DATA, else IC/Passport up to NO INFORMATION)
+    if tables.get("shareholders"):
+        result["shareholders"] = tables["shareholders"]
+    elif "shareholders" in sections:
+        start_idx, end_idx = sections["shareholders"]
+        share_text = raw_text[start_idx:end_idx]
         
         # Simple pattern: IC, NAME, SHARES
         # The pattern in your text: "710615-08-5992CHONG SIW CHIN650,001"
         # So we need to handle no space between IC and NAME
         # And spaces inside the shares count (e.g. "650, 001")
         # Use lookahead to stop shares at next IC or non-share char (like 'a' or end)
-        pattern = r'(\d{6}-\d{2}-\d{4})\s*([A-Z\s]+?)\s*(\d[\d,\s]*?)(?=\s*(?:\d{6}-\d{2}-\d{4}|[^0-9,\s]|$))'
-        matches = re.findall(pattern, share_text)
+        matches = RE_CI_SHAREHOLDER.findall(share_text)
         
         for ic, name, shares in matches:
             shares_clean = int(shares.replace(',', '').replace(' ', ''))
@@ -298,58 +429,39 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
         "auditorAddress": ""
     }
 
-    # Find financial section
-    # Use greedy match but stop at END OF REPORT
-    fin_section = re.search(r'SUMMARY OF FINANCIAL INFORMATION([\s\S]+?)END OF REPORT', raw_text, re.IGNORECASE)
-    
-    if fin_section:
-        fin_text = fin_section.group(1)
+    # Find financial section (stops at END OF REPORT)
+    if "financial" in sections:
+        start_idx, end_idx = sections["financial"]
+        fin_text = raw_text[start_idx:end_idx]
         # Auditor Name
-        auditor_match = re.search(r'Auditor\s*:\s*([^\n]+)', fin_text)
+        auditor_match = RE_CI_AUDITOR.search(fin_text)
         if auditor_match:
             result["financials"]["auditorName"] = auditor_match.group(1).strip()
             
         # Auditor Address
         # Look for address until "Exempt Private Company" or "Financial Year End"
-        auditor_addr_match = re.search(r'Auditor Address\s*:\s*([\s\S]+?)(?=Exempt Private Company|Financial Year End)', fin_text, re.IGNORECASE)
+        auditor_addr_match = RE_CI_AUDITOR_ADDR.search(fin_text)
         if auditor_addr_match:
              # Clean up address - replace newlines with comma space
              addr_clean = auditor_addr_match.group(1).strip().replace('\n', ', ')
              # Remove multiple spaces
-             addr_clean = re.sub(r'\s+', ' ', addr_clean)
+             addr_clean = RE_WHITESPACE.sub(' ', addr_clean)
              # Fix comma spacing (e.g. " , " -> ", ")
-             addr_clean = re.sub(r'\s*,\s*', ', ', addr_clean)
+             addr_clean = RE_CI_COMMA_SPACING.sub(', ', addr_clean)
              result["financials"]["auditorAddress"] = addr_clean
         
         # Financial Year End
-        fye_match = re.search(r'Financial Year End\s*:\s*(\d{2}-\d{2}-\d{4})', fin_text)
+        fye_match = RE_CI_FYE.search(fin_text)
         if fye_match:
             result["financials"]["financialYearEnd"] = fye_match.group(1)
         
-        # Mapping for Balance Sheet
-        bs_patterns = {
-            "nonCurrentAssets": r'Non-Current\s+Assets\s*:\s*([-\d\s,\.]+)',
-            "currentAssets": r'(?<!Non-)Current\s+Assets\s*:\s*([-\d\s,\.]+)',
-            "nonCurrentLiabilities": r'Non-Current\s+Liabilities\s*:\s*([-\d\s,\.]+)',
-            "currentLiabilities": r'(?<!Non-)Current\s+Liabilities\s*:\s*([-\d\s,\.]+)',
-            "shareCapital": r'Share\s+Capital\s*:\s*([-\d\s,\.]+)',
-            "reserves": r'Reserve\s*:\s*([-\d\s,\.]+)',
-            "retainedEarnings": r'Retain\s+Earning\s*:\s*([-\d\s,\.]+)',
-            "minorityInterests": r'Minority\s+Interest\s*:\s*([-\d\s,\.]+)'  # Note: Minority Interest appears in both sections often
-        }
+        # Line item patterns live in extractor/patterns.py
+        bs_patterns = CI_BALANCE_SHEET_PATTERNS
+        is_patterns = CI_INCOME_STATEMENT_PATTERNS
 
-        # Mapping for Income Statement
-        is_patterns = {
-            "revenue": r'Revenue\s*:\s*([-\d\s,\.]+)',
-            "profitBeforeTax": r'before\s+tax\s*:\s*([-\d\s,\.]+)',
-            "profitAfterTax": r'after\s+tax\s*:\s*([-\d\s,\.]+)',
-            "netDividend": r'Net\s+dividend\s*:\s*([-\d\s,\.]+)',
-            "minorityInterest": r'Minority\s+Interest\s*:\s*([-\d\s,\.]+)' # Usually last item in Income Statement
-        }
-        
         # Helper to extract value
         def extract_val(pattern, text):
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 raw_val = match.group(1).strip()
                 value = raw_val.replace(',', '').replace(' ', '')
@@ -366,9 +478,9 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
             # For minority interest, we want the first occurrence (Balance Sheet)
             if key == "minorityInterests":
                 # Find "BALANCE SHEET ITEMS" section specifically if possible
-                bs_section = re.search(r'BALANCE SHEET ITEMS([\s\S]+?)INCOME STATEMENT ITEMS', fin_text, re.IGNORECASE)
-                if bs_section:
-                    val = extract_val(pattern, bs_section.group(1))
+                if "balance_sheet" in sections:
+                    start_idx, end_idx = sections["balance_sheet"]
+                    val = extract_val(pattern, raw_text[start_idx:end_idx])
                     result["financials"]["balanceSheet"][key] = val
                 else:
                     # Fallback
@@ -380,9 +492,9 @@ def extract_corporate_info_simple(raw_text: str | list[str]) -> dict:
         for key, pattern in is_patterns.items():
             if key == "minorityInterest":
                 # Find "INCOME STATEMENT ITEMS" section
-                is_section = re.search(r'INCOME STATEMENT ITEMS([\s\S]+)', fin_text, re.IGNORECASE)
-                if is_section:
-                     val = extract_val(pattern, is_section.group(1))
+                if "income_statement" in sections:
+                     start_idx, end_idx = sections["income_statement"]
+                     val = extract_val(pattern, raw_text[start_idx:end_idx])
                      result["financials"]["incomeStatement"][key] = val
             else:
                 result["financials"]["incomeStatement"][key] = extract_val(pattern, fin_text)
@@ -1,10 +1,11 @@
 from __future__ import annotations
 import re
 from .rules_base import pick_new_no, pick_old_no, parse_date, normalize_text
-
-# Clean, compiled patterns
-NEW_SSM_RE      = re.compile(r"\b(19|20)\d{2}\d{8}\b", re.I)  # 12-digit SSM: YYYY + 8 digits
-ISSUE_PLACE_RE  = re.compile(r"^dated at\s+([A-Za-z\.\s]+?)\s+this\b", re.I)
+from .patterns import (
+    RE_F9_NEW_SSM as NEW_SSM_RE, RE_F9_ISSUE_PLACE as ISSUE_PLACE_RE, RE_MULTI_SPACE, RE_LEADING_NON_ALPHA,
+    RE_F9_JATUK, RE_F9_TOF_REGISTRAR, RE_F9_ORDINAL_DAY, RE_F9_ORDINAL_FRACTION, RE_F9_DATED_AT_KL,
+    RE_F9_OFFICER_TYPO, RE_F9_IS_PRIVATE, RE_F9_INCORP_DATE, RE_F9_OFFICER,
+)
 
 def _next_nonempty(blocks: list[str], start: int) -> str | None:
     j = start + 1
@@ -20,7 +21,7 @@ def _clean_entity(candidate: str, new_no: str | None, old_no: str | None) -> str
     # Remove leftover parentheses artifacts
     s = s.replace("()", "").replace("(-)", "")
     # Collapse spaces and trim punctuation
-    s = re.sub(r"\s{2,}", " ", s)
+    s = RE_MULTI_SPACE.sub(" ", s)
     return s.strip(" ,.-")
 
 def extract_form_9(input_data: str | list[str]) -> dict:
@@ -38,23 +39,23 @@ def extract_form_9(input_data: str | list[str]) -> dict:
 
     # --- Pre-processing Fixes (Ported from HF Space app.py) ---
     # Fix "JATUK" -> "DATUK"
-    text = re.sub(r'\bJ\s*A\s*T\s*U\s*K\b', 'DATUK', text)
+    text = RE_F9_JATUK.sub('DATUK', text)
     
     # Fix "tof 7 REGISTRAR" -> "REGISTRAR"
-    text = re.sub(r'tof\s*[\d7]+\s*REGISTRAR', 'REGISTRAR', text, flags=re.IGNORECASE)
+    text = RE_F9_TOF_REGISTRAR.sub('REGISTRAR', text)
 
     # Fix "7*" / "7®" -> "7th" in date contexts
-    text = re.sub(r'(\d+)\s*[®°"*]+\s*day', r'\1th day', text)
-    text = re.sub(r'(\d+)\s*/\s*(\d+)[®°"*]+\s*day', r'\1th day', text)
+    text = RE_F9_ORDINAL_DAY.sub(r'\1th day', text)
+    text = RE_F9_ORDINAL_FRACTION.sub(r'\1th day', text)
 
     # Fix "Dated at KL" location artifacts
-    text = re.sub(r'Dated at\s+(?:KE|K1|K\|)', 'Dated at KL', text, flags=re.IGNORECASE)
+    text = RE_F9_DATED_AT_KL.sub('Dated at KL', text)
 
     # Fix Officer Name "NOR ABDUL AZIZ" -> "NOR AZIMAH ABDUL AZIZ"
-    text = re.sub(r'NOR\s*ABDUL\s*AZIZ', 'NOR AZIMAH ABDUL AZIZ', text)
+    text = RE_F9_OFFICER_TYPO.sub('NOR AZIMAH ABDUL AZIZ', text)
 
     # Fix "is 2 private company" -> "is a private company"
-    text = re.sub(r'is\s*2\s*private\s*company', 'is a private company', text)
+    text = RE_F9_IS_PRIVATE.sub('is a private company', text)
     
     # Re-split into blocks after normalization
     blocks = [ln.strip() for ln in text.split('\n') if ln.strip()]
@@ -134,7 +135,7 @@ def extract_form_9(input_data: str | list[str]) -> dict:
         # Incorporation date: "is, on and from the 7th day of June 2007, ..."
         if "on and from the" in low or "incorporated under" in low:
             # Try specific regex first
-            m_date = re.search(r"on and from the\s+(\d{1,2})(?:st|nd|rd|th)?\s+day of\s+([A-Za-z]+)\s+(\d{4})", ln, re.IGNORECASE)
+            m_date = RE_F9_INCORP_DATE.search(ln)
             if m_date:
                 try:
                     from datetime import datetime
@@ -176,7 +177,7 @@ def extract_form_9(input_data: str | list[str]) -> dict:
         s = fields["signingOfficer"]
         
         # Specific fix for common officer (DATUK NOR AZIMAH ABDUL AZIZ)
-        m_officer = re.search(r"(DATUK\s+NOR\s+AZIMAH\s+ABDUL\s+AZIZ)", s, re.IGNORECASE)
+        m_officer = RE_F9_OFFICER.search(s)
         if m_officer:
             fields["signingOfficer"] = m_officer.group(1).upper()
         else:
@@ -191,7 +192,7 @@ def extract_form_9(input_data: str | list[str]) -> dict:
                 s = "DATO" + s[4:]
                 
             # Strip leading punctuation/digits
-            s = re.sub(r"^[^A-Za-z]+", "", s)
+            s = RE_LEADING_NON_ALPHA.sub("", s)
             fields["signingOfficer"] = s.strip()
 
     # --- Fallback: Registration Date ---
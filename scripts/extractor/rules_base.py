@@ -1,13 +1,10 @@
 import re
 from statistics import mean
-
-RE_NEW_SSM  = re.compile(r"\b(19|20)\d{2}\d{8}\b")
-RE_LLP_NEW  = re.compile(r"\b\d{14,15}\b")
-RE_OLD_ROC  = re.compile(r"\b\d{6,7}-[A-Z]\b")
-RE_OLD_ROB  = re.compile(r"\b[A-Z]{1,2}\d{6,7}-[A-Z]\b")
-RE_LLP_LEG  = re.compile(r"\b(?:LLP|llp)\s*\d{3,10}\s*-\s*[A-Z0-9](?:\s*[A-Z0-9]){1,4}\b")
-RE_DATE     = re.compile(r"\b(\d{1,2})([a-z]{0,2})?\s*(?:day\s+of\s+)?([A-Za-z\.]+)\s+(\d{4})\b", re.I)
-RE_DATE_NUMERIC = re.compile(r"\b(\d{1,2})[-/](\d{1,2})[-/](\d{4})\b")
+from .patterns import (
+    RE_NEW_SSM, RE_NEW_SSM_LOOSE, RE_LLP_NEW, RE_OLD_ROC, RE_OLD_ROB, RE_LLP_LEG,
+    RE_DATE, RE_DATE_NUMERIC, RE_SPACE_OR_DOT, RE_WHITESPACE,
+)
+from .classifier import get_classifier
 
 MONTHS = {
  "JANUARY":"01","FEBRUARY":"02","MARCH":"03","APRIL":"04","MAY":"05","JUNE":"06",
@@ -40,9 +37,8 @@ def pick_new_no(text: str):
     for m in RE_NEW_SSM.finditer(text): return m.group(0)
     
     # Fallback for spaces/dots
-    matches = re.finditer(r"\b(19|20)[\d\s\.]{10,15}\b", text)
-    for m in matches:
-        clean = re.sub(r"[\s\.]", "", m.group(0))
+    for m in RE_NEW_SSM_LOOSE.finditer(text):
+        clean = RE_SPACE_OR_DOT.sub("", m.group(0))
         if len(clean) == 12 and clean[:2] in ["19", "20"]:
             return clean
     return None
@@ -59,53 +55,12 @@ def pick_old_no(text: str):
         m = pat.search(text)
         if m:
             # Remove all whitespace from the match
-            return re.sub(r"\s+", "", m.group(0))
+            return RE_WHITESPACE.sub("", m.group(0))
     return None
 
 def avg_confidence(confs):
     return mean(confs) if confs else 0.0
 
 def classify_doc(all_text: str) -> str:
-    # Normalize whitespace to single spaces to handle line breaks in phrases
-    t = re.sub(r'\s+', ' ', all_text).upper()
-    
-    # Relaxed matching for FORM_D
-    if "FORM D" in t or "FORMD" in t: 
-        return "FORM_D"
-        
-    # CORPORATE INFO
-    if "CORPORATE INFORMATION" in t or "COMPANY PROFILE" in t or "MAKLUMAT KORPORAT" in t:
-        return "CORPORATE_INFO"
-
-    # FORM 9 / Section 17
-    # Handles "CERTIFICATE OF INCORPORATION" (with/without spaces), "INCORPORATED UNDER...", "COMPANIES ACT 2016" etc.
-    # Also handles typos like "OFINCORPORATION" or "INCORPORATION OF PRIVATE COMPANY"
-    has_incorp_cert = (
-        "CERTIFICATE OF INCORPORATION" in t or 
-        "CERTIFICATE OFINCORPORATION" in t or 
-        "INCORPORATED UNDER THE COMPANIES ACT" in t or
-        "INCORPORATION OF PRIVATE COMPANY" in t
-    )
-    has_act_ref = (
-        "COMPANIES ACT" in t or 
-        "SECTION 17" in t or 
-        "ACT 2016" in t or 
-        "ACT 1965" in t or
-        "SURUHANJAYA" in t # Strong indicator of SSM document
-    )
-    
-    if has_incorp_cert and has_act_ref:
-        return "FORM_9"
-        
-    # Fallback for Form 9: "SDN BHD" + "MALAYSIA"
-    # Handles cases where headers are completely garbled but content is clear
-    if ("SDN. BHD." in t or "SDNBHD" in t or "BERHAD" in t) and "MALAYSIA" in t:
-         return "FORM_9"
-        
-    if "LIMITED LIABILITY PARTNERSHIPS ACT" in t and "CERTIFICATE OF REGISTRATION" in t:
-        return "LLP_CERT"
-        
-    if "CORPORATE INFORMATION" in t and ("COMPANIES COMMISSION OF MALAYSIA" in t or "SURUHANJAYA SYARIKAT MALAYSIA" in t):
-        return "CORPORATE_INFO"
-
-    return "UNKNOWN"
+    """Best doc type for the text (classifier.py, types in doc_types.json), or "UNKNOWN"."""
+    return get_classifier().classify(all_text)
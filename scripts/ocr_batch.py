@@ -0,0 +1,387 @@
+"""
+Batch extraction over a directory, glob or manifest of SSM documents.
+
+Native PDF text, the local QR fast path, page preprocessing and the extractors
+run in a process pool; documents that need remote OCR are fanned out
+concurrently through the async OCR client, one upload per page. Without
+HF_API_URL, or while the Space is down, saturated or slow, documents are
+OCR'd locally in the pool instead (ocr_local.py). Results
+stream to JSONL as they complete, a checkpoint file records finished inputs
+so an interrupted run can resume (documents that failed are tried again and
+their row replaced), and throughput is reported at the end.
+
+Usage:
+    python scripts/ocr_batch.py "sample/SSM Cert" -o results.jsonl
+    python scripts/ocr_batch.py "uploads/**/*.pdf" -o results.jsonl --workers 4
+    python scripts/ocr_batch.py manifest.txt -o results.jsonl --resume
+
+Python API:
+    summary = asyncio.run(run_batch(iter_inputs("sample/SSM Cert"), "results.jsonl"))
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from ocr_metrics import collect, span
+
+SUPPORTED_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".webp")
+
+_service = None
+
+
+def iter_inputs(spec: str, recursive: bool = True) -> list[str]:
+    """
+    Resolves a directory, glob pattern or manifest (.txt with one path per
+    line, or .jsonl with a "path" field) into a sorted list of files.
+    """
+    if os.path.isdir(spec):
+        pattern = os.path.join(spec, "**", "*") if recursive else os.path.join(spec, "*")
+        paths = glob.glob(pattern, recursive=recursive)
+    elif os.path.isfile(spec) and spec.lower().endswith((".txt", ".jsonl", ".manifest")):
+        base = os.path.dirname(os.path.abspath(spec))
+        paths = []
+        with open(spec, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                path = json.loads(line)["path"] if line.startswith("{") else line
+                paths.append(path if os.path.isabs(path) else os.path.join(base, path))
+    else:
+        paths = glob.glob(spec, recursive=True)
+
+    return sorted(p for p in paths if os.path.isfile(p) and p.lower().endswith(SUPPORTED_EXTENSIONS))
+
+
+# ---------------------------------------------------------
+# Worker-side stages (run in the process pool)
+# ---------------------------------------------------------
+def _init_worker(workers: int = 1):
+    global _service
+    if current_dir not in sys.path:
+        sys.path.append(current_dir)
+    # Documents are already spread across the pool; keep page extraction serial
+    # and share the cores between the workers' local OCR engines
+    os.environ.setdefault("OCR_PDF_WORKERS", "1")
+    os.environ.setdefault("OCR_LOCAL_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+    import ocr_service
+    for name in ocr_service.WARM_IMPORTS:
+        ocr_service.lazy_import(name)
+    _service = ocr_service
+
+
+# Rows never include the trace, so the stages run with tracing off (nothing
+# formatted per document); stage timings are still collected per step and
+# summed into the row's timings_ms.
+def _local_stage(path: str) -> dict:
+    """Stage-1 cache lookup, native PDF text and the QR fast path. Never touches the network."""
+    with collect() as timings:
+        trace_steps, add_trace, start = _service.new_trace(enabled=False)
+        key, stage1 = _service.cached_ocr_lines(path, add_trace)
+        from_cache = stage1 is not None
+        qr_payload = None
+        if stage1 is None:
+            stage1 = _service.extract_native(path, add_trace)
+            if stage1 is None and _service.qr_fast_path_enabled():
+                stage1, qr_payload = _service.qr_fast_path(path, add_trace)
+            # Mixed PDFs are cached once their image pages are OCR'd
+            if stage1 and not stage1.get("ocr_pages"):
+                if key is not None:
+                    _service.cache_set(_service.get_cache(), key, stage1, add_trace)
+    return {"stage1": stage1, "from_cache": from_cache, "cache_key": key, "qr_payload": qr_payload,
+            "trace": trace_steps, "start": start, "timings": timings.as_ms()}
+
+
+def _prepare_uploads(path: str, pages: list[int] | None = None) -> dict:
+    """Upload bodies for `path` (ocr_service.remote_uploads), built in the pool."""
+    with collect() as timings:
+        _, add_trace, _ = _service.new_trace(enabled=False)
+        uploads = list(_service.remote_uploads(path, add_trace, pages))
+    return {"uploads": uploads, "timings": timings.as_ms()}
+
+
+def _run_local_ocr(path: str, pages: list[int] | None = None) -> dict:
+    """Local OCR of `path` (ocr_local.py) in the pool; the response is shaped like the Space's."""
+    import ocr_local
+    with collect() as timings:
+        data = ocr_local.recognize_document(path, pages)
+    return {"data": data, "timings": timings.as_ms()}
+
+
+def _parse_remote(data: dict, trace_steps: list, start: float, native: dict | None = None,
+                  source: str = "remote") -> dict:
+    """Remote /ocr response -> stage 1; with `native`, merged into its image pages."""
+    with collect() as timings, span("ocr_clean"):
+        _, add_trace, _ = _service.new_trace(start, trace_steps, enabled=False)
+        lines, qr_payload, page_sizes = _service.parse_remote_response(data, add_trace)
+        if native is not None:
+            stage1 = _service.merge_pages(native, lines, qr_payload, page_sizes, add_trace)
+        else:
+            stage1 = {"source": source, "lines": lines, "qr_payload": qr_payload, "page_sizes": page_sizes}
+    return {"stage1": stage1, "trace": trace_steps, "timings": timings.as_ms()}
+
+
+def _finish_stage(stage1: dict, trace_steps: list, start: float) -> dict:
+    with collect() as timings:
+        _, add_trace, _ = _service.new_trace(start, trace_steps, enabled=False)
+        result = _service.build_result(stage1, add_trace, trace_steps, start)
+    result["timings_ms"] = timings.as_ms()
+    return result
+
+
+def _merge_timings(*parts: dict) -> dict:
+    merged = {}
+    for part in parts:
+        for name, ms in part.items():
+            merged[name] = round(merged.get(name, 0.0) + ms, 3)
+    return merged
+
+
+# ---------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------
+def _read_rows(path: str) -> list[dict]:
+    # An interrupted run usually leaves a half-written last line; skip it
+    # (and anything else unreadable) rather than refuse to resume
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                sys.stderr.write(f"Skipping unreadable line {number} of {path}\n")
+    return rows
+
+
+def _compact(path: str):
+    """
+    Rewrites a JSONL output or checkpoint with only the last row per input,
+    in the order inputs first appeared, dropping unreadable lines.
+    """
+    if not os.path.exists(path):
+        return
+    latest = {}
+    for row in _read_rows(path):
+        if "path" in row:
+            latest[os.path.abspath(row["path"])] = row
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for row in latest.values():
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+
+
+def _load_checkpoint(path: str | None) -> set[str]:
+    # Only successes count as done: a failure (often a transient remote
+    # error) is retried on the next --resume
+    done = set()
+    if path and os.path.exists(path):
+        for row in _read_rows(path):
+            if row.get("success") and "path" in row:
+                done.add(row["path"])
+    return done
+
+
+def _summarize(result: dict, path: str, include_text: bool) -> dict:
+    if "error" in result:
+        return {"path": path, "success": False, "error": result["error"]}
+    row = {
+        "path": path,
+        "success": True,
+        "docType": result["extracted_data"].get("docType"),
+        "confidence": result["extracted_data"].get("confidence"),
+        "processing_time_ms": round(result["processing_time_ms"], 1),
+        "extracted_data": {k: v for k, v in result["extracted_data"].items() if k not in ("rawText", "trace")},
+        "timings_ms": result.get("timings_ms", {}),
+    }
+    if include_text:
+        row["text"] = result["text"]
+    return row
+
+
+async def run_batch(paths: list[str], output: str, checkpoint: str | None = None,
+                    workers: int | None = None, concurrency: int | None = None,
+                    include_text: bool = False, resume: bool = False) -> dict:
+    """
+    Processes `paths`, writing one JSON line per document to `output`.
+    With `resume`, inputs `checkpoint` records as successful are skipped and
+    rows are appended to `output`, which then keeps only the latest row per
+    input (a retried failure is replaced by its new row); otherwise both
+    files start empty.
+    Returns a summary with throughput in documents per second.
+    """
+    from ocr_client import client_from_env, merge_responses, RemoteOcrError
+    from ocr_cache import get_cache
+    import ocr_local
+
+    workers = workers or max(1, os.cpu_count() or 1)
+    concurrency = concurrency or workers * 2
+    checkpoint = checkpoint or output + ".checkpoint"
+    mode = "a" if resume else "w"
+
+    done = set()
+    if resume:
+        # Also drops a half-written last line, so the next row starts clean
+        _compact(output)
+        _compact(checkpoint)
+        done = _load_checkpoint(checkpoint)
+    pending = [p for p in paths if os.path.abspath(p) not in done]
+    summary = {"total": len(paths), "skipped": len(paths) - len(pending), "ok": 0, "failed": 0,
+               "native": 0, "qr": 0, "remote": 0, "local": 0, "mixed": 0, "cached": 0, "upload_bytes": 0}
+
+    remote_url = os.environ.get("HF_API_URL")
+    # Own client per run: its connection pool and semaphore belong to this event loop
+    client = client_from_env(remote_url, os.environ.get("HF_TOKEN")) if remote_url else None
+    local_ocr = ocr_local.enabled()
+    # Local reads standing in for the Space are not cached (ocr_local.stands_in)
+    fallback = ocr_local.stands_in(client is not None)
+
+    loop = asyncio.get_running_loop()
+    gate = asyncio.Semaphore(concurrency)
+    write_lock = asyncio.Lock()
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers,)) as pool, \
+            open(output, mode, encoding="utf-8") as out, \
+            open(checkpoint, mode, encoding="utf-8") as ckpt:
+
+        async def _cache_stage1(key, stage1):
+            if key and stage1["lines"]:
+                cache = get_cache()
+                if cache is not None:
+                    await asyncio.to_thread(cache.set, key, stage1)
+
+        async def remote(path: str, pages, timings: list) -> dict:
+            # Pages are prepared in the pool, then uploaded in parallel
+            prepared = await loop.run_in_executor(pool, _prepare_uploads, path, pages)
+            timings.append(prepared["timings"])
+            ocr_start = time.perf_counter()
+            responses = await client.ocr_many(prepared["uploads"])
+            timings.append({"remote_ocr": (time.perf_counter() - ocr_start) * 1000})
+            summary["upload_bytes"] += sum(len(data) for data, _ in prepared["uploads"])
+            return responses[0] if len(responses) == 1 else merge_responses(responses)
+
+        async def ocr(path: str, pages, timings: list) -> tuple[dict, str]:
+            # (response, "remote" | "local"): the Space unless ocr_local.choose_engine
+            # says otherwise, and local when the Space fails
+            engine, _ = ocr_local.choose_engine(client)
+            if engine == "remote":
+                try:
+                    return await remote(path, pages, timings), "remote"
+                except RemoteOcrError:
+                    if not local_ocr:
+                        raise
+            ran = await loop.run_in_executor(pool, _run_local_ocr, path, pages)
+            timings.append(ran["timings"])
+            return ran["data"], "local"
+
+        async def handle(path: str):
+            async with gate:
+                try:
+                    local = await loop.run_in_executor(pool, _local_stage, path)
+                    stage1, trace_steps, t0 = local["stage1"], local["trace"], local["start"]
+                    timings = [local["timings"]]
+
+                    if stage1 is not None and stage1.get("ocr_pages") and (client is not None or local_ocr):
+                        # Mixed PDF: OCR only the pages without a text layer
+                        summary["mixed"] += 1
+                        try:
+                            data, source = await ocr(path, stage1["ocr_pages"], timings)
+                        except Exception:
+                            # Like ocr_service._ocr_image_pages: the native pages
+                            # still make a result, which is not cached
+                            stage1.pop("page_texts", None)
+                        else:
+                            parsed = await loop.run_in_executor(pool, _parse_remote, data, trace_steps, t0, stage1)
+                            stage1, trace_steps = parsed["stage1"], parsed["trace"]
+                            timings.append(parsed["timings"])
+                            if not (source == "local" and fallback):
+                                await _cache_stage1(local["cache_key"], stage1)
+                    elif stage1 is not None:
+                        summary["cached" if local["from_cache"] else stage1["source"]] += 1
+                    elif client is None and not local_ocr:
+                        raise RemoteOcrError("Remote OCR URL (HF_API_URL) not configured and no local OCR "
+                                             "backend is installed.")
+                    else:
+                        data, source = await ocr(path, None, timings)
+                        parsed = await loop.run_in_executor(pool, _parse_remote, data, trace_steps, t0, None, source)
+                        stage1, trace_steps = parsed["stage1"], parsed["trace"]
+                        stage1["qr_payload"] = stage1["qr_payload"] or local["qr_payload"]
+                        timings.append(parsed["timings"])
+                        summary[source] += 1
+                        if not (source == "local" and fallback):
+                            await _cache_stage1(local["cache_key"], stage1)
+
+                    result = await loop.run_in_executor(pool, _finish_stage, stage1, trace_steps, t0)
+                    result["timings_ms"] = _merge_timings(*timings, result.get("timings_ms", {}))
+                except Exception as e:
+                    result = {"error": str(e)}
+
+                row = _summarize(result, path, include_text)
+                async with write_lock:
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    out.flush()
+                    ckpt.write(json.dumps({"path": os.path.abspath(path), "success": row["success"]}) + "\n")
+                    ckpt.flush()
+                summary["ok" if row["success"] else "failed"] += 1
+
+        try:
+            await asyncio.gather(*(handle(p) for p in pending))
+        finally:
+            if client is not None:
+                await client.aclose()
+
+    elapsed = time.perf_counter() - start
+    processed = summary["ok"] + summary["failed"]
+    summary["elapsed_s"] = round(elapsed, 2)
+    summary["docs_per_s"] = round(processed / elapsed, 2) if elapsed > 0 else 0.0
+    # Share of the documents that needed OCR which the QR code answered alone
+    needed_ocr = summary["qr"] + summary["remote"] + summary["local"]
+    summary["qr_fast_path_rate"] = round(summary["qr"] / needed_ocr, 3) if needed_ocr else 0.0
+    if client is not None:
+        summary["remote_ocr"] = client.metrics()
+    if resume:
+        _compact(output)
+        _compact(checkpoint)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-extract SSM documents to JSONL.")
+    parser.add_argument("inputs", help="Directory, glob pattern or manifest file (.txt / .jsonl)")
+    parser.add_argument("-o", "--output", required=True, help="JSONL output file (with --resume, the latest row per input is kept)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--resume", action="store_true", help="Skip inputs the checkpoint records as successful")
+    parser.add_argument("--workers", type=int, help="Process pool size (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, help="Documents in flight at once (default: 2x workers)")
+    parser.add_argument("--include-text", action="store_true", help="Include the OCR text in each output row")
+    args = parser.parse_args()
+
+    paths = iter_inputs(args.inputs)
+    if not paths:
+        sys.stderr.write(f"No supported documents found for {args.inputs}\n")
+        sys.exit(1)
+
+    summary = asyncio.run(run_batch(paths, args.output, checkpoint=args.checkpoint, workers=args.workers,
+                                    concurrency=args.concurrency, include_text=args.include_text,
+                                    resume=args.resume))
+    sys.stderr.write(json.dumps(summary) + "\n")
+    sys.stderr.write(f"Processed {summary['ok'] + summary['failed']} documents in {summary['elapsed_s']}s "
+                     f"({summary['docs_per_s']} docs/s)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Content-addressed, two-stage cache for process_document.
+
+  stage 1 ("ocr:")     - normalized OCR lines + confidences, keyed by the
+                         SHA-256 of the uploaded file plus a fingerprint of
+                         the settings that change them (ocr_settings_version)
+  stage 2 ("extract:") - classifier + extractor output, keyed by the SHA-256
+                         of the OCR text plus the extractor version
+
+A re-uploaded certificate is served entirely from cache, while a change to the
+extractor rules only invalidates stage 2: the next request (or
+ocr_reextract.py) re-runs the extractors on the stored text without paying for
+remote OCR again.
+
+Backends:
+  memory  - per-process LRU (useful inside long-lived ocr_server workers)
+  sqlite  - on-disk store under storage/cache, shared between processes
+  tiered  - memory in front of sqlite (default)
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+EXTRACTOR_DIR = os.path.join(SCRIPTS_DIR, "extractor")
+DEFAULT_CACHE_DIR = os.path.join(SCRIPTS_DIR, "..", "storage", "cache")
+
+# Bump when native extraction / OCR line cleaning changes what stage 1 stores
+OCR_STAGE_VERSION = 4
+OCR_PREFIX = f"ocr:v{OCR_STAGE_VERSION}:"
+EXTRACT_PREFIX = "extract:"
+
+# Settings that change what stage 1 stores for the same file: the QR fast
+# path, page preprocessing/rasterizing, the OCR engine and native PDF reading
+STAGE1_SETTINGS = (
+    "OCR_QR_FAST_PATH",
+    "OCR_PREPROCESS", "OCR_RASTER_DPI", "OCR_MAX_SIDE", "OCR_MAX_UPLOAD_KB", "OCR_JPEG_QUALITY", "OCR_DESKEW_MAX",
+    "OCR_ENGINE", "OCR_LOCAL_BACKEND", "OCR_LOCAL_REC_MODEL",
+    "OCR_NATIVE_BACKEND", "OCR_PDF_TRIAGE", "OCR_TRIAGE_MIN_CHARS", "OCR_EARLY_EXIT",
+)
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_extractor_version = None
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def extractor_version() -> str:
+    """
+    Fingerprint of the extractor rules: a hash over every extractor/*.py
+    source and the doc type files (extractor/*.json, OCR_DOC_TYPES), so
+    editing any rule changes the cache key.
+    """
+    global _extractor_version
+    if _extractor_version is None:
+        h = hashlib.sha256()
+        paths = [os.path.join(EXTRACTOR_DIR, name) for name in sorted(os.listdir(EXTRACTOR_DIR))
+                 if name.endswith((".py", ".json"))]
+        paths += [p for p in os.environ.get("OCR_DOC_TYPES", "").split(os.pathsep) if p]
+        for path in paths:
+            h.update(os.path.basename(path).encode())
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _extractor_version = h.hexdigest()[:16]
+    return _extractor_version
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def ocr_settings_version() -> str:
+    """
+    Fingerprint of the STAGE1_SETTINGS in effect, so a result produced
+    under one configuration is not served under another. Read on every
+    call: the settings are plain environment variables.
+    """
+    h = hashlib.sha256()
+    for name in STAGE1_SETTINGS:
+        value = os.environ.get(name)
+        if value is not None:
+            h.update(f"{name}={value.strip().lower()}\n".encode())
+    return h.hexdigest()[:8]
+
+
+def ocr_key(digest: str) -> str:
+    return f"{OCR_PREFIX}{ocr_settings_version()}:{digest}"
+
+
+def extraction_key(text: str, variant: str = "") -> str:
+    # variant separates results computed from more than the text (e.g. "tables")
+    key = f"{EXTRACT_PREFIX}{text_digest(text)}:{extractor_version()}"
+    return f"{key}:{variant}" if variant else key
+
+
+class MemoryCache:
+    """In-process LRU with TTL and entry-count eviction."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            created, value = item
+            if self.ttl and time.time() - created > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def items(self, prefix: str = ""):
+        with self._lock:
+            snapshot = [(k, v) for k, (_, v) in self._data.items() if k.startswith(prefix)]
+        yield from snapshot
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class SqliteCache:
+    """
+    On-disk store. Evicts expired rows on read and least-recently-used rows
+    when either the entry count or total payload size exceeds its limit.
+    """
+
+    def __init__(self, path: str | None = None, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "ocr_cache.sqlite")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets several worker processes share the file.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        conn = self._conn()
+        row = conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self.misses += 1
+            return None
+        if self.ttl and now - row[1] > self.ttl:
+            with conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+        with conn:
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict):
+        payload = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        if self.ttl:
+            conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Walk from least recently used until both limits are satisfied
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def delete(self, key: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+    def items(self, prefix: str = ""):
+        # Read-only scan; does not touch access times
+        rows = self._conn().execute(
+            "SELECT key, value FROM entries WHERE substr(key, 1, ?) = ? ORDER BY created",
+            (len(prefix), prefix),
+        )
+        for key, value in rows:
+            yield key, json.loads(value)
+
+    def stats(self) -> dict:
+        count, total = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"backend": "sqlite", "path": self.path, "entries": count, "bytes": total,
+                "hits": self.hits, "misses": self.misses}
+
+
+class TieredCache:
+    """Memory LRU in front of a slower shared backend."""
+
+    def __init__(self, front: MemoryCache, back: SqliteCache):
+        self.front = front
+        self.back = back
+
+    def get(self, key: str):
+        value = self.front.get(key)
+        if value is None:
+            value = self.back.get(key)
+            if value is not None:
+                self.front.set(key, value)
+        return value
+
+    def set(self, key: str, value: dict):
+        self.front.set(key, value)
+        self.back.set(key, value)
+
+    def delete(self, key: str):
+        self.front.delete(key)
+        self.back.delete(key)
+
+    def clear(self):
+        self.front.clear()
+        self.back.clear()
+
+    def items(self, prefix: str = ""):
+        # The shared backend holds everything the front does
+        return self.back.items(prefix)
+
+    def stats(self) -> dict:
+        return {"backend": "tiered", "memory": self.front.stats(), "sqlite": self.back.stats()}
+
+
+def _make_memory():
+    return MemoryCache(
+        max_entries=int(os.environ.get("OCR_CACHE_MEMORY_ENTRIES", "256")),
+        ttl=float(os.environ.get("OCR_CACHE_TTL", DEFAULT_TTL)),
+    )
+
+def _make_sqlite():
+    cache_dir = os.environ.get("OCR_CACHE_DIR", DEFAULT_CACHE_DIR)
+    return SqliteCache(
+        path=os.path.join(cache_dir, "ocr_cache.sqlite"),
+        ttl=float(os.environ.get("OCR_CACHE_TTL", DEFAULT_TTL)),
+        max_entries=int(os.environ.get("OCR_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        max_bytes=int(os.environ.get("OCR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+    )
+
+BACKENDS = {
+    "memory": _make_memory,
+    "sqlite": _make_sqlite,
+    "tiered": lambda: TieredCache(_make_memory(), _make_sqlite()),
+}
+
+_cache = None
+_cache_loaded = False
+
+def get_cache():
+    """
+    Returns the process-wide cache selected by OCR_CACHE (memory, sqlite,
+    tiered or off). None means caching is disabled.
+    """
+    global _cache, _cache_loaded
+    if not _cache_loaded:
+        name = os.environ.get("OCR_CACHE", "tiered").lower()
+        factory = BACKENDS.get(name)
+        _cache = factory() if factory else None
+        _cache_loaded = True
+    return _cache
@@ -0,0 +1,347 @@
+"""
+Async client for the remote OCR Space (HF_API_URL/ocr).
+
+- one pooled httpx.AsyncClient per process (keep-alive across documents)
+- semaphore capping in-flight calls (OCR_REMOTE_CONCURRENCY)
+- exponential backoff with jitter on 429/502/503/504 and transport errors,
+  honouring Retry-After; a read timeout is not retried (the Space already
+  had the whole timeout to answer)
+- circuit breaker that fails fast while the Space is down
+- per-call timing metrics
+- record mode (OCR_RECORD_DIR): every successful response is saved as a
+  replayable fixture for ocr_stub_server (see ocr_fixtures.py)
+
+process_document is synchronous, so remote_ocr_sync() runs calls on a
+long-lived background event loop; the pooled connections survive between
+documents in ocr_server workers. remote_ocr_many_sync() sends the pages of
+one document in parallel on the same loop.
+"""
+from __future__ import annotations
+import asyncio
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from collections import deque
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class RemoteOcrError(Exception):
+    def __init__(self, message: str, status: int | None = None, body: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+
+class CircuitOpenError(RemoteOcrError):
+    """Raised without touching the network while the breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    closed    - calls flow; consecutive failures are counted
+    open      - calls fail fast until reset_after seconds have passed
+    half_open - one trial call; success closes, failure re-opens
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raises CircuitOpenError to fail fast; True when this call is the half-open trial."""
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("Remote OCR circuit is open (Space unavailable); failing fast")
+        if state == "half_open":
+            if self._trial_in_flight:
+                raise CircuitOpenError("Remote OCR circuit is half-open; trial call already in flight")
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def end_trial(self):
+        # The trial ended without a verdict (cancelled, unexpected error):
+        # let the next call try again
+        self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._trial_in_flight = False
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class RemoteOcrClient:
+    def __init__(self, base_url: str, token: str | None = None, *,
+                 max_concurrency: int = 4, timeout: float = 300.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0,
+                 record_dir: str | None = None, transport=None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self.record_dir = record_dir
+        # transport lets tests route calls to the in-process stub server
+        self._transport = transport
+        self._client = None
+        self._semaphore = None
+
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.in_flight = 0
+        self._durations = deque(maxlen=1000)
+        # (finished at, seconds) of the latest calls, for recent_latency()
+        self._recent = deque(maxlen=64)
+
+    def _ensure_client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.token}"} if self.token else {},
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                limits=httpx.Limits(max_connections=self.max_concurrency,
+                                    max_keepalive_connections=self.max_concurrency),
+                transport=self._transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def ocr(self, data: bytes | memoryview, filename: str = "document", content_type: str | None = None) -> dict:
+        """
+        Uploads one document to /ocr and returns the decoded JSON response.
+        Raises RemoteOcrError on a non-retryable or exhausted failure.
+        """
+        client = self._ensure_client()
+        trial = self.breaker.before_call()
+        try:
+            return await self._call(client, data, filename, content_type)
+        finally:
+            if trial:
+                self.breaker.end_trial()
+
+    async def ocr_many(self, uploads: list) -> list[dict]:
+        """
+        OCRs (bytes, filename) uploads, e.g. the pages of one document,
+        concurrently and returns the responses in order. In half-open state
+        the first upload goes alone as the trial call; the rest follow once
+        it has decided the breaker, instead of failing fast behind it.
+        """
+        responses = []
+        if uploads and self.breaker.state == "half_open":
+            responses.append(await self.ocr(*uploads[0]))
+            uploads = uploads[1:]
+        return responses + list(await asyncio.gather(*(self.ocr(data, name) for data, name in uploads)))
+
+    async def _call(self, client, data, filename: str, content_type: str | None) -> dict:
+        import httpx
+        from ocr_input import upload_body
+        async with self._semaphore:
+            self.in_flight += 1
+            self.calls += 1
+            start = time.perf_counter()
+            try:
+                attempt = 0
+                while True:
+                    try:
+                        files = {"file": (filename, upload_body(data), content_type or "application/octet-stream")}
+                        resp = await client.post("/ocr", files=files)
+                    except httpx.TransportError as e:
+                        if isinstance(e, httpx.ReadTimeout) or attempt >= self.max_retries:
+                            raise RemoteOcrError(f"{type(e).__name__}: {e}") from e
+                        retry_after = None
+                    else:
+                        if resp.status_code == 200:
+                            try:
+                                result = resp.json()
+                            except ValueError as e:
+                                raise RemoteOcrError(f"Remote OCR returned invalid JSON: {e}", body=resp.text) from e
+                            self.breaker.record_success()
+                            if self.record_dir:
+                                self._record(data, filename, result)
+                            return result
+                        if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                            raise RemoteOcrError(
+                                f"Remote OCR failed with status {resp.status_code}: {resp.text}",
+                                status=resp.status_code, body=resp.text,
+                            )
+                        retry_after = resp.headers.get("Retry-After")
+
+                    self.retries += 1
+                    await asyncio.sleep(self._backoff(attempt, retry_after))
+                    attempt += 1
+            except RemoteOcrError as e:
+                self.failures += 1
+                # Only availability problems count against the Space; a 4xx
+                # for a bad upload means the Space itself is healthy.
+                if e.status is None or e.status in RETRY_STATUSES or e.status >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                raise
+            finally:
+                self.in_flight -= 1
+                end = time.perf_counter()
+                self._durations.append(end - start)
+                self._recent.append((end, end - start))
+
+    def _record(self, data: bytes, filename: str, result: dict):
+        from ocr_fixtures import save_fixture
+        try:
+            save_fixture(self.record_dir, data, filename, result,
+                         note=f"Recorded from {self.base_url}/ocr on {time.strftime('%Y-%m-%d')}")
+        except OSError:
+            # Recording is best effort; never fail the OCR call over it
+            pass
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def recent_latency(self, window: float) -> float | None:
+        """Median seconds of the calls that finished in the last `window` seconds, None without any."""
+        cutoff = time.perf_counter() - window
+        recent = sorted(seconds for end, seconds in list(self._recent) if end >= cutoff)
+        return recent[len(recent) // 2] if recent else None
+
+    def metrics(self) -> dict:
+        durations = sorted(self._durations)
+
+        def pct(p):
+            if not durations:
+                return 0.0
+            return round(durations[min(len(durations) - 1, int(p * len(durations)))] * 1000, 1)
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "in_flight": self.in_flight,
+            "circuit": self.breaker.state,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(durations[-1] * 1000, 1) if durations else 0.0,
+        }
+
+
+# ---------------------------------------------------------
+# Process-wide client + background loop for synchronous callers
+# ---------------------------------------------------------
+_loop = None
+_loop_lock = threading.Lock()
+_clients: dict[tuple, RemoteOcrClient] = {}
+
+
+def _background_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="remote-ocr-loop", daemon=True).start()
+    return _loop
+
+
+def client_from_env(base_url: str, token: str | None = None, **overrides) -> RemoteOcrClient:
+    """New client configured from the OCR_REMOTE_* / OCR_BREAKER_* settings."""
+    settings = dict(
+        max_concurrency=int(os.environ.get("OCR_REMOTE_CONCURRENCY", "4")),
+        timeout=float(os.environ.get("OCR_REMOTE_TIMEOUT", "300")),
+        max_retries=int(os.environ.get("OCR_REMOTE_RETRIES", "3")),
+        breaker_threshold=int(os.environ.get("OCR_BREAKER_THRESHOLD", "5")),
+        breaker_reset=float(os.environ.get("OCR_BREAKER_RESET", "30")),
+        record_dir=os.environ.get("OCR_RECORD_DIR") or None,
+    )
+    settings.update(overrides)
+    return RemoteOcrClient(base_url, token, **settings)
+
+
+def get_client(base_url: str, token: str | None = None) -> RemoteOcrClient:
+    """Process-wide client bound to the background loop (see remote_ocr_sync)."""
+    key = (base_url, token)
+    if key not in _clients:
+        _clients[key] = client_from_env(base_url, token)
+    return _clients[key]
+
+
+def register_client(client: RemoteOcrClient) -> RemoteOcrClient:
+    """
+    Makes `client` the process-wide client for its base URL/token, e.g. one
+    routed to an in-process stub (transport=httpx.ASGITransport) by the
+    benchmark suite.
+    """
+    _clients[(client.base_url, client.token)] = client
+    return client
+
+
+def remote_ocr_sync(base_url: str, token: str | None, data: bytes, filename: str) -> dict:
+    client = get_client(base_url, token)
+    future = asyncio.run_coroutine_threadsafe(client.ocr(data, filename), _background_loop())
+    return future.result()
+
+
+def remote_ocr_many_sync(base_url: str, token: str | None, uploads) -> list[dict]:
+    """
+    OCRs several uploads ((bytes, filename) pairs, e.g. the pages of one
+    document) concurrently, bounded by the client's semaphore. Each upload is
+    sent as soon as the iterable yields it, so a generator that renders pages
+    overlaps rendering with the requests in flight. Returns the responses in
+    upload order; the first failure is raised once the rest have settled.
+    Like RemoteOcrClient.ocr_many, a half-open breaker gets the first upload
+    alone as its trial before the others are sent.
+    """
+    client = get_client(base_url, token)
+    loop = _background_loop()
+    trial = client.breaker.state == "half_open"
+    futures = []
+    for data, filename in uploads:
+        futures.append(asyncio.run_coroutine_threadsafe(client.ocr(data, filename), loop))
+        if trial:
+            concurrent.futures.wait(futures)
+            trial = False
+    concurrent.futures.wait(futures)
+    return [future.result() for future in futures]
+
+
+def merge_responses(responses: list[dict]) -> dict:
+    """Per-page /ocr responses -> one response: pages in order, first QR payload."""
+    pages = []
+    qr_payload = None
+    for data in responses:
+        pages.extend(data.get("result") or [])
+        qr_payload = qr_payload or data.get("qr_payload")
+    return {"result": pages, "qr_payload": qr_payload}
@@ -0,0 +1,83 @@
+"""
+Recorded remote OCR responses ("fixtures"), one JSON file per document:
+
+    {
+     "file": "sample-cert-LLP.jpg",          original upload name
+     "sha256": "...",                        hash of the uploaded bytes
+     "note": "...",                          where the response came from
+     "response": {"qr_payload": ..., "result": [[line, ...], ...]},
+     "expected": {"docType": ..., "fields": {...}}   optional, hand-written
+    }
+
+ocr_stub_server replays them by upload hash, ocr_client writes them in
+record mode (OCR_RECORD_DIR) and benchmarks/suite.py checks pipeline output
+against "expected". tests/fixtures/ocr holds the sample certificates.
+"""
+from __future__ import annotations
+import glob
+import hashlib
+import json
+import os
+import time
+
+
+def load_fixtures(directory: str) -> dict[str, dict]:
+    """sha256 -> fixture for every *.json in `directory`."""
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            fixture = json.load(f)
+        fixtures[fixture["sha256"]] = fixture
+    return fixtures
+
+
+def dumps(fixture: dict) -> str:
+    # Indented like json.dump(indent=1), but one OCR line per row so a
+    # recorded page stays readable and diffable
+    response = fixture["response"]
+    entries = [f"  {json.dumps(k)}: {json.dumps(v)}" for k, v in sorted(response.items()) if k != "result"]
+    pages = [
+        "   [\n" + ",\n".join("    " + json.dumps(line) for line in page) + "\n   ]" if page else "   []"
+        for page in response.get("result") or []
+    ]
+    entries.append('  "result": [\n' + ",\n".join(pages) + "\n  ]" if pages else '  "result": []')
+    parts = []
+    for key, value in fixture.items():
+        if key == "response":
+            parts.append(' "response": {\n' + ",\n".join(entries) + "\n }")
+        else:
+            parts.append(f" {json.dumps(key)}: " + json.dumps(value, indent=1).replace("\n", "\n "))
+    return "{\n" + ",\n".join(parts) + "\n}\n"
+
+
+def save_fixture(directory: str, data: bytes, filename: str, response: dict, note: str = "") -> str:
+    """
+    Writes `response` as the fixture for `data`. Re-recording the same file
+    keeps its "expected" block; a different file with the same name gets the
+    hash appended. Returns the fixture path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256(data).hexdigest()
+    stem = os.path.splitext(os.path.basename(filename))[0] or digest[:16]
+    path = os.path.join(directory, f"{stem}.json")
+    previous = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous.get("sha256") != digest:
+            path = os.path.join(directory, f"{stem}-{digest[:8]}.json")
+            previous = None
+
+    fixture = {
+        "file": os.path.basename(filename),
+        "sha256": digest,
+        "note": note or f"Recorded {time.strftime('%Y-%m-%d')}",
+        "response": response,
+    }
+    if previous and "expected" in previous:
+        fixture["expected"] = previous["expected"]
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(dumps(fixture))
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,167 @@
+"""
+Document inputs for process_document: a filesystem path, or the document
+itself in memory.
+
+process_document and everything under it (pdf_text, ocr_preprocess, ocr_qr,
+the stage-1 cache key and the remote upload) take either a path or a
+Document, so uploads are never staged on disk. as_input() turns what callers
+have (a path, bytes, bytearray, memoryview or a binary file object) into one
+of the two.
+
+No copies are made of the document itself:
+  - bytes (what ocr_server and the stdin CLI hand over) go to pdfium as is
+    and to pdfplumber through a read-only view stream
+  - writable buffers (bytearray, BytesIO.getbuffer()) are mapped into pdfium
+    with ctypes.from_buffer
+  - other file objects are read once
+Crossing into another process (pickling) copies the bytes, as it would
+anyway.
+"""
+from __future__ import annotations
+import hashlib
+import io
+import os
+
+PDF_MAGIC = b"%PDF-"
+
+
+class Document:
+    """An in-memory document; `name` only supplies the extension and upload filename."""
+    __slots__ = ("data", "name")
+
+    def __init__(self, data, name: str = ""):
+        self.data = _buffer(data)
+        self.name = name or ""
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"Document({self.name!r}, {len(self.data)} bytes)"
+
+    def __reduce__(self):
+        # memoryviews do not pickle; process pools get a bytes copy
+        return Document, (bytes(self.data), self.name)
+
+
+class _ViewReader(io.RawIOBase):
+    """Seekable read-only stream over a buffer, without copying it."""
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        n = len(chunk)
+        buffer[:n] = chunk
+        self._pos += n
+        return n
+
+    def read(self, size: int = -1) -> bytes:
+        stop = len(self._view) if size is None or size < 0 else self._pos + size
+        chunk = self._view[self._pos:stop]
+        self._pos += len(chunk)
+        return chunk.tobytes()
+
+
+def _buffer(data):
+    if isinstance(data, bytes):
+        return data
+    view = memoryview(data)
+    # A view over a whole bytes object is just that object
+    if isinstance(view.obj, bytes) and view.contiguous and view.nbytes == len(view.obj):
+        return view.obj
+    return view.cast("B") if view.contiguous else memoryview(view.tobytes())
+
+
+def as_input(source, name: str | None = None):
+    """
+    A path (str) or a Document for `source`: a path / PathLike, a Document,
+    bytes-like data or a binary file object (read once; BytesIO is viewed
+    in place). `name` names in-memory inputs (file objects default to their
+    own .name).
+    """
+    if isinstance(source, Document):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Document(source, name or "")
+    if hasattr(source, "read"):
+        name = name or os.path.basename(str(getattr(source, "name", "") or ""))
+        if isinstance(source, io.BytesIO):
+            return Document(source.getbuffer(), name)
+        return Document(source.read(), name)
+    raise TypeError(f"Unsupported document input: {type(source).__name__}")
+
+
+def name(source) -> str:
+    return source.name if isinstance(source, Document) else os.path.basename(source)
+
+
+def is_pdf(source) -> bool:
+    if isinstance(source, Document):
+        return source.name.lower().endswith(".pdf") or source.data[:5] == PDF_MAGIC
+    return source.lower().endswith(".pdf")
+
+
+def exists(source) -> bool:
+    return len(source) > 0 if isinstance(source, Document) else os.path.isfile(source)
+
+
+def size(source) -> int:
+    return len(source) if isinstance(source, Document) else os.path.getsize(source)
+
+
+def read(source):
+    """The document's bytes (a memoryview for writable in-memory buffers)."""
+    if isinstance(source, Document):
+        return source.data
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def digest(source) -> str:
+    """sha256 of the content; same value as ocr_cache.file_digest for a path."""
+    if isinstance(source, Document):
+        return hashlib.sha256(source.data).hexdigest()
+    from ocr_cache import file_digest
+    return file_digest(source)
+
+
+def pdfium_input(source):
+    """What pypdfium2.PdfDocument should open for `source`."""
+    if not isinstance(source, Document):
+        return source
+    data = source.data
+    if isinstance(data, bytes):
+        return data
+    if not data.readonly:
+        import ctypes
+        return (ctypes.c_char * len(data)).from_buffer(data)
+    return _ViewReader(data)
+
+
+def stream_input(source):
+    """What pdfplumber.open should open for `source`: the path or a view stream."""
+    return _ViewReader(source.data) if isinstance(source, Document) else source
+
+
+def upload_body(data):
+    """httpx multipart content for `data`: bytes as is, other buffers as a view stream."""
+    return data if isinstance(data, bytes) else _ViewReader(data)
@@ -0,0 +1,378 @@
+"""
+Asynchronous OCR jobs for ocr_server.
+
+POST /jobs (or /jobs/upload) stores the document in a SQLite-backed queue and
+answers with a job id straight away; a dispatcher task inside the server pulls
+jobs into the warm WorkerPool and clients poll GET /jobs/{id} or get the
+finished job POSTed to their callback_url.
+
+  lanes     - "interactive" (a user waiting on a verification) is always
+              claimed before "bulk" (onboarding batches). Bulk jobs never hold
+              more than OCR_JOBS_BULK_SLOTS workers, so one stays free for
+              interactive work even while a large batch drains.
+  dedup     - a document whose sha256 matches a queued or running job joins
+              that job (same id, its callback added) instead of being OCR'd
+              twice; joining from the interactive lane promotes the job.
+  callbacks - callback_url must be http(s) and its host listed in
+              OCR_JOBS_CALLBACK_HOSTS; anything else is refused at submit, so
+              the server never POSTs to an address a client picked.
+  restarts  - the queue lives under storage/jobs; jobs that were running when
+              the server stopped go back to queued on startup. Uploaded bytes
+              are kept only until the job finishes, finished jobs for
+              OCR_JOBS_TTL_HOURS.
+
+Queue wait (submit -> claimed) and service time (claimed -> finished) are
+histograms per lane, exposed on /metrics. The store is plain sqlite3, so the
+queue calls it through asyncio.to_thread to keep it off the event loop.
+"""
+from __future__ import annotations
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from ocr_metrics import Histogram, DEFAULT_BUCKETS
+from ocr_pool import PoolSaturated
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_JOBS_DIR = os.path.join(SCRIPTS_DIR, "..", "storage", "jobs")
+
+logger = logging.getLogger("ocr_jobs")
+
+# Claimed in this order
+LANES = ("interactive", "bulk")
+DEFAULT_LANE = "interactive"
+
+DEFAULT_TTL_HOURS = 24
+# Bulk onboarding can queue for far longer than a single request takes
+JOB_BUCKETS = DEFAULT_BUCKETS + (120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+# Callback delivery: attempts and the first backoff (doubled per retry)
+CALLBACK_ATTEMPTS = 3
+CALLBACK_BACKOFF = 1.0
+# How often the dispatcher wakes without a submit, to purge and re-check
+IDLE_SECONDS = 30.0
+
+# Columns returned by get(); the document itself is never handed back
+_PUBLIC = ("id", "status", "lane", "filename", "result", "error", "created", "started", "finished")
+
+
+class JobStore:
+    """
+    Persistent job table. Every method is one short transaction, so the
+    store is safe to share between threads (one connection each). Methods
+    that read and then write take the write lock up front (BEGIN IMMEDIATE),
+    so two submits of the same document can't both miss the dedup check.
+    """
+
+    def __init__(self, path: str | None = None, ttl: float | None = None):
+        self.path = path or os.path.join(DEFAULT_JOBS_DIR, "ocr_jobs.sqlite")
+        self.ttl = ttl if ttl is not None else DEFAULT_TTL_HOURS * 3600
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, status TEXT NOT NULL, lane TEXT NOT NULL, priority INTEGER NOT NULL,"
+                " digest TEXT NOT NULL, filename TEXT NOT NULL, path TEXT, data BLOB,"
+                " callbacks TEXT NOT NULL, result TEXT, error TEXT,"
+                " created REAL NOT NULL, started REAL, finished REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority, created)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_digest ON jobs(digest, status)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _write(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def submit(self, digest: str, filename: str, path: str | None = None, data=None,
+               lane: str = DEFAULT_LANE, callback_url: str | None = None) -> tuple[str, bool]:
+        """
+        Queues a document (a server-side `path` or the uploaded `data`) and
+        returns (job id, deduplicated). deduplicated means an identical
+        document was already queued or running and that job was joined.
+        """
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane: {lane}")
+        with self._write() as conn:
+            row = conn.execute(
+                "SELECT id, lane, callbacks FROM jobs WHERE digest = ? AND status IN ('queued', 'running')"
+                " ORDER BY created LIMIT 1", (digest,)
+            ).fetchone()
+            if row is not None:
+                job_id, current, callbacks = row
+                callbacks = json.loads(callbacks)
+                if callback_url and callback_url not in callbacks:
+                    callbacks.append(callback_url)
+                # Joining from a faster lane promotes the whole job
+                if LANES.index(lane) < LANES.index(current):
+                    current = lane
+                conn.execute("UPDATE jobs SET lane = ?, priority = ?, callbacks = ? WHERE id = ?",
+                             (current, LANES.index(current), json.dumps(callbacks), job_id))
+                return job_id, True
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, status, lane, priority, digest, filename, path, data, callbacks, created)"
+                " VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, lane, LANES.index(lane), digest, filename, path,
+                 data, json.dumps([callback_url] if callback_url else []),
+                 time.time()),
+            )
+            return job_id, False
+
+    def claim(self, lanes=LANES) -> dict | None:
+        """Marks the next queued job in `lanes` (highest priority, then oldest) running and returns it."""
+        if not lanes:
+            return None
+        marks = ",".join("?" * len(lanes))
+        with self._write() as conn:
+            row = conn.execute(
+                f"SELECT id, lane, filename, path, data, created FROM jobs"
+                f" WHERE status = 'queued' AND lane IN ({marks}) ORDER BY priority, created LIMIT 1",
+                tuple(lanes),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            conn.execute("UPDATE jobs SET status = 'running', started = ? WHERE id = ?", (now, row[0]))
+        job_id, lane, filename, path, data, created = row
+        return {"id": job_id, "lane": lane, "filename": filename, "path": path, "data": data,
+                "created": created, "started": now}
+
+    def requeue(self, job_id: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE jobs SET status = 'queued', started = NULL WHERE id = ?", (job_id,))
+
+    def finish(self, job_id: str, result: dict | None = None, error: str | None = None) -> list[str]:
+        """Stores the outcome, drops the document bytes and returns the callback URLs to notify."""
+        status = "done" if result is not None and result.get("success") else "failed"
+        if error is None and result is not None and not result.get("success"):
+            error = result.get("error") or "Extraction failed"
+        with self._write() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ?, data = NULL WHERE id = ?",
+                (status, None if result is None else json.dumps(result), error, time.time(), job_id),
+            )
+            row = conn.execute("SELECT callbacks FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def get(self, job_id: str) -> dict | None:
+        row = self._conn().execute(f"SELECT {', '.join(_PUBLIC)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(_PUBLIC, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def recover(self) -> int:
+        """Puts jobs left running by a previous server process back in the queue."""
+        conn = self._conn()
+        with conn:
+            return conn.execute("UPDATE jobs SET status = 'queued', started = NULL WHERE status = 'running'").rowcount
+
+    def purge(self) -> int:
+        if not self.ttl:
+            return 0
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?",
+                                (time.time() - self.ttl,)).rowcount
+
+    def counts(self) -> dict:
+        """status -> lane -> number of jobs."""
+        out = {}
+        for status, lane, n in self._conn().execute("SELECT status, lane, COUNT(*) FROM jobs GROUP BY status, lane"):
+            out.setdefault(status, {})[lane] = n
+        return out
+
+
+def bulk_slots(workers: int) -> int:
+    """Workers bulk jobs may occupy at once (OCR_JOBS_BULK_SLOTS, default all but one)."""
+    value = os.environ.get("OCR_JOBS_BULK_SLOTS")
+    if value:
+        return max(1, int(value))
+    return max(1, workers - 1)
+
+
+def callback_hosts() -> set[str]:
+    """OCR_JOBS_CALLBACK_HOSTS: comma-separated hosts callbacks may go to (none by default)."""
+    return {h.strip().lower() for h in os.environ.get("OCR_JOBS_CALLBACK_HOSTS", "").split(",") if h.strip()}
+
+
+def check_callback_url(url: str):
+    """Raises ValueError unless `url` is http(s) to a host in callback_hosts()."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    if parts.hostname.lower() not in callback_hosts():
+        raise ValueError(f"callback_url host {parts.hostname} is not in OCR_JOBS_CALLBACK_HOSTS")
+
+
+def make_store() -> JobStore:
+    jobs_dir = os.environ.get("OCR_JOBS_DIR", DEFAULT_JOBS_DIR)
+    return JobStore(
+        path=os.path.join(jobs_dir, "ocr_jobs.sqlite"),
+        ttl=float(os.environ.get("OCR_JOBS_TTL_HOURS", DEFAULT_TTL_HOURS)) * 3600,
+    )
+
+
+class JobQueue:
+    """
+    Dispatcher between a JobStore and a WorkerPool. Runs as a task on the
+    server's event loop and keeps at most pool.workers jobs in the pool, so
+    queued jobs wait in the store (where they survive a restart and can still
+    be promoted) rather than in the executor.
+    """
+
+    def __init__(self, store: JobStore, pool, bulk: int | None = None, transport=None, on_result=None):
+        self.store = store
+        self.pool = pool
+        self.bulk_slots = bulk if bulk is not None else bulk_slots(pool.workers)
+        # httpx transport for callbacks (tests pass a MockTransport)
+        self.transport = transport
+        # Called with each worker result (ocr_server feeds its stage histograms)
+        self.on_result = on_result
+        self.wait_seconds = Histogram("ocr_job_queue_wait_seconds", "Time jobs waited in the job queue.",
+                                      label="lane", buckets=JOB_BUCKETS)
+        self.service_seconds = Histogram("ocr_job_service_seconds", "Time from claiming a job to its result.",
+                                         label="lane", buckets=JOB_BUCKETS)
+        self._running = {lane: 0 for lane in LANES}
+        self._tasks: set[asyncio.Task] = set()
+        self._wake: asyncio.Event | None = None
+        self._loop_task: asyncio.Task | None = None
+
+    def start(self):
+        recovered = self.store.recover()
+        if recovered:
+            logger.info(f"Re-queued {recovered} job(s) left running by the previous process")
+        self._wake = asyncio.Event()
+        self._loop_task = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def stop(self):
+        # Unfinished jobs stay 'running' in the store and are re-queued by the next start()
+        tasks = [t for t in (self._loop_task, *self._tasks) if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def submit(self, digest: str, filename: str, path: str | None = None, data=None,
+                     lane: str = DEFAULT_LANE, callback_url: str | None = None) -> tuple[str, bool]:
+        if callback_url:
+            check_callback_url(callback_url)
+        job = await asyncio.to_thread(self.store.submit, digest, filename, path=path, data=data,
+                                      lane=lane, callback_url=callback_url)
+        self.wake()
+        return job
+
+    def running(self) -> dict:
+        return dict(self._running)
+
+    def _free_lanes(self) -> tuple[str, ...]:
+        if sum(self._running.values()) >= self.pool.workers:
+            return ()
+        if self._running["bulk"] >= self.bulk_slots:
+            return ("interactive",)
+        return LANES
+
+    async def _dispatch(self):
+        last_purge = 0.0
+        while True:
+            self._wake.clear()
+            while True:
+                job = await asyncio.to_thread(self.store.claim, self._free_lanes())
+                if job is None:
+                    break
+                self._running[job["lane"]] += 1
+                task = asyncio.get_running_loop().create_task(self._run(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            if time.monotonic() - last_purge > IDLE_SECONDS:
+                await asyncio.to_thread(self.store.purge)
+                last_purge = time.monotonic()
+            try:
+                await asyncio.wait_for(self._wake.wait(), IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job: dict):
+        lane = job["lane"]
+        self.wait_seconds.observe(max(0.0, job["started"] - job["created"]), lane)
+        start = time.monotonic()
+        result, error = None, None
+        try:
+            if job["path"]:
+                result = await self.pool.process_path(job["path"])
+            else:
+                result = await self.pool.process_bytes(job["data"], job["filename"])
+        except PoolSaturated:
+            # Synchronous /process traffic filled the pool; try again shortly
+            await asyncio.to_thread(self.store.requeue, job["id"])
+            self._release(lane)
+            await asyncio.sleep(1.0)
+            self.wake()
+            return
+        except asyncio.CancelledError:
+            self._release(lane)
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job['id']} failed")
+            error = str(e) or type(e).__name__
+        self.service_seconds.observe(time.monotonic() - start, lane)
+        callbacks = await asyncio.to_thread(self.store.finish, job["id"], result=result, error=error)
+        self._release(lane)
+        if result is not None and self.on_result is not None:
+            self.on_result(result)
+        if callbacks:
+            await self._notify(job["id"], callbacks)
+
+    def _release(self, lane: str):
+        self._running[lane] -= 1
+        self.wake()
+
+    async def _notify(self, job_id: str, callbacks: list[str]):
+        import httpx
+        payload = await asyncio.to_thread(self.store.get, job_id)
+        async with httpx.AsyncClient(transport=self.transport, timeout=30) as client:
+            for url in callbacks:
+                delay = CALLBACK_BACKOFF
+                for attempt in range(1, CALLBACK_ATTEMPTS + 1):
+                    try:
+                        response = await client.post(url, json=payload)
+                        if response.status_code < 500:
+                            break
+                        reason = f"HTTP {response.status_code}"
+                    except httpx.HTTPError as e:
+                        reason = str(e) or type(e).__name__
+                    if attempt == CALLBACK_ATTEMPTS:
+                        logger.warning(f"Callback for job {job_id} to {url} failed: {reason}")
+                    else:
+                        await asyncio.sleep(delay)
+                        delay *= 2
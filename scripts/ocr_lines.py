@@ -0,0 +1,108 @@
+"""
+Columnar view of OCR lines for confidence and per-page statistics.
+
+Stage 1 stores lines as {"text", "conf"} dicts (that is also the raw_result
+wire format). Image-heavy remote results can carry thousands of them, so the
+scoring below works on NumPy columns instead of walking the dicts:
+
+    texts   list[str]  interned line text
+    conf    float64    recognition confidence
+    length  int64      len(text)
+    page    int32      0-based page index
+
+numpy is imported by the caller (ocr_service.lazy_import); short documents
+never need it.
+"""
+from __future__ import annotations
+import sys
+from operator import itemgetter
+
+import numpy as np
+
+# Noise filter shared with ocr_service.calculate_weighted_confidence:
+# drop lines under MIN_CONF, and short lines (<= SHORT_LEN chars) under SHORT_CONF
+MIN_CONF = 0.6
+SHORT_LEN = 3
+SHORT_CONF = 0.8
+
+
+class LineTable:
+    def __init__(self, texts: list[str], conf, length, page):
+        self.texts = texts
+        self.conf = conf
+        self.length = length
+        self.page = page
+
+    @classmethod
+    def from_lines(cls, lines: list[dict], page_sizes: list[int] | None = None) -> "LineTable":
+        """
+        Builds the columns from stage-1 lines. `page_sizes` is the number of
+        lines each page contributed, in order (all lines are page 0 without it).
+        """
+        n = len(lines)
+        texts = list(map(sys.intern, map(itemgetter("text"), lines)))
+        conf = np.fromiter(map(itemgetter("conf"), lines), dtype=np.float64, count=n)
+        length = np.fromiter(map(len, texts), dtype=np.int64, count=n)
+        if page_sizes and sum(page_sizes) == n:
+            page = np.repeat(np.arange(len(page_sizes), dtype=np.int32), page_sizes)
+        else:
+            page = np.zeros(n, dtype=np.int32)
+        return cls(texts, conf, length, page)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def n_pages(self) -> int:
+        return int(self.page.max()) + 1 if len(self) else 0
+
+    def keep_mask(self):
+        """True for lines that count towards confidence (not likely noise)."""
+        return (self.conf >= MIN_CONF) & ((self.length > SHORT_LEN) | (self.conf >= SHORT_CONF))
+
+    def _weights(self, keep):
+        # Squared length, zeroed for noise
+        return np.where(keep, self.length.astype(np.float64) ** 2, 0.0)
+
+    def weighted_confidence(self) -> float:
+        """Length^2-weighted mean confidence over non-noise lines (0.0 if none)."""
+        weights = self._weights(self.keep_mask())
+        total_weight = weights.sum()
+        if total_weight == 0:
+            return 0.0
+        return float(np.dot(self.conf, weights) / total_weight)
+
+    def page_stats(self) -> list[dict]:
+        """Per-page line count, characters, noise lines, mean and weighted confidence."""
+        n_pages = self.n_pages
+        if not n_pages:
+            return []
+        keep = self.keep_mask()
+        weights = self._weights(keep)
+        lines = np.bincount(self.page, minlength=n_pages)
+        chars = np.bincount(self.page, weights=self.length, minlength=n_pages)
+        noise = np.bincount(self.page, weights=~keep, minlength=n_pages)
+        conf_sum = np.bincount(self.page, weights=self.conf, minlength=n_pages)
+        weight_sum = np.bincount(self.page, weights=weights, minlength=n_pages)
+        score_sum = np.bincount(self.page, weights=self.conf * weights, minlength=n_pages)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(lines > 0, conf_sum / lines, 0.0)
+            weighted = np.where(weight_sum > 0, score_sum / weight_sum, 0.0)
+        return [
+            {
+                "page": page + 1,
+                "lines": int(lines[page]),
+                "chars": int(chars[page]),
+                "noise_lines": int(noise[page]),
+                "mean_conf": round(float(mean[page]), 4),
+                "weighted_conf": round(float(weighted[page]), 4),
+            }
+            for page in range(n_pages)
+        ]
+
+    def text(self) -> str:
+        return "\n".join(self.texts)
+
+    def records(self) -> list[dict]:
+        """Back to raw_result wire format."""
+        return [{"text": text, "conf": conf} for text, conf in zip(self.texts, self.conf.tolist())]
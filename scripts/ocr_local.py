@@ -0,0 +1,261 @@
+"""
+Local CPU OCR: the fallback for documents the remote Space cannot take.
+
+Backends (OCR_LOCAL_BACKEND, default the first one installed):
+  rapidocr   - PaddleOCR's PP-OCR detection/recognition models on
+               onnxruntime (rapidocr_onnxruntime); no paddle runtime needed
+  paddleocr  - PaddleOCR 3.x on CPU, the engine the Space itself runs
+Both answer in the Space's boxed line format ([[quad], [text, conf]], one
+list per page), so ocr_service parses local and remote results with the same
+parse_remote_response. More backends plug in through BACKENDS.
+
+EnginePool keeps OCR_LOCAL_ENGINES model instances loaded for the life of
+the process (ocr_pool workers load them at startup), each running
+OCR_LOCAL_THREADS intra-op threads (default: cores / engines). A document's
+pages are rendered and cleaned like the remote uploads
+(ocr_preprocess.page_images), split into one contiguous batch per instance
+and recognized in parallel: paddleocr predicts a batch in one call,
+rapidocr goes page by page with text lines recognized OCR_LOCAL_REC_BATCH at
+a time.
+
+choose_engine() picks remote or local per document:
+  OCR_ENGINE=remote|local   forced (default auto)
+  no HF_API_URL             local
+  circuit breaker open      local (remote health)
+  all remote slots busy     local (queue depth: in-flight calls at
+                            OCR_REMOTE_CONCURRENCY)
+  remote slow               local (median of the calls finished in the last
+                            OCR_REMOTE_WINDOW seconds above OCR_REMOTE_SLOW_MS;
+                            once the window empties the next document probes
+                            the Space again)
+  otherwise                 remote
+ocr_service also falls back to local when a remote call fails. The signals
+are per process (each ocr_server worker has its own client). Without a
+backend installed, documents go remote exactly as before.
+"""
+from __future__ import annotations
+import importlib.util
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ocr_metrics import span
+
+REC_BATCH = 16
+DEFAULT_SLOW_MS = 20000
+DEFAULT_WINDOW = 60.0
+
+
+def _quad(box) -> list[list[float]]:
+    return [[float(x), float(y)] for x, y in box]
+
+
+def _bgr(gray):
+    # Both backends expect 3-channel images; pages come in cleaned grayscale
+    import cv2
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR) if gray.ndim == 2 else gray
+
+
+def _load_rapidocr(threads: int, rec_batch: int):
+    from rapidocr_onnxruntime import RapidOCR
+    # Pages are upright after ocr_preprocess; no angle classifier
+    settings = dict(intra_op_num_threads=threads, inter_op_num_threads=1, rec_batch_num=rec_batch, use_cls=False)
+    # The bundled recognizer is the Chinese/English model, which drops the
+    # spaces between English words; OCR_LOCAL_REC_MODEL / OCR_LOCAL_REC_KEYS
+    # point at another one (e.g. en_PP-OCRv4_rec + en_dict.txt)
+    if os.environ.get("OCR_LOCAL_REC_MODEL"):
+        settings["rec_model_path"] = os.environ["OCR_LOCAL_REC_MODEL"]
+    if os.environ.get("OCR_LOCAL_REC_KEYS"):
+        settings["rec_keys_path"] = os.environ["OCR_LOCAL_REC_KEYS"]
+    engine = RapidOCR(**settings)
+
+    def recognize(images):
+        pages = []
+        for image in images:
+            result, _ = engine(_bgr(image))
+            pages.append([[_quad(box), [text, float(score)]] for box, text, score in result or []])
+        return pages
+
+    return recognize
+
+
+def _load_paddleocr(threads: int, rec_batch: int):
+    from paddleocr import PaddleOCR
+    # Pages are already deskewed and upright (ocr_preprocess); skip the
+    # orientation/unwarping models
+    engine = PaddleOCR(lang="en", device="cpu", cpu_threads=threads, enable_mkldnn=True,
+                       use_doc_orientation_classify=False, use_doc_unwarping=False,
+                       use_textline_orientation=False, text_recognition_batch_size=rec_batch)
+
+    def recognize(images):
+        return [
+            [[_quad(box), [text, float(score)]]
+             for box, text, score in zip(page["rec_polys"], page["rec_texts"], page["rec_scores"])]
+            for page in engine.predict([_bgr(image) for image in images])
+        ]
+
+    return recognize
+
+
+# name -> (module probed for availability, loader(threads, rec_batch) -> recognize(images))
+BACKENDS = {
+    "rapidocr": ("rapidocr_onnxruntime", _load_rapidocr),
+    "paddleocr": ("paddleocr", _load_paddleocr),
+}
+
+
+def _installed(module: str) -> bool:
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def backend_name() -> str | None:
+    """OCR_LOCAL_BACKEND if installed, else the first installed backend, else None."""
+    wanted = os.environ.get("OCR_LOCAL_BACKEND")
+    names = [wanted] if wanted else list(BACKENDS)
+    for name in names:
+        if name in BACKENDS and _installed(BACKENDS[name][0]):
+            return name
+    return None
+
+
+def mode() -> str:
+    """OCR_ENGINE: auto (default), remote or local."""
+    value = os.environ.get("OCR_ENGINE", "auto").lower()
+    return value if value in ("remote", "local") else "auto"
+
+
+def enabled() -> bool:
+    """Local OCR can be used: a backend (and cv2 for the pages) is installed and OCR_ENGINE allows it."""
+    from ocr_preprocess import HAS_CV2
+    return mode() != "remote" and HAS_CV2 and backend_name() is not None
+
+
+class EnginePool:
+    """
+    `size` pre-loaded instances of one backend. recognize() splits the pages
+    it gets across the idle instances; concurrent callers wait for one.
+    """
+
+    def __init__(self, backend: str, size: int = 1, threads: int | None = None, rec_batch: int = REC_BATCH):
+        self.backend = backend
+        self.size = max(1, size)
+        self.threads = threads or max(1, (os.cpu_count() or 1) // self.size)
+        self.rec_batch = rec_batch
+        self._idle: queue.Queue = queue.Queue()
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.load_seconds = 0.0
+        self.pages = 0
+        self.busy_seconds = 0.0
+
+    def start(self) -> "EnginePool":
+        start = time.perf_counter()
+        load = BACKENDS[self.backend][1]
+        for _ in range(self.size):
+            self._idle.put(load(self.threads, self.rec_batch))
+        self.load_seconds = time.perf_counter() - start
+        if self.size > 1:
+            self._executor = ThreadPoolExecutor(self.size, thread_name_prefix="local-ocr")
+        return self
+
+    def _run(self, images: list) -> list:
+        engine = self._idle.get()
+        start = time.perf_counter()
+        try:
+            return engine(images)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._idle.put(engine)
+            with self._lock:
+                self.pages += len(images)
+                self.busy_seconds += elapsed
+
+    def recognize(self, images: list) -> list[list]:
+        """Boxed lines per page of `images`, in order."""
+        if not images:
+            return []
+        chunks = min(self.size, len(images))
+        if chunks == 1:
+            return self._run(images)
+        # Contiguous slices, one batch per instance
+        bounds = [round(i * len(images) / chunks) for i in range(chunks + 1)]
+        batches = self._executor.map(self._run, [images[a:b] for a, b in zip(bounds, bounds[1:])])
+        return [page for batch in batches for page in batch]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.backend, "engines": self.size, "threads": self.threads,
+                    "idle": self._idle.qsize(), "pages": self.pages,
+                    "load_ms": round(self.load_seconds * 1000, 1),
+                    "ms_per_page": round(self.busy_seconds * 1000 / self.pages, 1) if self.pages else 0.0}
+
+
+_pool: EnginePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> EnginePool:
+    """The process-wide EnginePool, loaded on first use (OCR_LOCAL_* settings)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            backend = backend_name()
+            if backend is None:
+                raise RuntimeError("No local OCR backend installed (pip install rapidocr_onnxruntime or paddleocr)")
+            threads = os.environ.get("OCR_LOCAL_THREADS")
+            _pool = EnginePool(backend, size=int(os.environ.get("OCR_LOCAL_ENGINES", "1")),
+                               threads=int(threads) if threads else None,
+                               rec_batch=int(os.environ.get("OCR_LOCAL_REC_BATCH", REC_BATCH))).start()
+        return _pool
+
+
+def recognize_document(path, pages: list[int] | None = None) -> dict:
+    """
+    Local OCR of `path` (a path or an ocr_input.Document), or of `pages`
+    (0-based) of a PDF. Returns a response shaped like the Space's /ocr.
+    """
+    from ocr_preprocess import page_images
+    pool = get_pool()
+    with span("preprocess"):
+        images = [image for _, image in page_images(path, pages)]
+    with span("local_ocr"):
+        result = pool.recognize(images)
+    return {"result": result, "qr_payload": None}
+
+
+def stands_in(has_remote: bool) -> bool:
+    """
+    A local read only stands in for the Space (circuit open, saturated,
+    slow, failed) when HF_API_URL is set and OCR_ENGINE isn't local. Such
+    reads are not cached, so the next request for the document tries the
+    Space again.
+    """
+    return has_remote and mode() != "local"
+
+
+def choose_engine(client) -> tuple[str, str]:
+    """
+    ("remote" | "local", reason) for the next document. `client` is the
+    RemoteOcrClient, or None without HF_API_URL.
+    """
+    forced = mode()
+    if forced != "auto":
+        return forced, f"OCR_ENGINE={forced}"
+    if not enabled():
+        return "remote", "no local OCR backend"
+    if client is None:
+        return "local", "HF_API_URL not set"
+    if client.breaker.state == "open":
+        return "local", "remote circuit open"
+    if client.in_flight >= client.max_concurrency:
+        return "local", f"remote saturated ({client.in_flight} calls in flight)"
+    slow_ms = float(os.environ.get("OCR_REMOTE_SLOW_MS", DEFAULT_SLOW_MS))
+    latency = client.recent_latency(float(os.environ.get("OCR_REMOTE_WINDOW", DEFAULT_WINDOW)))
+    if slow_ms and latency is not None and latency * 1000 > slow_ms:
+        return "local", f"remote slow (median {latency:.1f}s)"
+    return "remote", "remote healthy"
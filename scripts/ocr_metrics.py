@@ -0,0 +1,151 @@
+"""
+Stage timings for process_document and histograms for ocr_server.
+
+Spans:
+    with collect() as timings:          # one per document (process_document)
+        with span("classify"):
+            ...
+    timings.as_ms()  -> {"classify": 0.412, ...}
+
+span() reads the active collector from a contextvar and times with
+perf_counter_ns; outside collect() it is a no-op, so library code can be
+instrumented unconditionally. Repeated spans with the same name add up.
+
+Histograms (ocr_server, ocr_pool):
+    stages = Histogram("ocr_stage_seconds", "...", label="stage")
+    stages.observe(0.0004, "classify")
+    render([stages, ...])  -> Prometheus text exposition format
+
+Buckets are cumulative only when rendered; observe() is a bisect and one
+increment under a lock.
+"""
+from __future__ import annotations
+import contextvars
+import math
+import threading
+import time
+from bisect import bisect_left
+
+_current = contextvars.ContextVar("ocr_timings", default=None)
+
+# Seconds; covers sub-ms extractors up to slow remote OCR calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Timings:
+    __slots__ = ("ns",)
+
+    def __init__(self):
+        self.ns: dict[str, int] = {}
+
+    def add(self, name: str, ns: int):
+        self.ns[name] = self.ns.get(name, 0) + ns
+
+    def as_ms(self) -> dict[str, float]:
+        return {name: round(ns / 1e6, 3) for name, ns in self.ns.items()}
+
+
+class collect:
+    """Context manager that makes a fresh Timings the active span collector."""
+    __slots__ = ("timings", "_token")
+
+    def __enter__(self) -> Timings:
+        self.timings = Timings()
+        self._token = _current.set(self.timings)
+        return self.timings
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        return False
+
+
+class span:
+    """Adds the elapsed time of the block to the active collector under `name`."""
+    __slots__ = ("name", "_timings", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._timings = _current.get()
+        if self._timings is not None:
+            self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        if self._timings is not None:
+            self._timings.add(self.name, time.perf_counter_ns() - self._start)
+        return False
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """Prometheus-style histogram with one optional label."""
+
+    def __init__(self, name: str, help: str, label: str | None = None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        # label value -> [per-bucket counts..., +Inf count], sum
+        self._counts: dict[str, list[int]] = {}
+        self._sums: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label: str = ""):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(label)
+            if counts is None:
+                counts = self._counts[label] = [0] * (len(self.buckets) + 1)
+                self._sums[label] = 0.0
+            counts[index] += 1
+            self._sums[label] += value
+
+    def snapshot(self) -> dict[str, dict]:
+        """label value -> {"count", "sum", "buckets": [(le, cumulative count), ...]}."""
+        with self._lock:
+            items = [(label, list(counts), self._sums[label]) for label, counts in self._counts.items()]
+        out = {}
+        for label, counts, total in items:
+            running = 0
+            cumulative = []
+            for le, n in zip(self.buckets + (math.inf,), counts):
+                running += n
+                cumulative.append((le, running))
+            out[label] = {"count": running, "sum": total, "buckets": cumulative}
+        return out
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label, series in sorted(self.snapshot().items()):
+            base = f'{self.label}="{_escape(label)}"' if self.label else ""
+            for le, count in series["buckets"]:
+                labels = f'{base},le="{_format_value(le)}"' if base else f'le="{_format_value(le)}"'
+                lines.append(f"{self.name}_bucket{{{labels}}} {count}")
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{suffix} {series['count']}")
+        return lines
+
+
+def render_value(name: str, kind: str, help: str, value: float) -> list[str]:
+    """A single gauge or counter sample."""
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_format_value(value)}"]
+
+
+def render(histograms, extra: list[str] | None = None) -> str:
+    lines = []
+    for histogram in histograms:
+        lines.extend(histogram.render())
+    lines.extend(extra or [])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,183 @@
+"""
+Typed OCR result model: OcrPage holds OcrLine records (text, conf, bbox).
+
+The remote Space returns one of three line formats per response:
+
+    "boxed"  [[[x, y], [x, y], [x, y], [x, y]], [text, conf]]   (PaddleOCR)
+    "pair"   [text, conf]
+    "text"   bare string
+
+parse_pages() decides the format once from the first line and parses every
+page with that format's comprehension. Responses that mix formats fall back
+to the per-line guesser (the old parse_remote_response logic).
+
+Bounding boxes are normalised to (x0, y0, x1, y1), so callers can group
+lines into rows/columns (group_rows) instead of re-splitting strings.
+"""
+from __future__ import annotations
+
+_LIST_TYPES = {list, tuple}
+
+
+class OcrLine:
+    __slots__ = ("text", "conf", "bbox")
+
+    def __init__(self, text: str, conf: float = 0.0, bbox: tuple[float, float, float, float] | None = None):
+        self.text = text
+        self.conf = conf
+        self.bbox = bbox
+
+    def __repr__(self) -> str:
+        return f"OcrLine({self.text!r}, {self.conf}, {self.bbox})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, OcrLine) and (self.text, self.conf, self.bbox) == (other.text, other.conf, other.bbox)
+
+    def record(self) -> dict:
+        """Stage-1 / raw_result dict: {"text", "conf"} plus "bbox" when known."""
+        if self.bbox is None:
+            return {"text": self.text, "conf": self.conf}
+        return {"text": self.text, "conf": self.conf, "bbox": list(self.bbox)}
+
+
+class OcrPage:
+    __slots__ = ("index", "lines")
+
+    def __init__(self, index: int, lines: list[OcrLine]):
+        self.index = index
+        self.lines = lines
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __repr__(self) -> str:
+        return f"OcrPage({self.index}, {len(self.lines)} lines)"
+
+    def rows(self, tolerance: float = 0.5) -> list[list[OcrLine]]:
+        return group_rows(self.lines, tolerance)
+
+
+def normalize_bbox(box) -> tuple[float, float, float, float] | None:
+    """4-point polygon or flat [x0, y0, x1, y1] -> (x0, y0, x1, y1)."""
+    try:
+        if box and isinstance(box[0], (list, tuple)):
+            xs = [float(p[0]) for p in box]
+            ys = [float(p[1]) for p in box]
+            return (min(xs), min(ys), max(xs), max(ys))
+        if len(box) == 4:
+            return tuple(float(v) for v in box)
+    except (TypeError, ValueError, IndexError):
+        pass
+    return None
+
+
+def detect_format(item) -> str:
+    if isinstance(item, (list, tuple)):
+        if len(item) == 2 and isinstance(item[0], list) and isinstance(item[1], (list, tuple)):
+            return "boxed"
+        if len(item) >= 2:
+            return "pair"
+    if isinstance(item, str):
+        return "text"
+    return "mixed"
+
+
+def _parse_line(item, clean) -> OcrLine:
+    # Per-line guesser for responses that mix formats
+    text = ""
+    conf = 0.0
+    bbox = None
+    if isinstance(item, (list, tuple)):
+        if len(item) == 2 and isinstance(item[0], list) and isinstance(item[1], (list, tuple)):
+            bbox = normalize_bbox(item[0])
+            text = item[1][0]
+            conf = item[1][1]
+        elif len(item) >= 2:
+            text = str(item[0])
+            conf = float(item[1]) if isinstance(item[1], (int, float, str)) else 0.0
+        elif len(item) >= 1:
+            text = str(item[0])
+    else:
+        text = str(item)
+    return OcrLine(clean(text), float(conf), bbox)
+
+
+def _quad_bbox(box):
+    # PaddleOCR 4-point polygon, clockwise from top-left: the diagonal corners
+    # bound the line (6x cheaper than min/max over all points). Anything else
+    # raises and the response is re-parsed line by line.
+    (ax, ay), _, (cx, cy), _ = box
+    if ax <= cx and ay <= cy:
+        return (ax, ay, cx, cy)
+    return (min(ax, cx), min(ay, cy), max(ax, cx), max(ay, cy))
+
+
+def _parse_boxed(page, clean):
+    return [OcrLine(clean(tc[0]), float(tc[1]), _quad_bbox(box)) for box, tc in page]
+
+
+def _parse_pair(page, clean):
+    return [OcrLine(clean(str(item[0])), float(item[1])) for item in page]
+
+
+def _parse_text(page, clean):
+    return [OcrLine(clean(item)) for item in page]
+
+
+_PARSERS = {"boxed": _parse_boxed, "pair": _parse_pair, "text": _parse_text}
+_ITEM_TYPES = {"boxed": _LIST_TYPES, "pair": _LIST_TYPES, "text": {str}}
+
+
+def parse_pages(results: list, clean=None) -> tuple[list[OcrPage], str]:
+    """
+    Parses the "result" list of a remote /ocr response (one list of lines per
+    page; non-list entries are skipped). `clean` is applied to every text.
+    Returns (pages, format).
+    """
+    clean = clean or (lambda text: text)
+    page_lists = [(index, page) for index, page in enumerate(results) if isinstance(page, list)]
+    first = next((page[0] for _, page in page_lists if page), None)
+    fmt = detect_format(first) if first is not None else "text"
+
+    parser = _PARSERS.get(fmt)
+    if parser is not None:
+        allowed = _ITEM_TYPES[fmt]
+        try:
+            pages = []
+            for index, page in page_lists:
+                if not set(map(type, page)) <= allowed:
+                    raise TypeError("mixed line formats")
+                pages.append(OcrPage(index, parser(page, clean)))
+            return pages, fmt
+        except (TypeError, ValueError, IndexError):
+            pass
+
+    return [OcrPage(index, [_parse_line(item, clean) for item in page]) for index, page in page_lists], "mixed"
+
+
+def group_rows(lines: list[OcrLine], tolerance: float = 0.5) -> list[list[OcrLine]]:
+    """
+    Groups boxed lines into visual rows, top to bottom, each row left to
+    right. A line joins the current row when its vertical centre is within
+    `tolerance` x line height of the row's centre. Lines without a bbox are
+    left out.
+    """
+    boxed = sorted((line for line in lines if line.bbox), key=lambda line: line.bbox[1] + line.bbox[3])
+    rows = []
+    current = []
+    centre = height = 0.0
+    for line in boxed:
+        x0, y0, x1, y1 = line.bbox
+        line_centre = (y0 + y1) / 2
+        if current and abs(line_centre - centre) <= tolerance * max(height, y1 - y0):
+            current.append(line)
+            centre += (line_centre - centre) / len(current)
+            height = max(height, y1 - y0)
+        else:
+            if current:
+                rows.append(sorted(current, key=lambda line: line.bbox[0]))
+            current = [line]
+            centre, height = line_centre, y1 - y0
+    if current:
+        rows.append(sorted(current, key=lambda line: line.bbox[0]))
+    return rows
@@ -0,0 +1,212 @@
+"""
+Warm worker pool used by ocr_server.
+
+Each worker process imports ocr_service (and its PDF/OCR backends) once at
+startup, so requests only pay for the extraction itself instead of
+interpreter startup + imports on every upload.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ocr_metrics import Histogram
+
+logger = logging.getLogger("ocr_pool")
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+# Set in each worker by _init_worker
+_process_document = None
+
+
+class PoolSaturated(Exception):
+    """Raised when the pending queue is full and the request should be rejected."""
+
+
+def _init_worker(workers: int = 1):
+    # Workers may be spawned (Windows/macOS) rather than forked, so make sure
+    # the 'extractor' package and ocr_service are importable from here.
+    global _process_document
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.append(SCRIPTS_DIR)
+    # Requests are already spread across the pool; don't fan pages out again
+    # inside each worker unless explicitly configured, and split the cores
+    # between the workers' local OCR engines.
+    os.environ.setdefault("OCR_PDF_WORKERS", "1")
+    os.environ.setdefault("OCR_LOCAL_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+    from ocr_service import process_document, lazy_import, WARM_IMPORTS
+    # ocr_service defers its heavy backends; a long-lived worker should pay
+    # for them once here rather than on its first request.
+    for name in WARM_IMPORTS:
+        lazy_import(name)
+    # Same for the local OCR models, so the fallback is warm when the Space is not
+    import ocr_local
+    if ocr_local.enabled():
+        ocr_local.get_pool()
+    _process_document = process_document
+
+
+def _ping():
+    # Short sleep so each warm-up ping lands on a different worker
+    time.sleep(0.05)
+    return os.getpid()
+
+
+def _timed(fn, *args):
+    # Measured inside the worker so service time excludes queue wait
+    start = time.monotonic()
+    result = fn(*args)
+    return result, time.monotonic() - start
+
+
+def _run_path(image_path: str) -> dict:
+    return _process_document(image_path)
+
+
+def _run_bytes(data: bytes | bytearray, filename: str) -> dict:
+    # The upload stays in memory; its name only supplies the extension
+    return _process_document(data, filename=filename)
+
+
+class WorkerPool:
+    """
+    Process pool with pre-imported workers plus the bookkeeping needed to
+    report queue depth and utilization.
+    """
+
+    def __init__(self, workers: int | None = None, max_queue: int | None = None):
+        self.workers = workers or int(os.environ.get("OCR_WORKERS", DEFAULT_WORKERS))
+        # Pending (not yet running) jobs allowed before new ones are rejected.
+        self.max_queue = max_queue if max_queue is not None else int(os.environ.get("OCR_MAX_QUEUE", self.workers * 8))
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._restarts = 0
+        self._busy_seconds = 0.0
+        self._latency_seconds = 0.0
+        self._started_at = None
+        self.worker_pids: list[int] = []
+        # Seconds between submit and a worker picking the job up / inside the worker
+        self.wait_seconds = Histogram("ocr_pool_queue_wait_seconds", "Time jobs waited for a free worker.")
+        self.service_seconds = Histogram("ocr_pool_service_seconds", "Time jobs spent running in a worker.")
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.workers,))
+
+    def _warm(self, executor: ProcessPoolExecutor):
+        # Force every worker to spawn and finish its imports
+        futures = [executor.submit(_ping) for _ in range(self.workers)]
+        self.worker_pids = sorted({f.result() for f in futures})
+
+    def start(self):
+        self._executor = self._new_executor()
+        # Warm before we accept traffic
+        self._warm(self._executor)
+        self._started_at = time.monotonic()
+
+    async def _restart(self, broken: ProcessPoolExecutor):
+        """
+        Replaces `broken` after a worker died (OOM in cv2/onnx, segfault).
+        Every request that hit the broken pool calls this; only the first
+        one swaps the executor in.
+        """
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = fresh = self._new_executor()
+            self._restarts += 1
+        logger.warning(f"OCR worker died; restarting the pool (restart #{self._restarts})")
+        broken.shutdown(wait=False, cancel_futures=True)
+        await asyncio.to_thread(self._warm, fresh)
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    @property
+    def active(self) -> int:
+        return min(self._in_flight, self.workers)
+
+    async def _submit(self, fn, *args) -> dict:
+        if self._executor is None:
+            raise RuntimeError("Worker pool is not started")
+
+        with self._lock:
+            if self.queue_depth >= self.max_queue:
+                self._rejected += 1
+                raise PoolSaturated(f"OCR queue is full ({self.queue_depth} pending)")
+            self._in_flight += 1
+
+        start = time.monotonic()
+        service = 0.0
+        ok = False
+        executor = self._executor
+        try:
+            loop = asyncio.get_running_loop()
+            result, service = await loop.run_in_executor(executor, _timed, fn, *args)
+            ok = "error" not in result
+            return result
+        except BrokenProcessPool:
+            # A worker died under this request (or under one sharing the pool
+            # with it). Fail it, but bring up a new pool for the ones after.
+            await self._restart(executor)
+            return {"error": "OCR worker crashed while processing the document"}
+        finally:
+            latency = time.monotonic() - start
+            if service:
+                # Jobs that raised inside the worker have no service time to split
+                self.wait_seconds.observe(max(0.0, latency - service))
+                self.service_seconds.observe(service)
+            with self._lock:
+                self._in_flight -= 1
+                self._busy_seconds += service
+                self._latency_seconds += latency
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    async def process_path(self, image_path: str) -> dict:
+        return await self._submit(_run_path, image_path)
+
+    async def process_bytes(self, data: bytes | bytearray, filename: str) -> dict:
+        return await self._submit(_run_bytes, data, filename)
+
+    def stats(self) -> dict:
+        with self._lock:
+            uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+            done = self._completed + self._failed
+            return {
+                "workers": self.workers,
+                "worker_pids": self.worker_pids,
+                "active": self.active,
+                "queue_depth": self.queue_depth,
+                "max_queue": self.max_queue,
+                "utilization": round(self.active / self.workers, 3) if self.workers else 0.0,
+                # Share of total worker capacity spent busy since startup
+                "avg_utilization": round(self._busy_seconds / (uptime * self.workers), 3) if uptime else 0.0,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "restarts": self._restarts,
+                "avg_service_ms": round(self._busy_seconds * 1000 / done, 1) if done else 0.0,
+                "avg_latency_ms": round(self._latency_seconds * 1000 / done, 1) if done else 0.0,
+                "uptime_s": round(uptime, 1),
+            }
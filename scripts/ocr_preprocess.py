@@ -0,0 +1,319 @@
+"""
+Page rasterization and image clean-up before remote OCR.
+
+The Space's time goes on pixels, and phone photos of certificates are often
+several megabytes; scanned PDFs used to be uploaded whole. prepare_uploads()
+turns a document into one bounded image upload per page:
+
+  PDF    each page (or the pages triage left for OCR) rasterized in grayscale
+         at OCR_RASTER_DPI with pypdfium2, capped at the resolution of the
+         scan it holds; a page that is a single JPEG is treated as an image
+  image  decoded with cv2
+
+then grayscale, downscaled so the long side is at most OCR_MAX_SIDE, deskewed
+(projection-profile search within +/-OCR_DESKEW_MAX degrees) and JPEG-encoded,
+lowering quality and then scale until it fits OCR_MAX_UPLOAD_KB.
+
+Images that are already within bounds (checked from the JPEG/PNG header) are
+sent untouched: re-encoding a small JPEG costs quality and rarely saves bytes
+(it also keeps the upload hashes the stub's recorded fixtures are keyed by).
+
+Pages are yielded one at a time so ocr_service can upload page 1 while page 2
+is still being rendered (remote_ocr_many_sync). page_images() yields the same
+cleaned pages as arrays, unencoded, for local OCR (ocr_local.py).
+"""
+from __future__ import annotations
+import importlib.util
+import os
+
+HAS_CV2 = importlib.util.find_spec("cv2") is not None
+HAS_PDFIUM = importlib.util.find_spec("pypdfium2") is not None
+
+RASTER_DPI = 200
+# PaddleOCR's detector works at ~960px; 2000px leaves headroom for small print
+MAX_SIDE = 2000
+MAX_UPLOAD_KB = 400
+JPEG_QUALITY = 80
+# Quality steps tried before shrinking the image further
+MIN_JPEG_QUALITY = 50
+DESKEW_MAX = 5.0
+DESKEW_STEP = 0.5
+# Below this the rotation would blur more than it straightens
+DESKEW_MIN = 0.5
+# Width the skew search runs at; angles don't need full resolution
+DESKEW_WIDTH = 600
+
+
+def _env_flag(name: str, default: str = "1") -> bool:
+    return os.environ.get(name, default).lower() not in ("0", "false", "off", "no")
+
+
+def enabled() -> bool:
+    """OCR_PREPROCESS (default on); also off when cv2 is not installed."""
+    return HAS_CV2 and _env_flag("OCR_PREPROCESS")
+
+
+def settings() -> dict:
+    return {
+        "dpi": int(os.environ.get("OCR_RASTER_DPI", RASTER_DPI)),
+        "max_side": int(os.environ.get("OCR_MAX_SIDE", MAX_SIDE)),
+        "max_bytes": int(os.environ.get("OCR_MAX_UPLOAD_KB", MAX_UPLOAD_KB)) * 1024,
+        "quality": int(os.environ.get("OCR_JPEG_QUALITY", JPEG_QUALITY)),
+        "deskew": _env_flag("OCR_DESKEW"),
+        "deskew_max": float(os.environ.get("OCR_DESKEW_MAX", DESKEW_MAX)),
+    }
+
+
+def to_gray(image):
+    import cv2
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    if image.shape[2] == 1:
+        return image[:, :, 0]
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def fit(gray, max_side: int):
+    """Downscales so the longer side is at most `max_side` (never upscales)."""
+    import cv2
+    height, width = gray.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return gray
+    return cv2.resize(gray, (max(1, round(width * scale)), max(1, round(height * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+
+def _rotate(image, angle: float, border: int, interpolation):
+    import cv2
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(image, matrix, (width, height), flags=interpolation,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+
+
+def estimate_skew(gray, max_angle: float = DESKEW_MAX, step: float = DESKEW_STEP) -> float:
+    """
+    Rotation (degrees, cv2 convention) that makes the text lines horizontal:
+    the angle whose row profile of ink is sharpest. Returns 0.0 when no angle
+    beats the unrotated page by a clear margin.
+    """
+    import cv2
+    import numpy as np
+    small = fit(gray, DESKEW_WIDTH)
+    _, ink = cv2.threshold(small, 0, 1, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    if not ink.any():
+        return 0.0
+
+    def sharpness(angle):
+        rows = _rotate(ink, angle, 0, cv2.INTER_NEAREST).sum(axis=1, dtype=np.int64)
+        return float(np.square(np.diff(rows)).sum())
+
+    base = sharpness(0.0)
+    best_angle, best = 0.0, base
+    # Coarse pass at 2*step, then the two neighbours of the winner
+    coarse = 2 * step
+    n = int(max_angle / coarse)
+    candidates = [i * coarse for i in range(-n, n + 1) if i]
+    for _ in range(2):
+        for angle in candidates:
+            score = sharpness(angle)
+            if score > best:
+                best_angle, best = angle, score
+        candidates = [a for a in (best_angle - step, best_angle + step) if abs(a) <= max_angle]
+    # Flat pages score within noise of each other; only rotate on a clear win
+    return best_angle if best > base * 1.05 and abs(best_angle) >= DESKEW_MIN else 0.0
+
+
+def deskew(gray, angle: float):
+    import cv2
+    return _rotate(gray, angle, 255, cv2.INTER_LINEAR) if angle else gray
+
+
+def encode(gray, max_bytes: int, quality: int = JPEG_QUALITY) -> bytes:
+    """JPEG within `max_bytes`: lower quality first, then shrink by 20% steps."""
+    import cv2
+    while True:
+        q = quality
+        while True:
+            ok, buffer = cv2.imencode(".jpg", gray, [cv2.IMWRITE_JPEG_QUALITY, q])
+            if not ok:
+                raise ValueError("JPEG encoding failed")
+            if len(buffer) <= max_bytes or q <= MIN_JPEG_QUALITY:
+                break
+            q = max(MIN_JPEG_QUALITY, q - 10)
+        if len(buffer) <= max_bytes or max(gray.shape[:2]) <= 256:
+            return buffer.tobytes()
+        gray = fit(gray, int(max(gray.shape[:2]) * 0.8))
+
+
+def clean_page(gray, config: dict) -> tuple[object, float]:
+    """Grayscale page -> (bounded, deskewed page, angle applied)."""
+    gray = fit(to_gray(gray), config["max_side"])
+    angle = estimate_skew(gray, config["deskew_max"]) if config["deskew"] else 0.0
+    return deskew(gray, angle), angle
+
+
+# JPEG start-of-frame markers (baseline, progressive, ...) carrying the size
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def image_size(data: bytes) -> tuple[int, int] | None:
+    """(width, height) from a JPEG or PNG header without decoding, else None."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return int.from_bytes(data[16:20], "big"), int.from_bytes(data[20:24], "big")
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker in _SOF_MARKERS:
+            return int.from_bytes(data[i + 7:i + 9], "big"), int.from_bytes(data[i + 5:i + 7], "big")
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def prepare_image(data: bytes, config: dict | None = None) -> tuple[bytes, dict]:
+    """
+    Prepared upload for one image file. Returns (bytes, info); bytes is
+    `data` itself when the image is already within bounds, which is decided
+    from the header alone. Only images being re-encoded anyway (photos) are
+    deskewed; flatbed scans and e-certificates come in straight.
+    """
+    import cv2
+    import numpy as np
+    config = config or settings()
+    size = image_size(data)
+    if size is not None and max(size) <= config["max_side"] and len(data) <= config["max_bytes"]:
+        return data, {"kept": True, "size": size}
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        return data, {"kept": True, "reason": "undecodable"}
+    height, width = image.shape[:2]
+    if max(height, width) <= config["max_side"] and len(data) <= config["max_bytes"]:
+        return data, {"kept": True, "size": (width, height)}
+    gray, angle = clean_page(image, config)
+    out = encode(gray, config["max_bytes"], config["quality"])
+    return out, {"kept": False, "size": (gray.shape[1], gray.shape[0]), "skew": angle, "bytes_in": len(data)}
+
+
+def _image_scale(page) -> float | None:
+    """Pixels per point of the sharpest image on the page, or None without images."""
+    import pypdfium2.raw as pdfium_c
+    best = None
+    for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=2):
+        left, bottom, right, top = obj.get_bounds()
+        width_px, height_px = obj.get_px_size()
+        if right - left > 0 and top - bottom > 0:
+            scale = max(width_px / (right - left), height_px / (top - bottom))
+            best = scale if best is None else max(best, scale)
+    return best
+
+
+def _embedded_jpeg(page) -> bytes | None:
+    """The JPEG stream of a page that is nothing but one JPEG image (a typical scan)."""
+    import pypdfium2.raw as pdfium_c
+    if pdfium_c.FPDFPage_CountObjects(page) != 1:
+        return None
+    obj = next(page.get_objects(max_depth=1))
+    if obj.type != pdfium_c.FPDF_PAGEOBJ_IMAGE or obj.get_filters() != ["DCTDecode"]:
+        return None
+    return bytes(obj.get_data(decode_simple=False))
+
+
+def render_pages(path: str, pages: list[int] | None = None, dpi: int = RASTER_DPI):
+    """
+    Yields (page index, grayscale array or JPEG bytes) for `pages` (default
+    all) of a PDF. A page holding a single JPEG yields that JPEG untouched
+    (prepare_image decides whether it needs work); other scanned pages are
+    rendered no finer than their embedded image: a 100 dpi scan drawn at
+    200 dpi is twice the pixels with nothing more to read.
+    """
+    import pypdfium2 as pdfium
+    from ocr_input import pdfium_input
+    pdf = pdfium.PdfDocument(pdfium_input(path))
+    try:
+        for index in (range(len(pdf)) if pages is None else pages):
+            page = pdf[index]
+            jpeg = _embedded_jpeg(page)
+            if jpeg is not None:
+                page.close()
+                yield index, jpeg
+                continue
+            scale = dpi / 72
+            image_scale = _image_scale(page)
+            if image_scale is not None:
+                scale = min(scale, image_scale)
+            bitmap = page.render(scale=scale, grayscale=True)
+            # Copy: the array is a view of the bitmap's buffer
+            array = bitmap.to_numpy().copy()
+            bitmap.close()
+            page.close()
+            yield index, array
+    finally:
+        pdf.close()
+
+
+def prepare_uploads(path: str, pages: list[int] | None = None, add_trace=None):
+    """
+    Yields (bytes, filename) uploads for `path` (a path or an
+    ocr_input.Document): one JPEG per PDF page (or per index in `pages`), or
+    the prepared image. Call only when enabled().
+    """
+    import ocr_input
+    config = settings()
+    filename = ocr_input.name(path)
+    base = os.path.splitext(filename)[0] or "document"
+    if ocr_input.is_pdf(path):
+        if not HAS_PDFIUM:
+            raise ImportError("pypdfium2 is required to rasterize PDF pages")
+        for index, page in render_pages(path, pages, config["dpi"]):
+            if isinstance(page, bytes):
+                data, info = prepare_image(page, config)
+                if add_trace:
+                    add_trace("Page %d is a JPEG scan, %s (%d KB)", index + 1,
+                              "sent as is" if info["kept"] else "prepared", len(data) // 1024)
+            else:
+                gray, angle = clean_page(page, config)
+                data = encode(gray, config["max_bytes"], config["quality"])
+                if add_trace:
+                    add_trace("Page %d rasterized: %dx%d, skew %.1f, %d KB", index + 1, gray.shape[1],
+                              gray.shape[0], angle, len(data) // 1024)
+            yield data, f"{base}-p{index + 1}.jpg"
+        return
+
+    data, info = prepare_image(ocr_input.read(path), config)
+    if add_trace:
+        if info["kept"]:
+            add_trace("Image within bounds, uploading as is (%d KB)", len(data) // 1024)
+        else:
+            add_trace("Image prepared: %dx%d, skew %.1f, %d KB -> %d KB", *info["size"], info["skew"],
+                      info["bytes_in"] // 1024, len(data) // 1024)
+    yield data, filename if info["kept"] else f"{base}.jpg"
+
+
+def page_images(path: str, pages: list[int] | None = None, config: dict | None = None):
+    """
+    Yields (page index, cleaned grayscale array) for `path`: the pages
+    prepare_uploads would send, bounded and deskewed but not JPEG-encoded.
+    """
+    import cv2
+    import numpy as np
+    import ocr_input
+    config = config or settings()
+    if ocr_input.is_pdf(path):
+        if not HAS_PDFIUM:
+            raise ImportError("pypdfium2 is required to rasterize PDF pages")
+        for index, page in render_pages(path, pages, config["dpi"]):
+            if isinstance(page, bytes):
+                page = cv2.imdecode(np.frombuffer(page, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            yield index, clean_page(page, config)[0]
+        return
+    image = cv2.imdecode(np.frombuffer(ocr_input.read(path), dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"Could not decode image {ocr_input.name(path)}")
+    yield 0, clean_page(image, config)[0]
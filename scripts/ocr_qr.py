@@ -0,0 +1,86 @@
+"""
+Local QR decoding for the fast path in ocr_service (qr_fast_path).
+
+SSM e-certificates carry a QR code with the registration identity; when its
+payload already names the entity, number and date (extractor/qr_payload.py)
+the remote OCR round-trip is unnecessary.
+
+Decoders, in order of preference:
+  pyzbar  - zbar; fast and tolerant of print/scan noise (optional)
+  cv2     - cv2.QRCodeDetectorAruco (QRCodeDetector on older builds), shipped
+            with opencv
+Images are bounded with ocr_preprocess.fit first, so a 12 MP photo is
+searched at upload size rather than full resolution; PDFs are rendered like
+upload pages (a page that is a single JPEG is decoded straight from it).
+"""
+from __future__ import annotations
+import importlib.util
+
+HAS_ZBAR = importlib.util.find_spec("pyzbar") is not None
+HAS_CV2 = importlib.util.find_spec("cv2") is not None
+
+# Certificates put the QR on page 1; later pages are not searched
+QR_PAGES = [0]
+
+_detector = None
+
+
+def available() -> bool:
+    return HAS_CV2
+
+
+def _decode_zbar(gray) -> str | None:
+    from pyzbar.pyzbar import decode, ZBarSymbol
+    for symbol in decode(gray, symbols=[ZBarSymbol.QRCODE]):
+        return symbol.data.decode("utf-8", errors="replace")
+    return None
+
+
+def _decode_cv2(gray) -> str | None:
+    global _detector
+    import cv2
+    if _detector is None:
+        # The ArUco-based detector rejects pages without finder patterns
+        # about twice as fast, and most documents have no QR code
+        factory = getattr(cv2, "QRCodeDetectorAruco", None) or cv2.QRCodeDetector
+        _detector = factory()
+    payload, _, _ = _detector.detectAndDecode(gray)
+    return payload or None
+
+
+def decode_gray(gray) -> str | None:
+    """First QR payload found in a grayscale image, or None."""
+    if HAS_ZBAR:
+        try:
+            return _decode_zbar(gray)
+        except ImportError:
+            # pyzbar installed without the zbar shared library
+            pass
+    return _decode_cv2(gray)
+
+
+def _load_gray(data, max_side: int):
+    import cv2
+    import numpy as np
+    from ocr_preprocess import fit
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    return None if image is None else fit(image, max_side)
+
+
+def decode_document(path) -> str | None:
+    """QR payload from an image or the first page of a PDF (a path or an ocr_input.Document), or None."""
+    import ocr_input
+    from ocr_preprocess import render_pages, settings, fit, to_gray
+    config = settings()
+    if ocr_input.is_pdf(path):
+        for _, page in render_pages(path, QR_PAGES, config["dpi"]):
+            if isinstance(page, bytes):
+                gray = _load_gray(page, config["max_side"])
+            else:
+                gray = fit(to_gray(page), config["max_side"])
+            payload = decode_gray(gray) if gray is not None else None
+            if payload:
+                return payload
+        return None
+    gray = _load_gray(ocr_input.read(path), config["max_side"])
+    return decode_gray(gray) if gray is not None else None
@@ -0,0 +1,90 @@
+"""
+Re-runs the extractors over every document in the stage-1 (OCR text) cache.
+
+Use after an extractor rules change: stage-2 entries are keyed by the
+extractor version, so this refreshes them for the new rules without any
+native/remote OCR work. QR fast-path entries are skipped (counted as "qr"):
+their fields come from the payload, not from the extractors.
+
+Usage:
+    python scripts/ocr_reextract.py [--doc-type FORM_9] [--dry-run]
+
+Prints one JSON line per document and a summary on stderr.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from ocr_cache import get_cache, extraction_key, extractor_version, OCR_PREFIX
+from ocr_service import run_extraction, no_trace
+
+
+def reextract(cache, doc_type=None, dry_run=False, out=sys.stdout):
+    summary = {"documents": 0, "updated": 0, "errors": 0, "qr": 0, "by_type": {}}
+    start = time.perf_counter()
+    # Written once the scan is done, not on the connection items() is still reading
+    pending = []
+
+    for key, entry in cache.items(OCR_PREFIX):
+        # ocr:v<stage>:<settings>:<digest>
+        digest = key.rsplit(":", 1)[-1]
+        if entry.get("source") == "qr":
+            summary["qr"] += 1
+            out.write(json.dumps({"digest": digest, "skipped": "qr fast path"}) + "\n")
+            continue
+        full_text = "\n".join(item["text"] for item in entry.get("lines", []))
+        t0 = time.perf_counter()
+        try:
+            found_type, fields = run_extraction(full_text, no_trace, table_words=entry.get("table_words"))
+        except Exception as e:
+            summary["errors"] += 1
+            out.write(json.dumps({"digest": digest, "error": str(e)}) + "\n")
+            continue
+
+        if doc_type and found_type != doc_type:
+            continue
+
+        summary["documents"] += 1
+        summary["by_type"][found_type] = summary["by_type"].get(found_type, 0) + 1
+        if not dry_run:
+            variant = "tables" if entry.get("table_words") else ""
+            pending.append((extraction_key(full_text, variant), {"docType": found_type, "fields": fields}))
+
+        out.write(json.dumps({
+            "digest": digest,
+            "docType": found_type,
+            "ms": round((time.perf_counter() - t0) * 1000, 1),
+        }) + "\n")
+
+    for key, value in pending:
+        cache.set(key, value)
+        summary["updated"] += 1
+
+    summary["extractor_version"] = extractor_version()
+    summary["elapsed_s"] = round(time.perf_counter() - start, 2)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk re-extract cached OCR text with the current extractor rules.")
+    parser.add_argument("--doc-type", help="Only refresh documents classified as this type (e.g. FORM_9)")
+    parser.add_argument("--dry-run", action="store_true", help="Run the extractors but do not write stage-2 entries")
+    args = parser.parse_args()
+
+    cache = get_cache()
+    if cache is None:
+        sys.stderr.write("Cache is disabled (OCR_CACHE=off); nothing to re-extract.\n")
+        sys.exit(1)
+
+    summary = reextract(cache, doc_type=args.doc_type, dry_run=args.dry_run)
+    sys.stderr.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,10 @@ import uvicorn
 import json
 import logging
 import os
-from fastapi import FastAPI, HTTPException
+import time
+import asyncio
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 import contextlib
 
@@ -13,71 +16,264 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-try:
-    from ocr_service import process_document, get_ocr_engine, log_time
-except ImportError:
-    # Fallback if somehow path setup failed, though above append should fix it
-    from scripts.ocr_service import process_document, get_ocr_engine, log_time
+from ocr_pool import WorkerPool, PoolSaturated
+from ocr_metrics import Histogram, render, render_value
+from ocr_jobs import JobQueue, LANES, DEFAULT_LANE, make_store, check_callback_url
+import ocr_input
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ocr_server")
 
-# Global engine variable
-ocr_engine = None
+# Global worker pool (pre-imported ocr_service workers)
+pool: WorkerPool | None = None
+# Asynchronous jobs (POST /jobs), dispatched into the same pool
+jobs: JobQueue | None = None
+
+# Per-stage timings reported by the workers (result["timings_ms"]) and
+# end-to-end request time, exposed on /metrics
+STAGE_SECONDS = Histogram("ocr_stage_seconds", "Time spent in each process_document stage.", label="stage")
+REQUEST_SECONDS = Histogram("ocr_request_seconds", "End-to-end request time, queue wait included.", label="endpoint")
+# Largest accepted /upload body (OCR_MAX_UPLOAD_MB)
+MAX_UPLOAD_MB = 25
+
+# Successful documents, how many of them the local QR code answered without
+# remote OCR (result["fast_path"] == "qr") and how many the local OCR engine
+# read (result["ocr_engine"] == "local")
+DOCUMENTS = {"documents": 0, "qr_fast_path": 0, "local_ocr": 0}
 
 @contextlib.asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Load the model
-    global ocr_engine
-    
-    # Check if we are using Cloud OCR
-    # If HF_API_URL is set in environment (loaded from .env by python-dotenv usually, 
-    # but here we rely on os.environ. We might need to load .env explicitly if not done)
+    # Startup: spin up the warm worker pool
+    global pool, jobs
+
+    # Load .env so HF_API_URL / HF_TOKEN / OCR_WORKERS are visible to the workers
     from dotenv import load_dotenv
     load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
-    
+
     if os.environ.get("HF_API_URL"):
-        logger.info("Cloud OCR detected. Skipping local PaddleOCR initialization to save RAM.")
-        ocr_engine = None
-    else:
-        logger.info("Loading PaddleOCR engine (Local Mode)...")
-        try:
-            ocr_engine = get_ocr_engine()
-            logger.info("PaddleOCR engine loaded and ready.")
-        except Exception as e:
-            logger.error(f"Failed to load OCR engine: {e}")
-            
+        logger.info("Cloud OCR detected. Workers will use the remote OCR endpoint for image documents.")
+    import ocr_local
+    if ocr_local.enabled():
+        logger.info(f"Local OCR fallback: {ocr_local.backend_name()} (OCR_ENGINE={ocr_local.mode()})")
+
+    pool = WorkerPool()
+    logger.info(f"Starting {pool.workers} OCR worker(s)...")
+    pool.start()
+    logger.info(f"OCR workers ready: pids={pool.worker_pids}")
+
+    jobs = JobQueue(make_store(), pool, on_result=_observe_stages)
+    jobs.start()
+    logger.info(f"Job queue at {jobs.store.path} (bulk slots: {jobs.bulk_slots})")
+
     yield
     # Shutdown
     logger.info("Shutting down OCR server...")
+    await jobs.stop()
+    pool.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
 class OCRRequest(BaseModel):
     image_path: str
 
+class JobRequest(BaseModel):
+    image_path: str
+    lane: str = DEFAULT_LANE
+    callback_url: str | None = None
+
 @app.get("/")
 def read_root():
-    return {"status": "running", "service": "OCR Service"}
+    return {"status": "running", "service": "OCR Service", "workers": pool.workers if pool else 0}
+
+@app.get("/stats")
+def read_stats():
+    return pool.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """Prometheus text exposition: stage/request/queue histograms plus pool gauges."""
+    histograms = [STAGE_SECONDS, REQUEST_SECONDS]
+    extra = []
+    if pool is not None:
+        histograms += [pool.wait_seconds, pool.service_seconds]
+        stats = pool.stats()
+        for key, kind, help in (
+            ("workers", "gauge", "Worker processes."),
+            ("active", "gauge", "Jobs running in a worker."),
+            ("queue_depth", "gauge", "Jobs waiting for a worker."),
+            ("completed", "counter", "Jobs finished without an error result."),
+            ("failed", "counter", "Jobs that returned or raised an error."),
+            ("rejected", "counter", "Jobs rejected because the queue was full."),
+        ):
+            name = f"ocr_pool_{key}_total" if kind == "counter" else f"ocr_pool_{key}"
+            extra += render_value(name, kind, help, stats[key])
+    if jobs is not None:
+        histograms += [jobs.wait_seconds, jobs.service_seconds]
+        counts = jobs.store.counts()
+        extra += ["# HELP ocr_jobs_queued Jobs waiting in the job queue.", "# TYPE ocr_jobs_queued gauge"]
+        extra += [f'ocr_jobs_queued{{lane="{lane}"}} {counts.get("queued", {}).get(lane, 0)}' for lane in LANES]
+        extra += ["# HELP ocr_jobs_running Jobs dispatched to the worker pool.", "# TYPE ocr_jobs_running gauge"]
+        extra += [f'ocr_jobs_running{{lane="{lane}"}} {n}' for lane, n in jobs.running().items()]
+    extra += render_value("ocr_documents_total", "counter", "Documents extracted successfully.",
+                          DOCUMENTS["documents"])
+    extra += render_value("ocr_qr_fast_path_total", "counter", "Documents answered from the QR code alone.",
+                          DOCUMENTS["qr_fast_path"])
+    extra += render_value("ocr_local_ocr_total", "counter", "Documents read by the local OCR engine.",
+                          DOCUMENTS["local_ocr"])
+    return PlainTextResponse(render(histograms, extra), media_type="text/plain; version=0.0.4")
+
+def _observe(endpoint: str, start: float, result: dict) -> dict:
+    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+    return _observe_stages(result)
+
+def _observe_stages(result: dict) -> dict:
+    for stage, ms in result.get("timings_ms", {}).items():
+        STAGE_SECONDS.observe(ms / 1000, stage)
+    if result.get("success"):
+        DOCUMENTS["documents"] += 1
+        if result.get("fast_path") == "qr":
+            DOCUMENTS["qr_fast_path"] += 1
+        if result.get("ocr_engine") == "local":
+            DOCUMENTS["local_ocr"] += 1
+    return result
 
 @app.post("/process")
-def process_image(request: OCRRequest):
+async def process_image(request: OCRRequest):
     if not request.image_path:
         raise HTTPException(status_code=400, detail="Image path is required")
-        
+
     logger.info(f"Processing request for: {request.image_path}")
-    
-    # Use the pre-loaded engine
-    # Note: process_document captures stdout/stderr logic inside? 
-    # No, it returns a dict. log_time writes to stderr.
-    result = process_document(request.image_path, ocr_engine=ocr_engine)
-    
-    if "error" in result:
-        pass
-        
-    return result
+
+    start = time.perf_counter()
+    try:
+        return _observe("process", start, await pool.process_path(request.image_path))
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+class UploadTooLarge(Exception):
+    pass
+
+async def read_upload(request: Request, field: str = "file") -> tuple[bytearray, str]:
+    """
+    The `field` file of a multipart/form-data body, parsed while it streams
+    in. Starlette's form parser spools file parts over 1 MB to a temp file
+    and copies them again on read; here each chunk is appended to one buffer
+    and nothing touches the disk.
+    """
+    from python_multipart.multipart import MultipartParser, parse_options_header
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    limit = int(os.environ.get("OCR_MAX_UPLOAD_MB", MAX_UPLOAD_MB)) * 1024 * 1024
+    wanted = field.encode()
+    part = {"headers": {}, "field": bytearray(), "value": bytearray(), "target": None}
+    found = {}
+
+    def on_part_begin():
+        part["headers"], part["target"] = {}, None
+
+    def on_header_field(data, start, end):
+        part["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][bytes(part["field"]).lower()] = bytes(part["value"])
+        part["field"].clear()
+        part["value"].clear()
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get(b"content-disposition"))
+        if disposition.get(b"name") == wanted and "data" not in found:
+            found["data"] = part["target"] = bytearray()
+            found["filename"] = disposition.get(b"filename", b"").decode("utf-8", "replace")
+
+    def on_part_data(data, start, end):
+        target = part["target"]
+        if target is not None:
+            target += memoryview(data)[start:end]
+            if len(target) > limit:
+                raise UploadTooLarge()
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin, "on_header_field": on_header_field,
+        "on_header_value": on_header_value, "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished, "on_part_data": on_part_data,
+    })
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {limit // (1024 * 1024)} MB")
+    if "data" not in found:
+        raise HTTPException(status_code=400, detail=f"Missing '{field}' file field")
+    return found["data"], found["filename"]
+
+@app.post("/upload")
+async def upload_document(request: Request):
+    data, filename = await read_upload(request)
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty upload")
+
+    logger.info(f"Processing upload: {filename} ({len(data)} bytes)")
+
+    start = time.perf_counter()
+    try:
+        return _observe("upload", start, await pool.process_bytes(data, filename))
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+async def _job_response(job_id: str, deduplicated: bool) -> dict:
+    job = await asyncio.to_thread(jobs.store.get, job_id)
+    return {"id": job_id, "status": job["status"], "lane": job["lane"], "deduplicated": deduplicated}
+
+def _check_job(lane: str, callback_url: str | None):
+    if lane not in LANES:
+        raise HTTPException(status_code=400, detail=f"lane must be one of: {', '.join(LANES)}")
+    if callback_url:
+        try:
+            check_callback_url(callback_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: JobRequest):
+    """Queues a server-side file; poll GET /jobs/{id} or pass callback_url."""
+    _check_job(request.lane, request.callback_url)
+    if not os.path.isfile(request.image_path):
+        raise HTTPException(status_code=400, detail=f"File not found: {request.image_path}")
+    digest = await asyncio.to_thread(ocr_input.digest, request.image_path)
+    job_id, deduplicated = await jobs.submit(digest, os.path.basename(request.image_path), path=request.image_path,
+                                             lane=request.lane, callback_url=request.callback_url)
+    logger.info(f"Job {job_id} ({request.lane}) for: {request.image_path}{' [deduplicated]' if deduplicated else ''}")
+    return await _job_response(job_id, deduplicated)
+
+@app.post("/jobs/upload", status_code=202)
+async def submit_upload_job(request: Request, lane: str = DEFAULT_LANE, callback_url: str | None = None):
+    """/upload as a job: ?lane=interactive|bulk&callback_url=..."""
+    _check_job(lane, callback_url)
+    data, filename = await read_upload(request)
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty upload")
+    digest = await asyncio.to_thread(ocr_input.digest, ocr_input.as_input(data, filename))
+    job_id, deduplicated = await jobs.submit(digest, filename, data=data, lane=lane, callback_url=callback_url)
+    logger.info(f"Job {job_id} ({lane}) for upload: {filename} ({len(data)} bytes)"
+                f"{' [deduplicated]' if deduplicated else ''}")
+    return await _job_response(job_id, deduplicated)
+
+@app.get("/jobs/{job_id}")
+def read_job(job_id: str):
+    job = jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
 
 if __name__ == "__main__":
-    # Run on localhost:8000
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    # Run on localhost:8000 by default
+    host = os.environ.get("OCR_SERVER_HOST", "127.0.0.1")
+    port = int(os.environ.get("OCR_SERVER_PORT", "8000"))
+    uvicorn.run(app, host=host, port=port)
@@ -1,116 +1,129 @@
 import sys
 import time
-import requests
-import os
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
 
 start_time = time.time()
+_startup_t0 = time.perf_counter()
 
-def log_time(msg):
+# Switched off with OCR_TRACE=0 (read once .env is loaded, below)
+_log_enabled = True
+
+def log_time(msg, *args):
+    """[TIME] line on stderr. `args` are %-formatted only when logging is on."""
+    if not _log_enabled:
+        return
+    if args:
+        msg = msg % args
     elapsed = time.time() - start_time
     sys.stderr.write(f"[TIME] {elapsed:.2f}s - {msg}\n")
 
-log_time("Script started")
-
 import json
 import os
-import logging
-import cv2
-import numpy as np
-# Lazy import PaddleOCR to save resources if using remote only
-# from paddleocr import PaddleOCR 
-
+import re
+import importlib
+import importlib.util
 import traceback
-from extractor.rules_base import classify_doc, normalize_text, avg_confidence
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# OCR_TRACE=0 drops the per-document trace strings and [TIME] lines; stage
+# timings (timings_ms) are collected either way
+TRACE_ENABLED = os.environ.get("OCR_TRACE", "1").lower() not in ("0", "off", "false")
+_log_enabled = TRACE_ENABLED
+# Logged only now so OCR_TRACE=0 silences it too; the elapsed time still counts from start_time
+log_time("Script started")
+
+from extractor.rules_base import normalize_text, avg_confidence
+from extractor.classifier import rank_doc_types
+from extractor.patterns import MERGED_WORD_FIXES, RE_MERGED_WORDS, RE_MERGED_SPLITS
 from extractor.form_d import extract_form_d
 from extractor.form_9 import extract_form_9
 from extractor.llp import extract_llp
 from extractor.corporate_info import extract_corporate_info
+from ocr_cache import get_cache, ocr_key, extraction_key
+from ocr_client import remote_ocr_many_sync, merge_responses, get_client, RemoteOcrError
+from ocr_model import parse_pages
+from ocr_metrics import collect, span
+import ocr_input
 
-# Check for pypdfium2
-try:
-    import pypdfium2 as pdfium
-    HAS_PDFIUM = True
-except ImportError:
-    HAS_PDFIUM = False
-
-# Check for pdfplumber (Native Text Extraction)
-try:
-    import pdfplumber
-    HAS_PDFPLUMBER = True
-except ImportError:
-    HAS_PDFPLUMBER = False
-
-# Check for pyzbar
-try:
-    from pyzbar.pyzbar import decode as qr_decode
-    from PIL import Image
-    HAS_ZBAR = True
-except ImportError:
-    HAS_ZBAR = False
-
-# Suppress PaddleOCR logs - REMOVED
-# logging.getLogger("ppocr").setLevel(logging.ERROR)
+# ---------------------------------------------------------
+# Optional backends
+# ---------------------------------------------------------
+# Heavy libraries (httpx, pdfplumber, pypdfium2, pyzbar, cv2/numpy) are only
+# probed with find_spec here and imported on first use via lazy_import(), so the
+# CLI does not pay for backends a given document never touches.
+def _has_module(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
 
-import re
+HAS_PDFIUM = _has_module("pypdfium2")
+HAS_PDFPLUMBER = _has_module("pdfplumber")
+# pyzbar takes numpy arrays directly (ocr_qr.py); cv2 is the fallback decoder
+HAS_ZBAR = _has_module("pyzbar")
+HAS_NUMPY = _has_module("numpy")
+
+_lazy_modules = {}
+
+def lazy_import(name):
+    """
+    Imports a module on first use and caches it. Returns None if the module
+    (or one of its native dependencies) cannot be imported.
+    """
+    if name not in _lazy_modules:
+        t0 = time.perf_counter()
+        try:
+            _lazy_modules[name] = importlib.import_module(name)
+            log_time("Loaded %s in %.0fms", name, (time.perf_counter() - t0) * 1000)
+        except ImportError:
+            _lazy_modules[name] = None
+    return _lazy_modules[name]
+
+# Backends a long-lived worker (ocr_pool) preloads at startup
+WARM_IMPORTS = ["httpx", "pypdfium2", "pdfplumber", "numpy"]
+
+_module_loaded_ms = (time.perf_counter() - _startup_t0) * 1000
+
+def _merged_word_fix(match):
+    return MERGED_WORD_FIXES[match.group(0).upper()]
 
 def clean_merged_text(text):
     """
     Heuristic to split common merged words in SSM certificates.
+    Two compiled passes (extractor/patterns.py): known merged words / typos,
+    then missing spaces before SDN/BHD/BERHAD and after-digit address keywords
+    ("2TMN" -> "2 TMN").
     """
-    # 1. Split digit immediately followed by letter (e.g. "2TMN" -> "2 TMN")
-    # But be careful with IDs like "MY2108..." (don't split) or "ACT197"
-    # So we only split if the letter part is a common address keyword?
-    # Or just general "digit-uppercase" split if it looks like an address line?
-    # Let's do specific keywords first.
-    
-    fixes = [
-        (r"TERUSMAJU", "TERUS MAJU"),
-        (r"SKUDAITAMAN", "SKUDAI TAMAN"),
-        (r"JOHORBAHRU", "JOHOR BAHRU"),
-        (r"JALANLAKSAMANA", "JALAN LAKSAMANA"),
-        (r"KUALALUMPUR", "KUALA LUMPUR"),
-        (r"PETALINGJAYA", "PETALING JAYA"),
-        (r"SHAHALAM", "SHAH ALAM"),
-        (r"BANDARBARU", "BANDAR BARU"),
-        (r"TAMANUNGKU", "TAMAN UNGKU"),
-        (r"OFBUSINESS", "OF BUSINESS"),
-        (r"ANDBRANCH", "AND BRANCH"),
-        (r"COMPAMIES", "COMPANIES"),
-        (r"MALAYSLA", "MALAYSIA"),
-        (r"COMMISSIONOFMALAYSLA", "COMMISSION OF MALAYSIA"),
-        (r"SDNBHD", "SDN BHD"),
-        (r"PRIVATECOMPANY", "PRIVATE COMPANY"),
-        (r"ANALOGDATA", "ANALOG DATA"), # Specific fix for test case, but harmless
-    ]
-    
-    for wrong, right in fixes:
-        text = re.sub(wrong, right, text, flags=re.IGNORECASE)
-
-    # 3. Generic splits for SDN/BHD attached to previous word
-    # e.g. "DATASDN" -> "DATA SDN", "TECHBHD" -> "TECH BHD"
-    # Look for [Letter] followed immediately by SDN or BHD
-    # Ensure we don't split if it's already spaced (handled by regex nature, but be careful)
-    text = re.sub(r"(?<=[a-zA-Z])(SDN|BHD|BERHAD)\b", r" \1", text, flags=re.IGNORECASE)
-        
-    # 2. Heuristic: "2TMN" -> "2 TMN"
-    # Look for Digit followed by specific keywords
-    keywords = ["TMN", "JALAN", "LOT", "NO", "BLOCK", "TINGKAT"]
-    for kw in keywords:
-        # (?<=\d) matches a digit before, (?=KW) matches keyword after
-        pattern = r"(?<=\d)(" + kw + r")"
-        text = re.sub(pattern, r" \1", text, flags=re.IGNORECASE)
-        
-    return text
+    text = RE_MERGED_WORDS.sub(_merged_word_fix, text)
+    return RE_MERGED_SPLITS.sub(r" \g<0>", text)
 
-def calculate_weighted_confidence(raw_results):
+# Below this many lines the dict loop beats building NumPy columns
+VECTOR_MIN_LINES = int(os.environ.get("OCR_VECTOR_MIN_LINES", "200"))
+
+def line_table(lines, page_sizes=None):
+    """
+    Columnar ocr_lines.LineTable for stage-1 lines, or None when the plain
+    loop is cheaper (short results, where importing numpy alone would cost
+    more) or numpy is unavailable.
+    """
+    if not HAS_NUMPY or len(lines) < max(VECTOR_MIN_LINES, 1):
+        return None
+    if lazy_import("numpy") is None:
+        return None
+    import ocr_lines
+    return ocr_lines.LineTable.from_lines(lines, page_sizes)
+
+def calculate_weighted_confidence(raw_results, table=None):
     """
     Calculates confidence score weighted by text length.
     Filters out short, low-confidence noise.
+    With a LineTable (see line_table) the same score is computed on its columns.
     """
+    if table is not None:
+        return table.weighted_confidence()
+
     total_score = 0.0
     total_weight = 0.0
     
@@ -140,162 +153,535 @@ def calculate_weighted_confidence(raw_results):
         
     return total_score / total_weight
 
-def process_document(image_path, ocr_engine=None):
-    process_start_time = time.time()
-    trace_steps = []
-    
-    def add_trace(msg):
-        elapsed = time.time() - process_start_time
-        trace_steps.append(f"{elapsed:.2f}s - {msg}")
-        log_time(msg)
+def officer_tables_enabled():
+    # OCR_CI_TABLES=words (default) reads profile director/shareholder tables
+    # from pdfplumber word coordinates; "text" keeps the layout-text regexes only
+    return os.environ.get("OCR_CI_TABLES", "words").lower() != "text"
 
-    add_trace("process_document started")
-    add_trace(f"Python Executable: {sys.executable}")
-    add_trace(f"HAS_PDFPLUMBER: {HAS_PDFPLUMBER}")
+def extract_native(image_path, add_trace):
+    """
+    Strategy 0: native PDF text via pypdfium2 / pdfplumber (see pdf_text.py).
+    Returns a stage-1 entry ({"source": "native", "lines", "qr_payload"},
+    plus "table_words" for company profile table pages read with pdfplumber),
+    or None when the file has no usable text layer. When triage found image
+    pages among those read, "ocr_pages" (0-based) and "page_texts" are added
+    for run_ocr to fill in with remote OCR.
+    """
+    if not ((HAS_PDFIUM or HAS_PDFPLUMBER) and ocr_input.is_pdf(image_path)):
+        return None
+
+    add_trace("Attempting native PDF extraction...")
+    with span("native_extraction"):
+        return _extract_native(image_path, add_trace)
+
+def _extract_native(image_path, add_trace):
+    try:
+        import pdf_text
+        kinds = None
+        if pdf_text.triage_enabled():
+            with span("pdf_triage"):
+                kinds = pdf_text.triage_pages(image_path)
+            add_trace("Triage: %d text, %d image, %d blank page(s)",
+                      kinds.count("text"), kinds.count("image"), kinds.count("blank"))
+            if "text" not in kinds:
+                # Scanned PDF: the layout pass would only confirm there is no text
+                add_trace("No text layer. Skipping native extraction.")
+                return None
+        want_words = officer_tables_enabled()
+        extracted = pdf_text.extract_text(image_path, words=want_words)
+        pages, backend, n_pages = extracted[:3]
+        page_words = extracted[3] if want_words else None
+        native_text = pdf_text.join_pages(pages)
+        add_trace("Native text read from %d of %d page(s) with %s", len(pages), n_pages, backend)
+
+        # Validation: Check if we got meaningful text
+        if len(native_text.strip()) > 100:
+            add_trace("Native extraction successful. Length: %d", len(native_text))
+            stage1 = {"source": "native", "lines": [{"text": native_text, "conf": 1.0}], "qr_payload": None}
+            if page_words:
+                from extractor.layout_tables import table_page_range
+                table_pages = table_page_range(pages)
+                if table_pages:
+                    stage1["table_words"] = page_words[slice(*table_pages)]
+                    add_trace("Kept word coordinates of pages %d-%d for tables", table_pages[0] + 1, table_pages[1])
+            # Image pages among those read still need OCR (scanned cover in
+            # front of a text profile); run_ocr uploads just those pages
+            ocr_pages = [i for i, kind in enumerate((kinds or [])[:len(pages)]) if kind == "image"]
+            if ocr_pages and pdf_text.HAS_PDFIUM:  # subset_pdf needs pdfium
+                add_trace("Page(s) %s have no text layer and need OCR", ", ".join(str(i + 1) for i in ocr_pages))
+                stage1["ocr_pages"] = ocr_pages
+                stage1["page_texts"] = pages
+            return stage1
+        else:
+            add_trace("Native extraction returned too little text. Falling back to OCR.")
+    except Exception as e:
+        add_trace("Native extraction failed: %s", e)
+    return None
+
+def parse_remote_response(data, add_trace):
+    """
+    Turns a remote /ocr response into OCR lines.
+    Returns (lines, qr_payload, page_sizes), page_sizes being the number of
+    lines each page contributed. Lines keep their bbox when the Space sent one.
+    """
+    all_raw_results = []
+    page_sizes = []
+    qr_payload = None
+    results_list = data.get("result", [])
     
+    if "qr_payload" in data and data["qr_payload"]:
+        qr_payload = data["qr_payload"]
+        add_trace("Remote QR payload received: %s", qr_payload)
+    
+    if results_list:
+        # Line format ([text, conf], [[bbox], [text, conf]] or bare text) is decided once per response
+        pages, line_format = parse_pages(results_list, clean_merged_text)
+        add_trace("Remote inference completed. Pages: %d (%s lines)", len(results_list), line_format)
+        page_sizes = [len(page) for page in pages]
+        all_raw_results = [line.record() for page in pages for line in page.lines]
+    else:
+        add_trace("Remote OCR returned empty result.")
+
+    return all_raw_results, qr_payload, page_sizes
+
+def merge_pages(native, lines, qr_payload, page_sizes, add_trace):
+    """
+    Completes a mixed PDF: slots the remote OCR lines of its image pages
+    (native["ocr_pages"], uploaded as one subset PDF in that order) between
+    the native page texts. Returns a stage-1 entry with source "mixed", one
+    line per native page and "page_sources" ("native" / "ocr" per page read).
+    """
+    ocr_pages = native["ocr_pages"]
+    if len(page_sizes) != len(ocr_pages):
+        add_trace("Remote OCR returned %d page(s) for %d image page(s); keeping them together",
+                  len(page_sizes), len(ocr_pages))
+        page_sizes = [len(lines)] + [0] * (len(ocr_pages) - 1)
+
+    ocr_lines = {}
+    offset = 0
+    for index, size in zip(ocr_pages, page_sizes):
+        ocr_lines[index] = lines[offset:offset + size]
+        offset += size
+
+    merged, sizes, sources = [], [], []
+    for index, text in enumerate(native["page_texts"]):
+        if index in ocr_lines:
+            page_lines = ocr_lines[index]
+            sources.append("ocr")
+        else:
+            page_lines = [{"text": text, "conf": 1.0}] if text else []
+            sources.append("native")
+        merged.extend(page_lines)
+        sizes.append(len(page_lines))
+
+    stage1 = {"source": "mixed", "lines": merged, "qr_payload": qr_payload, "page_sizes": sizes,
+              "page_sources": sources}
+    if native.get("table_words"):
+        stage1["table_words"] = native["table_words"]
+    return stage1
+
+def native_chars(stage1):
+    return sum(len(line["text"]) for line in stage1["lines"])
+
+def remote_uploads(image_path, add_trace, pages=None):
+    """
+    What goes to the Space for `image_path`: with preprocessing on
+    (ocr_preprocess.py) one bounded JPEG per PDF page, or the prepared image;
+    otherwise the file as is. `pages` (0-based) restricts a PDF to those pages
+    (the image pages of a mixed PDF). Returns an iterable of (bytes, filename);
+    preprocessed pages are produced lazily so uploads start while later pages
+    are still rendering.
+    """
+    import ocr_preprocess
+    is_pdf = ocr_input.is_pdf(image_path)
+    if ocr_preprocess.enabled() and (HAS_PDFIUM or not is_pdf):
+        return _timed(ocr_preprocess.prepare_uploads(image_path, pages, add_trace), "preprocess")
+    if pages is not None:
+        import pdf_text
+        return [(pdf_text.subset_pdf(image_path, pages), ocr_input.name(image_path))]
+    return [(ocr_input.read(image_path), ocr_input.name(image_path))]
+
+def _timed(iterable, name):
+    # Times each step of a generator under span(name), outside the consumer's own span
+    iterator = iter(iterable)
+    while True:
+        with span(name):
+            item = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+def _remote_ocr(image_path, remote_ocr_url, remote_ocr_token, add_trace, progress, pages=None):
+    """Uploads the document (or `pages` of it) page by page; returns parse_remote_response's tuple."""
+    sizes = []
+
+    def counted(uploads):
+        for data, filename in uploads:
+            sizes.append(len(data))
+            yield data, filename
+
+    notify(progress, "ocr_started", bytes=ocr_input.size(image_path), pages=len(pages) if pages else None)
+    req_start = time.time()
+    with span("remote_ocr"):
+        responses = remote_ocr_many_sync(remote_ocr_url, remote_ocr_token,
+                                         counted(remote_uploads(image_path, add_trace, pages)))
+    req_duration = time.time() - req_start
+    add_trace("Response received for %d upload(s), %d KB sent. Duration: %.2fs",
+              len(sizes), sum(sizes) // 1024, req_duration)
+
+    with span("ocr_clean"):
+        data = responses[0] if len(responses) == 1 else merge_responses(responses)
+        lines, qr_payload, page_sizes = parse_remote_response(data, add_trace)
+    notify(progress, "ocr_finished", lines=len(lines), duration_ms=round(req_duration * 1000),
+           upload_bytes=sum(sizes))
+    return lines, qr_payload, page_sizes
+
+def _local_ocr(image_path, add_trace, progress, pages=None):
+    """OCR on this machine (ocr_local.py); returns parse_remote_response's tuple."""
+    import ocr_local
+    notify(progress, "ocr_started", bytes=ocr_input.size(image_path), pages=len(pages) if pages else None,
+           engine="local")
+    start = time.time()
+    data = ocr_local.recognize_document(image_path, pages)
+    with span("ocr_clean"):
+        lines, _, page_sizes = parse_remote_response(data, add_trace)
+    duration = time.time() - start
+    add_trace("Local OCR read %d page(s) in %.2fs", len(page_sizes), duration)
+    notify(progress, "ocr_finished", lines=len(lines), duration_ms=round(duration * 1000), engine="local")
+    return lines, None, page_sizes
+
+def local_ocr_enabled():
+    import ocr_local
+    return ocr_local.enabled()
+
+def _ocr(image_path, remote_ocr_url, remote_ocr_token, add_trace, progress, pages=None):
+    """
+    OCR lines for the document (or `pages` of it) from the engine
+    ocr_local.choose_engine() picks; a failed remote call falls back to the
+    local engine when there is one. Returns (lines, qr_payload, page_sizes,
+    source) with source "remote" or "local".
+    """
+    import ocr_local
+    client = get_client(remote_ocr_url, remote_ocr_token) if remote_ocr_url else None
+    engine, reason = ocr_local.choose_engine(client)
+    if engine == "remote":
+        add_trace("Using Remote OCR at %s", remote_ocr_url)
+        req_start = time.time()
+        try:
+            return (*_remote_ocr(image_path, remote_ocr_url, remote_ocr_token, add_trace, progress, pages), "remote")
+        except RemoteOcrError as e:
+            add_trace("Remote OCR failed after %.2fs: %s", time.time() - req_start, e)
+            if not ocr_local.enabled():
+                raise
+            reason = "remote failed"
+    add_trace("Using local OCR (%s): %s", ocr_local.backend_name(), reason)
+    return (*_local_ocr(image_path, add_trace, progress, pages), "local")
+
+def _ocr_image_pages(native, image_path, remote_ocr_url, remote_ocr_token, add_trace, progress):
+    # Only the pages without a text layer are OCR'd; if that fails the
+    # native pages still make a result (but one that is not cached, see
+    # _process_document)
+    ocr_pages = native["ocr_pages"]
+    add_trace("OCR of %d image page(s) of %s", len(ocr_pages), ocr_input.name(image_path))
+    try:
+        lines, qr_payload, page_sizes, source = _ocr(image_path, remote_ocr_url, remote_ocr_token, add_trace,
+                                                     progress, ocr_pages)
+    except Exception as e:
+        add_trace("OCR of image pages failed, using native pages only: %s", e)
+        native.pop("page_texts", None)
+        return native
+    stage1 = merge_pages(native, lines, qr_payload, page_sizes, add_trace)
+    _mark_fallback(stage1, source, remote_ocr_url)
+    return stage1
+
+def _mark_fallback(stage1, source, remote_ocr_url):
+    # A local read standing in for the Space is not cached (_process_document)
+    import ocr_local
+    if source == "local" and ocr_local.stands_in(bool(remote_ocr_url)):
+        stage1["fallback"] = True
+
+# Per-process QR fast path counters; ocr_batch and ocr_server report the
+# rate from the results ("fast_path": "qr")
+QR_STATS = {"attempted": 0, "decoded": 0, "fast_path": 0, "verified": 0, "mismatched": 0}
+
+def qr_fast_path_enabled():
+    # OCR_QR_FAST_PATH=0 skips the local decode; remote OCR still returns
+    # whatever payload the Space finds
+    import ocr_qr
+    return ocr_qr.available() and os.environ.get("OCR_QR_FAST_PATH", "1").lower() not in ("0", "off", "false")
+
+def qr_fast_path(image_path, add_trace):
+    """
+    Decodes the certificate's QR code locally (ocr_qr.py). Returns
+    (stage1, payload): stage1 is a complete {"source": "qr", ...} entry when
+    the payload alone satisfies the required fields of a Form 9 / Form D /
+    LLP certificate (extractor/qr_payload.py), else None; payload is the
+    decoded text (or None) so the remote path can still report it.
+    """
+    import ocr_qr
+    from extractor.qr_payload import qr_extraction, qr_lines
+    QR_STATS["attempted"] += 1
+    try:
+        with span("qr_decode"):
+            payload = ocr_qr.decode_document(image_path)
+    except Exception as e:
+        add_trace("QR decode failed: %s", e)
+        return None, None
+    if not payload:
+        add_trace("No QR code found")
+        return None, None
+    QR_STATS["decoded"] += 1
+    doc_type, fields = qr_extraction(payload)
+    if fields is None:
+        add_trace("QR payload decoded but incomplete (%s); continuing with OCR", doc_type or "unknown type")
+        return None, payload
+    QR_STATS["fast_path"] += 1
+    add_trace("QR fast path: %s %s", doc_type, fields.get("registrationNumber") or fields.get("registration_number_new"))
+    # `text` is the certificate's key lines from the mapped fields, not the raw payload
+    stage1 = {"source": "qr", "lines": [{"text": line, "conf": 1.0} for line in qr_lines(doc_type, fields)],
+              "qr_payload": payload, "qr_fields": {"docType": doc_type, "fields": fields}}
+    if os.environ.get("OCR_QR_VERIFY", "0").lower() in ("1", "on", "true"):
+        _verify_in_background(image_path, stage1["qr_fields"], add_trace)
+    return stage1, payload
+
+def _verify_in_background(image_path, expected, add_trace):
+    # OCR_QR_VERIFY=1: the remote OCR still runs, off the request path, and
+    # disagreements with the QR fields are logged. Uploads are prepared now
+    # because callers may delete the file once the result is returned.
+    import threading
+    remote_ocr_url = os.environ.get("HF_API_URL")
+    if not remote_ocr_url:
+        return
+    uploads = list(remote_uploads(image_path, no_trace))
+    name = ocr_input.name(image_path)
+
+    def verify():
+        try:
+            data = merge_responses(remote_ocr_many_sync(remote_ocr_url, os.environ.get("HF_TOKEN"), uploads))
+            lines, _, _ = parse_remote_response(data, no_trace)
+            doc_type, fields = run_extraction("\n".join(line["text"] for line in lines), no_trace)
+        except Exception as e:
+            sys.stderr.write(f"[QR] verification of {name} failed: {e}\n")
+            return
+        from extractor.qr_payload import FIELD_NAMES
+        keys = FIELD_NAMES.get(expected["docType"], {}).values()
+        diffs = [k for k in keys if expected["fields"].get(k) and fields.get(k) != expected["fields"][k]]
+        if doc_type != expected["docType"]:
+            diffs.insert(0, "docType")
+        QR_STATS["mismatched" if diffs else "verified"] += 1
+        if diffs:
+            sys.stderr.write(f"[QR] {name}: OCR disagrees with QR payload on {', '.join(diffs)}\n")
+
+    threading.Thread(target=verify, name="qr-verify", daemon=True).start()
+    add_trace("Remote OCR verification of the QR fields started in the background")
+
+def run_ocr(image_path, add_trace, progress=None):
+    """
+    Stage 1: turns a document into OCR lines ({"text", "conf"} dicts).
+    Tries native PDF text first, then the QR code, then OCR (the remote
+    Space or the local engine).
+    Returns {"source", "lines", "qr_payload"} or {"error": ...}.
+    """
     try:
         # Check for Remote OCR URL
         remote_ocr_url = os.environ.get("HF_API_URL")
         remote_ocr_token = os.environ.get("HF_TOKEN")
         
-        if not remote_ocr_url:
-            return {"error": "Remote OCR URL (HF_API_URL) not configured. Local OCR is disabled."}
-
-        full_text_parts = []
-        all_raw_results = []
-        all_confidences = []
-        structure_text_parts = []
-        structure_data = []
-        qr_payload = None
-        
+        if not remote_ocr_url and not local_ocr_enabled():
+            return {"error": "Remote OCR URL (HF_API_URL) not configured and no local OCR backend is installed."}
+
         # ---------------------------------------------------------
-        # STRATEGY 0: NATIVE PDF TEXT EXTRACTION (pdfplumber)
+        # STRATEGY 0: NATIVE PDF TEXT EXTRACTION (pdfium / pdfplumber)
         # ---------------------------------------------------------
-        native_extraction_success = False
-        if HAS_PDFPLUMBER and image_path.lower().endswith('.pdf'):
-            add_trace("Attempting native PDF extraction with pdfplumber...")
-            try:
-                native_text = ""
-                with pdfplumber.open(image_path) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text(layout=True)
-                        if page_text:
-                            native_text += page_text + "\n"
-                
-                # Validation: Check if we got meaningful text
-                if len(native_text.strip()) > 100:
-                    add_trace(f"Native extraction successful. Length: {len(native_text)}")
-                    full_text_parts.append(native_text)
-                    all_raw_results.append({"text": native_text, "conf": 1.0})
-                    native_extraction_success = True
-                else:
-                    add_trace("Native extraction returned too little text. Falling back to OCR.")
-            except Exception as e:
-                add_trace(f"Native extraction failed: {str(e)}")
+        native = extract_native(image_path, add_trace)
+        if native:
+            notify(progress, "native_extracted", chars=native_chars(native))
+            if native.get("ocr_pages"):
+                return _ocr_image_pages(native, image_path, remote_ocr_url, remote_ocr_token, add_trace, progress)
+            return native
 
         # ---------------------------------------------------------
-        # STRATEGY 1: REMOTE OCR (Direct File Upload)
+        # STRATEGY 1: LOCAL QR CODE (skips OCR when the payload is complete)
         # ---------------------------------------------------------
-        if not native_extraction_success:
-            add_trace(f"Using Remote OCR at {remote_ocr_url}")
-            try:
-                if not os.path.exists(image_path):
-                    return {"error": f"File not found: {image_path}"}
-                    
-                headers = {}
-                if remote_ocr_token:
-                    headers["Authorization"] = f"Bearer {remote_ocr_token}"
-                
-                with open(image_path, "rb") as f:
-                    add_trace(f"Sending file {os.path.basename(image_path)} to HF...")
-                    req_start = time.time()
-                    resp = requests.post(
-                        f"{remote_ocr_url}/ocr", 
-                        files={"file": f}, 
-                        headers=headers,
-                        timeout=300
-                    )
-                    req_duration = time.time() - req_start
-                    add_trace(f"Response received. Status: {resp.status_code}. Duration: {req_duration:.2f}s")
-                
-                if resp.status_code == 200:
-                    data = resp.json()
-                    results_list = data.get("result", [])
-                    
-                    if "qr_payload" in data and data["qr_payload"]:
-                        qr_payload = data["qr_payload"]
-                        add_trace(f"Remote QR payload received: {qr_payload}")
-                    
-                    if results_list:
-                        add_trace(f"Remote inference completed. Pages: {len(results_list)}")
-                        for page_result in results_list:
-                            # Handle list of lines
-                            if isinstance(page_result, list):
-                                for item in page_result:
-                                    text = ""
-                                    conf = 0.0
-                                    # Handle [text, conf] or [[bbox], [text, conf]]
-                                    if isinstance(item, (list, tuple)):
-                                        if len(item) == 2 and isinstance(item[0], list) and isinstance(item[1], (list, tuple)):
-                                                text = item[1][0]
-                                                conf = item[1][1]
-                                        elif len(item) >= 2:
-                                            text = str(item[0])
-                                            conf = float(item[1]) if isinstance(item[1], (int, float, str)) else 0.0
-                                        elif len(item) >= 1:
-                                            text = str(item[0])
-                                    else:
-                                        text = str(item)
-                                    
-                                    text = clean_merged_text(text)
-                                    full_text_parts.append(text)
-                                    all_confidences.append(float(conf))
-                                    all_raw_results.append({"text": text, "conf": float(conf)})
-                    else:
-                        add_trace("Remote OCR returned empty result.")
-                else:
-                    return {"error": f"Remote OCR failed with status {resp.status_code}: {resp.text}"}
-                    
-            except Exception as e:
-                return {"error": f"Remote OCR exception: {str(e)}"}
+        local_qr = None
+        if qr_fast_path_enabled() and ocr_input.exists(image_path):
+            qr_stage1, local_qr = qr_fast_path(image_path, add_trace)
+            if qr_stage1 is not None:
+                notify(progress, "qr_fast_path", docType=qr_stage1["qr_fields"]["docType"])
+                return qr_stage1
 
         # ---------------------------------------------------------
-        # STRATEGY 2: LOCAL OCR (Fallback) - DISABLED
+        # STRATEGY 2: OCR - the remote Space (pre-processed pages, uploaded
+        # in parallel) or the local CPU engine, see ocr_local.choose_engine
         # ---------------------------------------------------------
-        # else:
-            # add_trace("Starting local inference (No Remote URL configured)")
-            # return {"error": "Local OCR is disabled. Please configure Remote OCR."}
+        if not ocr_input.exists(image_path):
+            return {"error": f"File not found: {image_path}"}
+        try:
+            all_raw_results, qr_payload, page_sizes, source = _ocr(image_path, remote_ocr_url, remote_ocr_token,
+                                                                   add_trace, progress)
+        except RemoteOcrError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            return {"error": f"OCR exception: {str(e)}"}
+
+        stage1 = {"source": source, "lines": all_raw_results, "qr_payload": qr_payload or local_qr,
+                  "page_sizes": page_sizes}
+        _mark_fallback(stage1, source, remote_ocr_url)
+        return stage1
             
     except Exception as e:
-        log_time(f"Process failed: {str(e)}")
+        log_time("Process failed: %s", e)
         traceback.print_exc()
         return {"error": str(e)}
-        
-    # Combine text
-    full_text = "\n".join(full_text_parts)
-    
-    # Calculate confidence
-    confidence = calculate_weighted_confidence(all_raw_results)
-    add_trace(f"Overall confidence: {confidence:.2f}")
 
-    # Process extracted text
+def run_extraction(full_text, add_trace=log_time, progress=None, table_words=None):
+    """
+    Stage 2: classifies the OCR text and runs the matching extractor.
+    `table_words` (native company profiles) feeds the word-coordinate table parser.
+    Returns (doc_type, extraction_result).
+    """
     add_trace("Classifying document...")
-    doc_type = classify_doc(full_text)
-    add_trace(f"Document type: {doc_type}")
-    
-    extraction_result = {}
+    with span("classify"):
+        ranked = rank_doc_types(full_text)
+    doc_type = ranked[0]["docType"] if ranked else "UNKNOWN"
+    add_trace("Document type: %s (%s)", doc_type,
+              ", ".join(f"{r['docType']} {r['confidence']:.2f}" for r in ranked) or "no markers")
+    notify(progress, "classified", docType=doc_type, confidence=ranked[0]["confidence"] if ranked else 0.0)
     
     if doc_type == "SSM_FORM_D" or doc_type == "FORM_D":
-        extraction_result = extract_form_d(full_text)
+        with span("extract.form_d"):
+            extraction_result = extract_form_d(full_text)
     elif doc_type == "SSM_FORM_9" or doc_type == "FORM_9":
-        extraction_result = extract_form_9(full_text)
+        with span("extract.form_9"):
+            extraction_result = extract_form_9(full_text)
     elif doc_type == "SSM_CORPORATE_INFO" or doc_type == "CORPORATE_INFO":
-        extraction_result = extract_corporate_info(full_text)
+        with span("extract.corporate_info"):
+            extraction_result = extract_corporate_info(full_text, table_words)
     elif doc_type == "SSM_LLP" or doc_type == "LLP_CERT":
-        extraction_result = extract_llp(full_text)
+        with span("extract.llp"):
+            extraction_result = extract_llp(full_text)
     else:
         # Default fallback
         extraction_result = {"raw_text": full_text}
+    # Every candidate type, best first, with its confidence
+    extraction_result["classification"] = ranked
+
+    notify(progress, "extracted", docType=doc_type)
+    return doc_type, extraction_result
+
+def notify(progress, stage, **info):
+    """Reports a pipeline stage to an optional progress callback (see --stream)."""
+    if progress is not None:
+        progress(stage, **info)
+
+def no_trace(msg, *args):
+    """add_trace stand-in that records nothing (and formats nothing)."""
+
+def new_trace(start_time=None, trace_steps=None, enabled=None):
+    """
+    Returns (trace_steps, add_trace, start_time). Pass the values from an
+    earlier call to continue the same trace (e.g. in another process).
+
+    add_trace(msg, *args) %-formats args into msg, like logging; with tracing
+    off (enabled=False, default OCR_TRACE) it is no_trace and trace_steps
+    stays empty, so nothing is formatted on the hot path.
+    """
+    process_start_time = start_time if start_time is not None else time.time()
+    trace_steps = trace_steps if trace_steps is not None else []
+    if not (TRACE_ENABLED if enabled is None else enabled):
+        return trace_steps, no_trace, process_start_time
+    
+    def add_trace(msg, *args):
+        if args:
+            msg = msg % args
+        elapsed = time.time() - process_start_time
+        trace_steps.append(f"{elapsed:.2f}s - {msg}")
+        log_time(msg)
+
+    return trace_steps, add_trace, process_start_time
+
+def cache_get(cache, key, add_trace):
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except Exception as e:
+        add_trace("Cache lookup failed: %s", e)
+        return None
+
+def cache_set(cache, key, value, add_trace):
+    if cache is None:
+        return
+    try:
+        cache.set(key, value)
+    except Exception as e:
+        add_trace("Cache store failed: %s", e)
+
+def cached_ocr_lines(image_path, add_trace):
+    """
+    Stage-1 cache lookup. Returns (cache_key, stage1); either may be None.
+    """
+    cache = get_cache()
+    if cache is None or not ocr_input.exists(image_path):
+        return None, None
+    with span("cache"):
+        key = ocr_key(ocr_input.digest(image_path))
+        stage1 = cache_get(cache, key, add_trace)
+    if stage1 is not None:
+        add_trace("OCR cache hit (%s): %s", stage1.get("source"), key)
+    return key, stage1
+
+def build_result(stage1, add_trace, trace_steps, process_start_time, progress=None):
+    """
+    Stage 2 + response assembly: confidence, classification/extraction
+    (cached by text hash + extractor version) and the frontend payload.
+    """
+    cache = get_cache()
+    all_raw_results = stage1["lines"]
+    qr_payload = stage1.get("qr_payload")
+    with span("confidence"):
+        table = line_table(all_raw_results, stage1.get("page_sizes"))
+
+        # Combine text
+        if table is not None:
+            full_text = table.text()
+        else:
+            full_text = "\n".join(item["text"] for item in all_raw_results)
+
+        # Calculate confidence
+        confidence = calculate_weighted_confidence(all_raw_results, table)
+        page_stats = table.page_stats() if table is not None and table.n_pages > 1 else None
+    add_trace("Overall confidence: %.2f", confidence)
+    if page_stats and add_trace is not no_trace:
+        add_trace("Page confidence: " + ", ".join(f"p{p['page']}={p['weighted_conf']:.2f}" for p in page_stats))
+
+    # ---------------------------------------------------------
+    # STAGE 2: EXTRACTION (cached by text hash + extractor version)
+    # ---------------------------------------------------------
+    table_words = stage1.get("table_words")
+    if stage1.get("qr_fields"):
+        # QR fast path: the fields came from the payload, nothing to extract
+        stage2 = stage1["qr_fields"]
+        add_trace("Fields taken from the QR payload: %s", stage2["docType"])
+        notify(progress, "classified", docType=stage2["docType"], fast_path="qr")
+        notify(progress, "extracted", docType=stage2["docType"], fast_path="qr")
+    else:
+        with span("cache"):
+            extraction_cache_key = extraction_key(full_text, "tables" if table_words else "") if cache is not None else None
+            stage2 = cache_get(cache, extraction_cache_key, add_trace)
+        if stage2 is not None:
+            add_trace("Extraction cache hit: %s", stage2["docType"])
+            notify(progress, "classified", docType=stage2["docType"], cached=True)
+            notify(progress, "extracted", docType=stage2["docType"], cached=True)
+        else:
+            doc_type, extraction_result = run_extraction(full_text, add_trace, progress, table_words)
+            stage2 = {"docType": doc_type, "fields": extraction_result}
+            with span("cache"):
+                cache_set(cache, extraction_cache_key, stage2, add_trace)
+
+    doc_type = stage2["docType"]
+    # Copy so per-request metadata never leaks into a cached entry
+    extraction_result = dict(stage2["fields"])
         
     # Add metadata
     extraction_result["docType"] = doc_type
@@ -316,15 +702,156 @@ def process_document(image_path, ocr_engine=None):
         "trace": trace_steps,
         "processing_time_ms": (time.time() - process_start_time) * 1000
     }
+    if page_stats:
+        final_output["page_stats"] = page_stats
+    if stage1.get("page_sources"):
+        final_output["page_sources"] = stage1["page_sources"]
+    if stage1.get("source") == "qr":
+        final_output["fast_path"] = "qr"
+    elif stage1.get("source") == "local":
+        final_output["ocr_engine"] = "local"
 
     log_time("Processing complete")
     return final_output
 
+def process_document(image_path, ocr_engine=None, progress=None, trace=None, filename=None):
+    """
+    Full pipeline for one file. `image_path` may also be the document itself:
+    bytes, a memoryview or a binary file object (see ocr_input.py), named by
+    `filename` for its extension; nothing is written to disk for it.
+    `progress`, if given, is called as progress(stage, **info) as each stage
+    completes. `trace` overrides OCR_TRACE for this call.
+
+    The result carries "timings_ms": milliseconds per stage span
+    (native_extraction, pdf_triage, qr_decode, remote_ocr, ocr_clean, confidence,
+    classify, extract.<type>, cache) plus "total". "preprocess" (page
+    rendering/encoding) overlaps the uploads and is also counted in remote_ocr.
+    """
+    image_path = ocr_input.as_input(image_path, filename)
+    with collect() as timings:
+        with span("total"):
+            result = _process_document(image_path, progress, trace)
+        result["timings_ms"] = timings.as_ms()
+    return result
+
+def _process_document(image_path, progress, trace):
+    trace_steps, add_trace, process_start_time = new_trace(enabled=trace)
+
+    add_trace("process_document started")
+    add_trace("Python Executable: %s", sys.executable)
+    add_trace("HAS_PDFPLUMBER: %s", HAS_PDFPLUMBER)
+    add_trace("HAS_ZBAR: %s", HAS_ZBAR)
+
+    # ---------------------------------------------------------
+    # STAGE 1: OCR LINES (cached by file content hash)
+    # ---------------------------------------------------------
+    ocr_cache_key, stage1 = cached_ocr_lines(image_path, add_trace)
+
+    if stage1 is None:
+        stage1 = run_ocr(image_path, add_trace, progress)
+        if "error" in stage1:
+            return stage1
+        # "ocr_pages" left on a result means some pages never got OCR'd, and
+        # a "fallback" local read should not outlive the Space being down
+        if stage1.get("fallback"):
+            add_trace("Local OCR stood in for the remote; not caching it")
+        elif ocr_cache_key is not None and stage1["lines"] and not stage1.get("ocr_pages"):
+            with span("cache"):
+                cache_set(get_cache(), ocr_cache_key, stage1, add_trace)
+    else:
+        notify(progress, "ocr_cached", source=stage1.get("source"))
+
+    return build_result(stage1, add_trace, trace_steps, process_start_time, progress)
+
+def compact_result(result, include_raw=False):
+    """
+    Drops the fields that repeat the OCR text (raw_result lines and
+    extracted_data.rawText) unless include_raw is set. `text` is always kept.
+    """
+    if include_raw or "error" in result:
+        return result
+    compact = {k: v for k, v in result.items() if k != "raw_result"}
+    if isinstance(compact.get("extracted_data"), dict):
+        compact["extracted_data"] = {k: v for k, v in compact["extracted_data"].items() if k != "rawText"}
+    return compact
+
+def ndjson_progress(stream, start=None):
+    """
+    Returns a progress callback that writes one compact JSON frame per stage:
+    {"event": "progress", "stage": ..., "elapsed_ms": ..., ...}
+    """
+    start = start if start is not None else time.time()
+
+    def emit(stage, **info):
+        frame = {"event": "progress", "stage": stage, "elapsed_ms": round((time.time() - start) * 1000), **info}
+        stream.write(json.dumps(frame, separators=(",", ":")) + "\n")
+        stream.flush()
+
+    return emit
+
+# Imported by --profile-startup to report the cost of each optional backend
+PROFILED_IMPORTS = [
+    "httpx",
+    "pdfplumber",
+    "pypdfium2",
+    "numpy",
+    "cv2",
+    "PIL.Image",
+    "pyzbar.pyzbar",
+]
+
+def profile_startup():
+    """
+    Reports how long this module took to load and what each optional backend
+    would cost if imported. Timings are cumulative in list order, so a module
+    whose dependencies were already pulled in by an earlier entry looks cheaper.
+    """
+    report = {
+        "module_load_ms": round(_module_loaded_ms, 1),
+        "preloaded": sorted(m for m in PROFILED_IMPORTS if m in sys.modules),
+        "imports": [],
+    }
+    for name in PROFILED_IMPORTS:
+        t0 = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            available = True
+        except ImportError:
+            available = False
+        report["imports"].append({
+            "module": name,
+            "available": available,
+            "ms": round((time.perf_counter() - t0) * 1000, 1),
+        })
+    return report
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: python ocr_service.py <image_path>"}))
+        print(json.dumps({"error": "Usage: python ocr_service.py <image_path | -> [--name FILE] [--stream] [--raw] [--indent N] | --profile-startup"}))
         sys.exit(1)
-        
-    image_path = sys.argv[1]
-    result = process_document(image_path)
-    print(json.dumps(result, indent=2))
+
+    if sys.argv[1] == "--profile-startup":
+        print(json.dumps(profile_startup(), indent=2))
+        sys.exit(0)
+
+    import argparse
+    parser = argparse.ArgumentParser(description="OCR + extraction for one SSM document.")
+    parser.add_argument("image_path", help='Document path, or "-" to read the document from stdin')
+    parser.add_argument("--name", help="File name of a document read from stdin (its extension picks the pipeline)")
+    parser.add_argument("--stream", action="store_true",
+                        help='NDJSON on stdout: progress frames, then {"event": "result", "result": {...}}')
+    parser.add_argument("--raw", action="store_true", help="Include raw_result lines and extracted_data.rawText")
+    parser.add_argument("--indent", type=int, default=None, help="Pretty-print the result (ignored with --stream)")
+    args = parser.parse_args()
+
+    progress = ndjson_progress(sys.stdout) if args.stream else None
+    # "-": the caller pipes the upload in, so it never has to be saved first
+    document = sys.stdin.buffer.read() if args.image_path == "-" else args.image_path
+    result = compact_result(process_document(document, progress=progress, filename=args.name), include_raw=args.raw)
+
+    if args.stream:
+        sys.stdout.write(json.dumps({"event": "result", "result": result}, separators=(",", ":")) + "\n")
+    elif args.indent is not None:
+        print(json.dumps(result, indent=args.indent))
+    else:
+        print(json.dumps(result, separators=(",", ":")))
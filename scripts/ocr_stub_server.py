@@ -0,0 +1,178 @@
+"""
+Local stand-in for the remote OCR Space, for tests, offline runs and load
+tests.
+
+Serves POST /ocr with the same response shape as the Space
+({"result": [[ [text, conf], ... ]], "qr_payload": ...}). With --fixtures it
+replays recorded responses (ocr_fixtures.py) keyed by the SHA-256 of the
+upload; unknown uploads get a 404 unless --fallback is set.
+
+Fault injection, applied in this order to every /ocr call:
+  --rate-limit N   token bucket of N requests/s (--burst deep); excess calls
+                   get 429 with Retry-After, like the Space's proxy
+  --error-rate P   fraction of calls answered with --error-status (503)
+  --capacity N     calls processed at once; the rest wait, so latency grows
+                   with load instead of failing (0 = unlimited)
+  --latency S      seconds per call, plus uniform(0, --jitter)
+
+GET /stats reports request, replay, miss, throttle and error counts.
+
+Usage:
+    python scripts/ocr_stub_server.py [--port 7860] [--fixtures tests/fixtures/ocr]
+        [--latency 0.5] [--jitter 0.2] [--error-rate 0.05] [--rate-limit 10] [--capacity 2]
+    HF_API_URL=http://127.0.0.1:7860 python scripts/ocr_service.py <image>
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from collections import deque
+
+from fastapi import FastAPI, UploadFile, File
+from fastapi.responses import JSONResponse
+
+DEFAULT_LINES = [
+    ["COMPANIES ACT 2016 (ACT 777)", 0.98],
+    ["CERTIFICATE OF INCORPORATION OF PRIVATE COMPANY", 0.97],
+    ["This is to certify that", 0.99],
+    ["ANALOG DATA SDN BHD", 0.96],
+    ["190933432134 (1234567-H)", 0.95],
+    ["is, on and from the 7th day of June 2007, incorporated under the Companies Act 1965,", 0.93],
+    ["Dated at KL this 7th day of June 2007.", 0.94],
+    ["DATUK NOR AZIMAH ABDUL AZIZ", 0.92],
+    ["REGISTRAR OF COMPANIES MALAYSIA", 0.97],
+]
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """0.0 if a token was taken, otherwise seconds until the next one."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def create_app(pages=None, statuses=None, latency: float = 0.0, retry_after: str | None = None, *,
+               fixtures: dict | None = None, jitter: float = 0.0, error_rate: float = 0.0,
+               error_status: int = 503, rate_limit: float = 0.0, burst: int = 1, capacity: int = 0,
+               seed: int | None = None) -> FastAPI:
+    """
+    pages       - OCR result to return (list of pages, each a list of [text, conf]);
+                  with fixtures, the answer for uploads that have no recording
+    statuses    - HTTP statuses to return before succeeding, e.g. [503, 429]
+    latency     - seconds to wait before answering each request (+ uniform(0, jitter))
+    fixtures    - sha256 -> recorded fixture (ocr_fixtures.load_fixtures)
+    error_rate  - fraction of requests answered with error_status
+    rate_limit  - requests/s admitted (token bucket, `burst` deep); others get 429
+    capacity    - requests processed concurrently; the rest queue (0 = unlimited)
+    """
+    app = FastAPI()
+    app.state.pages = pages if pages is not None or fixtures else [DEFAULT_LINES]
+    app.state.fixtures = fixtures or {}
+    app.state.statuses = deque(statuses or [])
+    app.state.latency = latency
+    app.state.jitter = jitter
+    app.state.error_rate = error_rate
+    app.state.rng = random.Random(seed)
+    app.state.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+    app.state.capacity = asyncio.Semaphore(capacity) if capacity else None
+    app.state.requests = 0
+    app.state.counts = {"replayed": 0, "misses": 0, "throttled": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    @app.get("/")
+    def health():
+        return {"status": "running", "service": "OCR stub"}
+
+    @app.get("/stats")
+    def stats():
+        return {"requests": app.state.requests, "fixtures": len(app.state.fixtures), **app.state.counts}
+
+    async def answer(data: bytes):
+        counts = app.state.counts
+        if app.state.latency or app.state.jitter:
+            await asyncio.sleep(app.state.latency + app.state.rng.uniform(0, app.state.jitter))
+        if app.state.statuses:
+            status = app.state.statuses.popleft()
+            headers = {"Retry-After": retry_after} if retry_after else None
+            return JSONResponse({"error": f"stub status {status}"}, status_code=status, headers=headers)
+        if app.state.fixtures:
+            digest = hashlib.sha256(data).hexdigest()
+            fixture = app.state.fixtures.get(digest)
+            if fixture is not None:
+                counts["replayed"] += 1
+                return fixture["response"]
+            counts["misses"] += 1
+            if app.state.pages is None:
+                return JSONResponse({"error": f"no recorded response for sha256 {digest}"}, status_code=404)
+        return {"result": app.state.pages, "qr_payload": None}
+
+    @app.post("/ocr")
+    async def ocr(file: UploadFile = File(...)):
+        data = await file.read()
+        app.state.requests += 1
+        counts = app.state.counts
+        if app.state.bucket is not None:
+            wait = app.state.bucket.take()
+            if wait:
+                counts["throttled"] += 1
+                return JSONResponse({"error": "rate limited"}, status_code=429,
+                                    headers={"Retry-After": f"{wait:.3f}"})
+        if app.state.error_rate and app.state.rng.random() < app.state.error_rate:
+            counts["errors"] += 1
+            return JSONResponse({"error": f"injected status {error_status}"}, status_code=error_status)
+
+        counts["in_flight"] += 1
+        counts["peak_in_flight"] = max(counts["peak_in_flight"], counts["in_flight"])
+        try:
+            if app.state.capacity is None:
+                return await answer(data)
+            async with app.state.capacity:
+                return await answer(data)
+        finally:
+            counts["in_flight"] -= 1
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local OCR Space stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7860)
+    parser.add_argument("--fixtures", help="directory of recorded responses to replay by upload hash")
+    parser.add_argument("--fallback", action="store_true",
+                        help="answer unknown uploads with the built-in Form 9 lines instead of 404")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/s (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--capacity", type=int, default=0, help="concurrent requests processed (0 = unlimited)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    fixtures = None
+    if args.fixtures:
+        from ocr_fixtures import load_fixtures
+        fixtures = load_fixtures(args.fixtures)
+        print(f"Replaying {len(fixtures)} recorded response(s) from {args.fixtures}")
+    app = create_app(pages=[DEFAULT_LINES] if args.fallback else None, latency=args.latency,
+                     fixtures=fixtures, jitter=args.jitter, error_rate=args.error_rate,
+                     error_status=args.error_status, rate_limit=args.rate_limit, burst=args.burst,
+                     capacity=args.capacity, seed=args.seed)
+    uvicorn.run(app, host=args.host, port=args.port)
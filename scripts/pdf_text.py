@@ -0,0 +1,396 @@
+"""
+Native PDF text extraction.
+
+Two backends:
+  pdfium     - pypdfium2's text API. An order of magnitude faster, but emits
+               text in content-stream order, so table columns come out split.
+  pdfplumber - layout mode. Keeps columns aligned; extract_corporate_info's
+               director/shareholder parsing depends on it. words=True also
+               returns each page's word boxes from the same pass (for
+               extractor/layout_tables.py).
+
+OCR_NATIVE_BACKEND picks one (default "auto": read with pdfium, classify, and
+re-read with pdfplumber only when the document type is in LAYOUT_DOC_TYPES).
+
+Pages are read only as far as the document needs (OCR_EARLY_EXIT, default on):
+page 1 is classified first, single-page certificates (Form 9, Form D, LLP)
+stop there, and types with an end marker (CORPORATE_INFO's "END OF REPORT")
+stop at the page carrying it. Pages appended after that in uploaded bundles
+are never parsed.
+
+Before any of that, triage_pages() sorts pages into text / image / blank
+from their character count and page objects alone (no text extraction or
+layout pass, OCR_PDF_TRIAGE, default on). ocr_service skips native extraction
+for PDFs without a text layer and, for mixed PDFs (e.g. a scanned cover in
+front of a text profile), sends only the image pages to remote OCR
+(subset_pdf).
+
+Every `path` argument may also be an ocr_input.Document (an upload held in
+memory); pdfium and pdfplumber read it in place.
+
+Multi-page documents can be split across worker processes (OCR_PDF_WORKERS):
+each worker opens the PDF itself and extracts a contiguous page range, and the
+pages are reassembled in order and joined once instead of being concatenated
+page by page.
+"""
+from __future__ import annotations
+import os
+import atexit
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
+from ocr_input import pdfium_input, stream_input
+
+# Below this many pages the pool round-trip costs more than it saves
+MIN_PARALLEL_PAGES = 3
+
+BACKENDS = ("pdfium", "pdfplumber")
+
+# Doc types whose extractors read column positions out of the layout text
+LAYOUT_DOC_TYPES = {"CORPORATE_INFO", "SSM_CORPORATE_INFO"}
+
+# Certificates identified and fully contained on their first page
+SINGLE_PAGE_DOC_TYPES = {"FORM_9", "SSM_FORM_9", "FORM_D", "SSM_FORM_D", "LLP_CERT", "SSM_LLP"}
+
+# Marker on the last page of multi-page reports
+END_MARKERS = {"CORPORATE_INFO": "END OF REPORT", "SSM_CORPORATE_INFO": "END OF REPORT"}
+
+# Pages with fewer characters than this have no usable text layer (a stray
+# page number or a scanner's watermark)
+TRIAGE_MIN_CHARS = 20
+
+HAS_PDFIUM = importlib.util.find_spec("pypdfium2") is not None
+HAS_PDFPLUMBER = importlib.util.find_spec("pdfplumber") is not None
+
+_pool = None
+_pool_workers = 0
+
+
+def default_workers() -> int:
+    """OCR_PDF_WORKERS, or 0 (= one per CPU) when unset; 1 disables the pool."""
+    configured = int(os.environ.get("OCR_PDF_WORKERS", "0"))
+    return configured if configured > 0 else (os.cpu_count() or 1)
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    # Kept for the life of the process so ocr_server workers and batch runs
+    # reuse the same page workers across documents.
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+def native_backend() -> str:
+    """OCR_NATIVE_BACKEND: auto (default), pdfium or pdfplumber."""
+    backend = os.environ.get("OCR_NATIVE_BACKEND", "auto").lower()
+    return backend if backend in BACKENDS or backend == "auto" else "auto"
+
+
+def layout_doc_types() -> set[str]:
+    configured = os.environ.get("OCR_LAYOUT_DOC_TYPES")
+    if configured is None:
+        return LAYOUT_DOC_TYPES
+    return {t.strip().upper() for t in configured.split(",") if t.strip()}
+
+
+def early_exit_enabled() -> bool:
+    return os.environ.get("OCR_EARLY_EXIT", "1").lower() not in ("0", "false", "off", "no")
+
+
+def triage_enabled() -> bool:
+    return os.environ.get("OCR_PDF_TRIAGE", "1").lower() not in ("0", "false", "off", "no")
+
+
+def triage_min_chars() -> int:
+    return int(os.environ.get("OCR_TRIAGE_MIN_CHARS", TRIAGE_MIN_CHARS))
+
+
+def _triage_pdfium(path: str, min_chars: int) -> list[str]:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+    kinds = []
+    pdf = pdfium.PdfDocument(pdfium_input(path))
+    try:
+        for index in range(len(pdf)):
+            page = pdf[index]
+            n_text = n_other = 0
+            for i in range(pdfium_c.FPDFPage_CountObjects(page)):
+                if pdfium_c.FPDFPageObj_GetType(pdfium_c.FPDFPage_GetObject(page, i)) == pdfium_c.FPDF_PAGEOBJ_TEXT:
+                    n_text += 1
+                else:
+                    n_other += 1
+            # Scans have no text objects at all, so only text-bearing pages
+            # pay for loading the text page
+            chars = 0
+            if n_text:
+                textpage = page.get_textpage()
+                chars = textpage.count_chars()
+                textpage.close()
+            page.close()
+            kinds.append("text" if chars >= min_chars else "image" if n_other else "blank")
+    finally:
+        pdf.close()
+    return kinds
+
+
+def _triage_pdfplumber(path: str, min_chars: int) -> list[str]:
+    import pdfplumber
+    kinds = []
+    with pdfplumber.open(stream_input(path)) as pdf:
+        for page in pdf.pages:
+            objects = page.objects
+            chars = len(objects.get("char", ()))
+            drawn = any(objects.get(kind) for kind in ("image", "rect", "line", "curve"))
+            kinds.append("text" if chars >= min_chars else "image" if drawn else "blank")
+            page.flush_cache()
+    return kinds
+
+
+def triage_pages(path: str, min_chars: int | None = None) -> list[str]:
+    """
+    Classifies each page as "text" (has a text layer), "image" (drawn
+    content but no text, i.e. needs OCR) or "blank", from the page objects
+    and character count only.
+    """
+    min_chars = triage_min_chars() if min_chars is None else min_chars
+    if HAS_PDFIUM:
+        return _triage_pdfium(path, min_chars)
+    return _triage_pdfplumber(path, min_chars)
+
+
+def subset_pdf(path: str, indices: list[int]) -> bytes:
+    """A new PDF holding only the given pages (0-based), as bytes to upload."""
+    import io
+    import pypdfium2 as pdfium
+    src = pdfium.PdfDocument(pdfium_input(path))
+    dst = pdfium.PdfDocument.new()
+    try:
+        dst.import_pages(src, list(indices))
+        buffer = io.BytesIO()
+        dst.save(buffer)
+        return buffer.getvalue()
+    finally:
+        dst.close()
+        src.close()
+
+
+def _extract_range_pdfium(path: str, start: int, stop: int) -> list[str]:
+    import pypdfium2 as pdfium
+    texts = []
+    pdf = pdfium.PdfDocument(pdfium_input(path))
+    try:
+        for index in range(start, stop):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            # pdfium separates lines with CRLF; the extractors expect \n
+            texts.append(textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n"))
+            textpage.close()
+            page.close()
+    finally:
+        pdf.close()
+    return texts
+
+
+def _page_words(page) -> list[dict]:
+    # Same parsed chars as extract_text, so this is nearly free right after it
+    return [
+        {"text": w["text"], "x0": w["x0"], "x1": w["x1"], "top": w["top"], "bottom": w["bottom"]}
+        for w in page.extract_words()
+    ]
+
+
+def _extract_range(path: str, start: int, stop: int, layout: bool = True, backend: str = "pdfplumber",
+                   words: bool = False):
+    """Page texts for [start, stop); with words=True, (texts, words per page) (pdfplumber only)."""
+    if backend == "pdfium":
+        return _extract_range_pdfium(path, start, stop)
+    import pdfplumber
+    texts = []
+    page_words = []
+    with pdfplumber.open(stream_input(path)) as pdf:
+        for page in pdf.pages[start:stop]:
+            texts.append(page.extract_text(layout=layout) or "")
+            if words:
+                page_words.append(_page_words(page))
+            # pdfplumber caches parsed objects per page; drop them as we go
+            page.flush_cache()
+    return (texts, page_words) if words else texts
+
+
+def page_count(path: str) -> int:
+    if HAS_PDFIUM:
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(pdfium_input(path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    import pdfplumber
+    with pdfplumber.open(stream_input(path)) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pages(path: str, backend: str = "pdfplumber", layout: bool = True, words: bool = False):
+    """
+    Yields page texts one at a time from a single open document; with
+    words=True yields (text, words) pairs (words is None for pdfium).
+    """
+    if backend == "pdfium":
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(pdfium_input(path))
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+                textpage.close()
+                page.close()
+                yield (text, None) if words else text
+        finally:
+            pdf.close()
+        return
+
+    import pdfplumber
+    with pdfplumber.open(stream_input(path)) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text(layout=layout) or ""
+            item = (text, _page_words(page)) if words else text
+            page.flush_cache()
+            yield item
+
+
+def extract_pages(path: str, workers: int | None = None, layout: bool = True, backend: str = "pdfplumber",
+                  stop: int | None = None, words: bool = False):
+    """
+    Returns the text of the first `stop` pages (default all), in page order
+    ("" for empty pages). With words=True returns (texts, words per page);
+    words is None for pdfium.
+    """
+    n_pages = page_count(path)
+    if stop is not None:
+        n_pages = min(n_pages, stop)
+    # pdfium is fast enough that a pool round-trip would dominate
+    if backend == "pdfium":
+        texts = _extract_range(path, 0, n_pages, backend=backend)
+        return (texts, None) if words else texts
+
+    workers = workers if workers is not None else default_workers()
+    workers = min(workers, n_pages)
+
+    if workers <= 1 or n_pages < MIN_PARALLEL_PAGES:
+        return _extract_range(path, 0, n_pages, layout, words=words)
+
+    # Contiguous ranges keep each worker's PDF parsing local to its pages
+    bounds = [round(i * n_pages / workers) for i in range(workers + 1)]
+    pool = _get_pool(workers)
+    futures = [pool.submit(_extract_range, path, bounds[i], bounds[i + 1], layout, "pdfplumber", words)
+               for i in range(workers)]
+
+    pages = []
+    page_words = []
+    for future in futures:
+        if words:
+            texts, chunk_words = future.result()
+            pages.extend(texts)
+            page_words.extend(chunk_words)
+        else:
+            pages.extend(future.result())
+    return (pages, page_words) if words else pages
+
+
+def join_pages(pages: list[str]) -> str:
+    # Same layout as the old `native_text += page_text + "\n"` loop, built in one pass
+    return "".join(f"{text}\n" for text in pages if text)
+
+
+def _has_marker(text: str, marker: str) -> bool:
+    # classify_doc-style normalisation: markers can be split across lines
+    return marker in " ".join(text.split()).upper()
+
+
+def _scan(path: str, scanner: str, words: bool = False):
+    """
+    Reads page 1, classifies it and reads on only as far as the doc type
+    needs. Returns (doc_type, pages read, words per page or None), or
+    (None, None, None) when page 1 does not identify a type that allows
+    stopping early.
+    """
+    from extractor.rules_base import classify_doc
+    pages = []
+    page_words = [] if words and scanner == "pdfplumber" else None
+    doc_type = None
+    marker = None
+    for item in iter_pages(path, scanner, words=words):
+        text = item[0] if words else item
+        pages.append(text)
+        if page_words is not None:
+            page_words.append(item[1])
+        if doc_type is None:
+            doc_type = classify_doc(text)
+            if doc_type in SINGLE_PAGE_DOC_TYPES:
+                break
+            marker = END_MARKERS.get(doc_type)
+            if marker is None:
+                return None, None, None
+        if _has_marker(text, marker):
+            break
+    return doc_type, pages, page_words
+
+
+def _extract_all(path: str, backend: str, workers: int | None, words: bool = False):
+    if backend == "auto":
+        from extractor.rules_base import classify_doc
+        pages = extract_pages(path, backend="pdfium")
+        if classify_doc(join_pages(pages)) not in layout_doc_types():
+            return pages, "pdfium", None
+        backend = "pdfplumber"
+    if words:
+        pages, page_words = extract_pages(path, workers=workers, backend=backend, words=True)
+        return pages, backend, page_words
+    return extract_pages(path, workers=workers, backend=backend), backend, None
+
+
+def extract_text(path: str, backend: str | None = None, workers: int | None = None,
+                 early_exit: bool | None = None, words: bool = False):
+    """
+    Extracts native text with the configured backend.
+    Returns (pages read, backend actually used, total pages in the file).
+    With words=True a fourth item holds the pdfplumber words of each page
+    read (None when the pages were not read with pdfplumber).
+    """
+    backend = backend or native_backend()
+    early_exit = early_exit_enabled() if early_exit is None else early_exit
+    if (backend == "pdfium" and not HAS_PDFIUM) or (backend == "pdfplumber" and not HAS_PDFPLUMBER):
+        backend = "auto"
+    if backend == "auto" and not (HAS_PDFIUM and HAS_PDFPLUMBER):
+        backend = "pdfium" if HAS_PDFIUM else "pdfplumber"
+
+    n_pages = page_count(path)
+    if early_exit and n_pages > 1:
+        # Scan with the cheap backend when we have it, then re-read only the
+        # pages we keep if the doc type needs layout text.
+        scanner = "pdfium" if HAS_PDFIUM and backend in ("auto", "pdfium") else backend
+        doc_type, scanned, scanned_words = _scan(path, scanner, words)
+        if doc_type is not None:
+            if backend == "auto":
+                backend = "pdfplumber" if doc_type in layout_doc_types() else "pdfium"
+            if backend == scanner:
+                return (scanned, backend, n_pages, scanned_words) if words else (scanned, backend, n_pages)
+            if words:
+                pages, page_words = extract_pages(path, workers=workers, backend=backend, stop=len(scanned),
+                                                  words=True)
+                return pages, backend, n_pages, page_words
+            return extract_pages(path, workers=workers, backend=backend, stop=len(scanned)), backend, n_pages
+
+    pages, backend, page_words = _extract_all(path, backend, workers, words)
+    return (pages, backend, n_pages, page_words) if words else (pages, backend, n_pages)
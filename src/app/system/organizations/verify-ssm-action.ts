@@ -1,8 +1,8 @@
 "use server";
 
-import { join } from 'path';
+import { basename, join } from 'path';
 import { promises as fs } from 'fs';
-import { spawn } from 'child_process';
+import { extractDocument, runOcrService } from "@/lib/ocr-service";
 
 export async function verifySSM(fileUrl: string, businessRegNumber?: string) {
   if (!fileUrl) {
@@ -32,64 +32,11 @@ export async function verifySSM(fileUrl: string, businessRegNumber?: string) {
     // Check if file exists
     await fs.access(absolutePath);
 
-    // Call Python script
-    const scriptPath = join(process.cwd(), "scripts", "ocr_service.py");
-    
-    const output = await new Promise<string>((resolve, reject) => {
-        // Use 'python' command. Ensure python is in system PATH.
-        const pythonProcess = spawn('python', [scriptPath, absolutePath]);
-        let dataString = '';
-        let errorString = '';
-
-        pythonProcess.stdout.on('data', (data) => {
-            dataString += data.toString();
-        });
-
-        pythonProcess.stderr.on('data', (data) => {
-            errorString += data.toString();
-            // PaddleOCR might output info/warnings to stderr, we collect but don't fail immediately unless exit code != 0
-        });
-
-        pythonProcess.on('close', (code) => {
-            if (code !== 0) {
-                // If code is not 0, it's an error. 
-                // However, sometimes stderr has non-critical warnings.
-                console.error("Python Script Error Output:", errorString);
-                reject(new Error(`Python script exited with code ${code}`));
-            } else {
-                resolve(dataString);
-            }
-        });
-    });
-
-    // Parse JSON output
-    // We try to find the last valid JSON line, as there might be some print outputs from libs
-    let result: any = {};
-    const lines = output.trim().split('\n');
-    let parsed = false;
-    
-    // Iterate backwards to find the JSON result
-    for (let i = lines.length - 1; i >= 0; i--) {
-        try {
-            result = JSON.parse(lines[i]);
-            if (result.success !== undefined || result.error !== undefined) {
-                parsed = true;
-                break;
-            }
-        } catch (e) {
-            continue;
-        }
-    }
-
-    if (!parsed) {
-        // If simple parse fails, try parsing the whole output if it was single line
-        try {
-            result = JSON.parse(output);
-        } catch(e) {
-            console.error("Raw OCR Output:", output);
-            throw new Error("Failed to parse OCR response");
-        }
-    }
+    // The worker pool (OCR_SERVER_URL) gets the bytes, so it needs no access
+    // to this app's storage; the CLI opens the stored file by path
+    const result = process.env.OCR_SERVER_URL
+        ? await extractDocument({ data: await fs.readFile(absolutePath), filename: basename(absolutePath) })
+        : await runOcrService(absolutePath);
 
     if (result.error) {
         throw new Error(result.error);
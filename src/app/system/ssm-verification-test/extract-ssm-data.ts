@@ -1,9 +1,6 @@
 "use server";
 
-import { join } from 'path';
-import { spawn } from 'child_process';
-import { writeFile, mkdir, access } from "fs/promises";
-import { randomUUID } from "crypto";
+import { extractDocument } from "@/lib/ocr-service";
 
 export async function extractSSMData(formData: FormData) {
   const file = formData.get("file") as File;
@@ -20,82 +17,13 @@ export async function extractSSMData(formData: FormData) {
     return { error: "Invalid file type. Only JPG, PNG, WEBP, and PDF are allowed." };
   }
 
-  // Ensure temp directory exists
-  const uploadDir = join(process.cwd(), "public/uploads/temp/ssm");
   try {
-    await mkdir(uploadDir, { recursive: true });
-  } catch (error) {
-    // Ignore
-  }
-
-  // Generate unique filename
-  const ext = file.name.split(".").pop();
-  const filename = `${randomUUID()}.${ext}`;
-  const filepath = join(uploadDir, filename);
-
-  try {
-    await writeFile(filepath, buffer);
-  } catch (error) {
-    console.error("Error saving file:", error);
-    return { error: "Failed to save file for processing" };
-  }
-
-  try {
-    // Check if file exists
-    await access(filepath);
-
-    // Call Python script
-    const scriptPath = join(process.cwd(), "scripts", "ocr_service.py");
-    
-    const output = await new Promise<string>((resolve, reject) => {
-        // Use 'python' command. Ensure python is in system PATH.
-        const pythonProcess = spawn('python', [scriptPath, filepath]);
-        let dataString = '';
-        let errorString = '';
-
-        pythonProcess.stdout.on('data', (data) => {
-            dataString += data.toString();
-        });
-
-        pythonProcess.stderr.on('data', (data) => {
-            errorString += data.toString();
-        });
-
-        pythonProcess.on('close', (code) => {
-            if (code !== 0) {
-                console.error("Python Script Error Output:", errorString);
-                reject(new Error(`Python script exited with code ${code}`));
-            } else {
-                resolve(dataString);
-            }
-        });
-    });
-
-    // Parse JSON output
-    console.log("Raw Python Output:", output);
-    let result: any = {};
-    const lines = output.trim().split('\n');
-    let parsed = false;
-    
-    for (let i = lines.length - 1; i >= 0; i--) {
-        try {
-            result = JSON.parse(lines[i]);
-            if (result.success !== undefined || result.error !== undefined) {
-                parsed = true;
-                break;
-            }
-        } catch (e) {
-            continue;
-        }
-    }
-
-    if (!parsed) {
-        try {
-            result = JSON.parse(output);
-        } catch(e) {
-            throw new Error("Failed to parse OCR response");
-        }
-    }
+    // The upload goes to the OCR pipeline from memory; nothing is saved
+    // under public/uploads, so there is no temp file to clean up
+    const result = await extractDocument(
+        { data: buffer, filename: file.name, type: file.type },
+        { onProgress: (event) => console.log(`OCR ${event.stage} (${event.elapsed_ms}ms)`) }
+    );
 
     if (result.error) {
         throw new Error(result.error);
@@ -105,13 +33,7 @@ export async function extractSSMData(formData: FormData) {
 
     const text = result.text || "";
     const structureText = result.structure_text || "";
-    const rawResult = result.raw_result || [];
     const extractedData = result.extracted_data || {};
-    
-    // Cleanup temp file
-    // await fs.unlink(filepath); 
-    // Maybe keep it for display? Let's return the URL.
-    const fileUrl = `/uploads/temp/ssm/${filename}`;
 
     // Map Python Result to Frontend Format
     // Helper to format address object to string
@@ -201,8 +123,6 @@ export async function extractSSMData(formData: FormData) {
       data: data,
       rawText: text,
       structureText: structureText,
-      fileUrl: fileUrl,
-      rawResult: rawResult, // Pass full structure to UI
       processingTimeMs: result.processing_time_ms || 0,
       trace: result.trace || []
     };
@@ -12,6 +12,7 @@ import { toast } from "sonner";
 export default function SSMTestForm() {
     const [isLoading, setIsLoading] = useState(false);
     const [fileUrl, setFileUrl] = useState<string>("");
+    const [fileIsPdf, setFileIsPdf] = useState(false);
     const [extractedData, setExtractedData] = useState<any>(null);
     const [rawText, setRawText] = useState<string>("");
     const [structureText, setStructureText] = useState<string>("");
@@ -55,6 +56,13 @@ export default function SSMTestForm() {
         return () => clearInterval(interval);
     }, [isLoading]);
 
+    // The preview is a blob: URL of the picked file; the server keeps no copy
+    useEffect(() => {
+        return () => {
+            if (fileUrl.startsWith("blob:")) URL.revokeObjectURL(fileUrl);
+        };
+    }, [fileUrl]);
+
     async function handleFileUpload(e: React.ChangeEvent<HTMLInputElement>) {
         const file = e.target.files?.[0];
         if (!file) return;
@@ -91,7 +99,8 @@ export default function SSMTestForm() {
             
             if (result.success) {
                 toast.success("Document processed successfully");
-                setFileUrl(result.fileUrl || "");
+                setFileUrl(URL.createObjectURL(file));
+                setFileIsPdf(file.type === "application/pdf");
                 setExtractedData(result.data);
                 setRawText(result.rawText || "");
                 setStructureText(result.structureText || "");
@@ -150,7 +159,7 @@ export default function SSMTestForm() {
                             <div className="border-2 border-dashed border-muted-foreground/25 rounded-lg p-4 flex flex-col items-center justify-center w-full h-32 bg-muted/10 relative overflow-hidden">
                                 {fileUrl ? (
                                     <div className="flex flex-col items-center justify-center text-center p-2">
-                                        {fileUrl.endsWith('.pdf') ? (
+                                        {fileIsPdf ? (
                                             <FileText className="h-8 w-8 text-primary mb-2" />
                                         ) : (
                                             <img src={fileUrl} alt="Preview" className="h-20 object-contain mb-2" />
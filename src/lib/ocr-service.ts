@@ -0,0 +1,125 @@
+import { join } from "path";
+import { spawn } from "child_process";
+
+export type OcrProgressEvent = {
+    event: "progress";
+    stage: "native_extracted" | "ocr_cached" | "ocr_started" | "ocr_finished" | "classified" | "extracted";
+    elapsed_ms: number;
+    [key: string]: unknown;
+};
+
+type OcrResultFrame = { event: "result"; result: any };
+
+// A document held in memory (an upload); never written to disk
+export type OcrUpload = {
+    data: Buffer;
+    filename: string;
+    type?: string;
+};
+
+type RunOcrOptions = {
+    // Include raw_result lines and extracted_data.rawText (off by default to keep stdout small)
+    raw?: boolean;
+    onProgress?: (event: OcrProgressEvent) => void;
+};
+
+/**
+ * Runs scripts/ocr_service.py in NDJSON streaming mode (--stream).
+ * Each stdout line is one JSON frame: progress events as stages finish, then
+ * a single {"event": "result"} frame. Lines are parsed as they arrive, so
+ * stdout is never buffered whole.
+ * `input` is a file path, or an upload piped to the script's stdin.
+ */
+export function runOcrService(input: string | OcrUpload, options: RunOcrOptions = {}): Promise<any> {
+    const scriptPath = join(process.cwd(), "scripts", "ocr_service.py");
+    const upload = typeof input === "string" ? null : input;
+    const args = [scriptPath, upload ? "-" : (input as string), "--stream"];
+    if (upload) args.push("--name", upload.filename);
+    if (options.raw) args.push("--raw");
+
+    return new Promise((resolve, reject) => {
+        // Use 'python' command. Ensure python is in system PATH.
+        const pythonProcess = spawn("python", args);
+        let pending = "";
+        let errorString = "";
+        let result: any = undefined;
+
+        const handleLine = (line: string) => {
+            if (!line.trim()) return;
+            let frame: OcrProgressEvent | OcrResultFrame;
+            try {
+                frame = JSON.parse(line);
+            } catch (e) {
+                // Stray prints from native libraries are not frames
+                return;
+            }
+            if (frame.event === "result") {
+                result = frame.result;
+            } else if (frame.event === "progress") {
+                options.onProgress?.(frame);
+            }
+        };
+
+        pythonProcess.stdout.setEncoding("utf8");
+        pythonProcess.stdout.on("data", (chunk: string) => {
+            pending += chunk;
+            let newline = pending.indexOf("\n");
+            while (newline !== -1) {
+                handleLine(pending.slice(0, newline));
+                pending = pending.slice(newline + 1);
+                newline = pending.indexOf("\n");
+            }
+        });
+
+        pythonProcess.stderr.on("data", (data) => {
+            errorString += data.toString();
+        });
+
+        pythonProcess.on("error", reject);
+
+        if (upload) {
+            // An early exit closes stdin; the exit code reports the failure
+            pythonProcess.stdin.on("error", () => {});
+            pythonProcess.stdin.end(upload.data);
+        }
+
+        pythonProcess.on("close", (code) => {
+            handleLine(pending);
+            if (code !== 0) {
+                console.error("Python Script Error Output:", errorString);
+                reject(new Error(`Python script exited with code ${code}`));
+            } else if (result === undefined) {
+                reject(new Error("Failed to parse OCR response"));
+            } else {
+                resolve(result);
+            }
+        });
+    });
+}
+
+/**
+ * OCR + extraction for an upload held in memory: posted to the warm worker
+ * pool (scripts/ocr_server.py) when OCR_SERVER_URL is set, otherwise piped
+ * to ocr_service.py. Nothing is written to disk either way.
+ */
+export async function extractDocument(upload: OcrUpload, options: RunOcrOptions = {}): Promise<any> {
+    const ocrServerUrl = process.env.OCR_SERVER_URL;
+    if (!ocrServerUrl) {
+        return runOcrService(upload, options);
+    }
+
+    const body = new FormData();
+    body.append("file", new Blob([upload.data], { type: upload.type || "application/octet-stream" }), upload.filename);
+
+    const response = await fetch(`${ocrServerUrl}/upload`, {
+        method: "POST",
+        body,
+        cache: "no-store"
+    });
+
+    if (!response.ok) {
+        const detail = await response.text();
+        throw new Error(`OCR server error (${response.status}): ${detail}`);
+    }
+    return response.json();
+}
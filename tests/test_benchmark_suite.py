@@ -0,0 +1,45 @@
+import sys
+import os
+
+# ocr_* modules live in scripts/, the suite and its corpus in scripts/benchmarks/
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts', 'benchmarks')))
+
+import corpus
+import suite
+from common import SAMPLE_DIR
+from ocr_cache import file_digest
+from ocr_service import run_extraction, no_trace
+
+def test_fixtures_match_sample_files_and_expected_fields():
+    fixtures = corpus.ocr_fixtures()
+    assert {f["expected"]["docType"] for f in fixtures} == {"FORM_9", "FORM_D", "LLP_CERT"}
+    for fixture in fixtures:
+        assert file_digest(os.path.join(SAMPLE_DIR, fixture["file"])) == fixture["sha256"]
+        doc_type, fields = run_extraction(corpus.fixture_text(fixture), no_trace)
+        assert doc_type == fixture["expected"]["docType"]
+        for key, value in fixture["expected"]["fields"].items():
+            assert fields.get(key) == value, (fixture["file"], key)
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    base = {"min_ms": 40.0, "p50_ms": 50.0, "peak_kb": 1000.0}
+    baseline = {"cases": {"slow": dict(base), "noisy": dict(base), "tiny": {"min_ms": 0.2, "p50_ms": 0.2, "peak_kb": 5.0},
+                          "memory": dict(base)}}
+    results = {
+        "slow": {"min_ms": 60.0, "p50_ms": 70.0, "peak_kb": 1000.0},
+        # Median moved, fastest run did not: noise, not a regression
+        "noisy": {"min_ms": 41.0, "p50_ms": 70.0, "peak_kb": 1000.0},
+        # 2x slower but under the 1ms floor
+        "tiny": {"min_ms": 0.4, "p50_ms": 0.4, "peak_kb": 10.0},
+        "memory": {"min_ms": 40.0, "p50_ms": 50.0, "peak_kb": 1500.0},
+        "new_case": {"min_ms": 1e6, "p50_ms": 1e6, "peak_kb": 1e6},
+    }
+    regressions = suite.compare(results, baseline, threshold=0.25)
+    assert [r.split(":")[0] for r in regressions] == ["slow", "memory"]
+    assert "p50_ms" in regressions[0] and "peak_kb" in regressions[1]
+    assert suite.compare(results, baseline, threshold=0.6) == []
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    test_fixtures_match_sample_files_and_expected_fields()
+    test_compare_flags_only_regressions_beyond_threshold()
@@ -0,0 +1,83 @@
+import sys
+import os
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from extractor.classifier import Automaton, Classifier, get_classifier, rank_doc_types, words
+from extractor.rules_base import classify_doc
+from ocr_fixtures import load_fixtures
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'ocr')
+
+def _fixture_text(fixture):
+    from ocr_service import parse_remote_response, no_trace
+    lines, _, _ = parse_remote_response(fixture["response"], no_trace)
+    return "\n".join(line["text"] for line in lines)
+
+def test_automaton_finds_overlapping_phrases_in_one_pass():
+    phrases = [words(p) for p in ("REGISTER OF DIRECTORS", "DIRECTORS MANAGERS AND SECRETARIES",
+                                  "OF DIRECTORS", "FORM 49", "FORM")]
+    automaton = Automaton(phrases)
+    text = words("Form 49 - particulars in the register of directors, managers and secretaries")
+    assert automaton.find(text) == {0, 1, 2, 3, 4}
+    assert automaton.find(words("register of companies")) == set()
+
+def test_fixtures_classify_with_full_confidence():
+    for fixture in load_fixtures(FIXTURE_DIR).values():
+        text = _fixture_text(fixture)
+        ranked = rank_doc_types(text)
+        assert ranked[0]["docType"] == fixture["expected"]["docType"] == classify_doc(text)
+        assert ranked[0]["confidence"] == 1.0
+
+def test_company_profile_is_not_taken_for_form_9():
+    # Heading lost to OCR; "SDN. BHD." + "MALAYSIA" alone used to make it a Form 9
+    text = ("Name :MAP PROPERTIES SDN. BHD.\nLast Old Name :NIL\nRegistered Address :KUANTAN PAHANG\n"
+            "Origin :MALAYSIA\nNature Of Business :GROWING OF MAIZE")
+    ranked = rank_doc_types(text)
+    assert [r["docType"] for r in ranked] == ["CORPORATE_INFO", "FORM_9"]
+    assert ranked[0]["confidence"] > ranked[1]["confidence"]
+
+    # An LLP certificate naming a Berhad partner is still an LLP certificate
+    llp = ("LIMITED LIABILITY PARTNERSHIPS ACT 2012\nCERTIFICATE OF REGISTRATION OF\nLIMITED LIABILITY PARTNERSHIP\n"
+           "ANALOG DATA PLT, a partner being ANALOG HOLDINGS BERHAD\nMALAYSIA")
+    assert classify_doc(llp) == "LLP_CERT"
+
+def test_new_ssm_forms_come_from_the_data_file():
+    assert classify_doc("COMPANIES ACT 1965\nFORM 24\n(Section 54(1))\nRETURN OF ALLOTMENT OF SHARES\n"
+                        "ANALOG DATA SDN. BHD.\nMALAYSIA\nNumber of shares allotted") == "FORM_24"
+    assert classify_doc("FORM 49\n(Section 141(6))\nRETURN GIVING PARTICULARS IN REGISTER OF DIRECTORS, "
+                        "MANAGERS AND SECRETARIES AND CHANGES OF PARTICULARS") == "FORM_49"
+    assert classify_doc("COMPANIES ACT 2016\nSection 58\nNOTIFICATION OF CHANGE IN THE REGISTER OF DIRECTORS, "
+                        "MANAGERS AND SECRETARIES") == "SECTION_58"
+    assert classify_doc("Minutes of the annual general meeting") == "UNKNOWN"
+
+def test_extra_doc_types_and_prefix(tmp_path, monkeypatch):
+    extra = tmp_path / "types.json"
+    extra.write_text(json.dumps({"FORM_44": {
+        "signals": {"form": {"weight": 6, "phrases": ["FORM 44"]},
+                    "title": {"weight": 4, "phrases": ["NOTICE OF SITUATION OF REGISTERED OFFICE"]}},
+        "requires": [["form"], ["title"]]}}))
+    text = "FORM 44\nNOTICE OF SITUATION OF REGISTERED OFFICE AND OF OFFICE HOURS"
+    assert classify_doc(text) == "UNKNOWN"
+    monkeypatch.setenv("OCR_DOC_TYPES", str(extra))
+    assert rank_doc_types(text) == [{"docType": "FORM_44", "score": 10, "confidence": 1.0}]
+    assert "FORM_9" in [t.name for t in get_classifier().types]
+
+    # Only the prefix is read
+    classifier = Classifier({"X": {"signals": {"marker": {"weight": 1, "phrases": ["END MARKER"]}}}})
+    text = "x " * 5000 + "END MARKER"
+    assert classifier.classify(text, prefix=8192) == "UNKNOWN"
+    assert classifier.classify(text, prefix=0) == "X"
+
+if __name__ == "__main__":
+    import pytest
+    import tempfile
+    from pathlib import Path
+    test_automaton_finds_overlapping_phrases_in_one_pass()
+    test_fixtures_classify_with_full_confidence()
+    test_company_profile_is_not_taken_for_form_9()
+    test_new_ssm_forms_come_from_the_data_file()
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_extra_doc_types_and_prefix(Path(tmp), patch)
+    print("Test Passed!")
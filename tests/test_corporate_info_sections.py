@@ -0,0 +1,54 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from extractor.corporate_info import split_sections, extract_corporate_info_simple
+
+PROFILE = "\n".join([
+    "Name               : MAJU JAYA SDN. BHD.",
+    "Registration No.   : 201501019183(1144519-K)",
+    "                    SUMMARY OF SHARE CAPITAL",
+    "TOTAL ISSUED (RM) 1,000.00",
+    "                    DIRECTORS/OFFICERS",
+    "           CHONG SIW CHIN                 710615-08-5992 DIRECTOR   01-08-2019",
+    "           LEE YUAN YIN                   710402-06-5330 SECRETARY  04-11-2024",
+    " " * 400,
+    "                    SHAREHOLDERS/MEMBERS",
+    "           710615-08-5992      CHONG SIW CHIN                        1,000",
+    " " * 400,
+    "                    COMPANY CHARGES",
+    "NO INFORMATION",
+    "SUMMARY OF FINANCIAL INFORMATION",
+    "BALANCE SHEET ITEMS",
+    "INCOME STATEMENT ITEMS",
+    "** END OF REPORT **",
+])
+
+def test_split_sections():
+    spans = split_sections(PROFILE)
+    section = lambda name: PROFILE[slice(*spans[name])]
+    assert "SUMMARY OF SHARE CAPITAL" not in section("header")
+    assert "MAJU JAYA" in section("header")
+    assert "LEE YUAN YIN" in section("directors")
+    assert "SHAREHOLDERS" not in section("directors")
+    assert section("shareholders").strip().startswith("710615-08-5992")
+    assert "COMPANY CHARGES" not in section("shareholders")
+    assert section("balance_sheet").strip() == ""
+    assert "END OF REPORT" not in section("income_statement")
+
+def test_extract_uses_sections():
+    result = extract_corporate_info_simple(PROFILE)
+    assert result["companyName"] == "MAJU JAYA SDN. BHD."
+    assert [d["name"] for d in result["directors"]] == ["CHONG SIW CHIN", "LEE YUAN YIN"]
+    assert result["shareholders"] == [{"name": "CHONG SIW CHIN", "ic": "710615-08-5992", "shares": 1000, "percentage": 100.0}]
+
+def test_missing_sections():
+    spans = split_sections("Name : X SDN BHD")
+    assert spans == {"header": (0, 16)}
+
+if __name__ == "__main__":
+    test_split_sections()
+    test_extract_uses_sections()
+    test_missing_sections()
+    print("Test Passed!")
@@ -0,0 +1,31 @@
+import sys
+import os
+import re
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from extractor import patterns
+from ocr_service import clean_merged_text
+
+def test_registry_holds_compiled_patterns():
+    assert len(patterns.PATTERNS) > 50
+    assert all(isinstance(p, re.Pattern) for p in patterns.PATTERNS.values())
+    try:
+        patterns.register("shared.whitespace", r"\s+")
+        assert False, "duplicate names must be rejected"
+    except ValueError:
+        pass
+
+def test_clean_merged_text_single_pass():
+    assert clean_merged_text("ANALOGDATA SDNBHD") == "ANALOG DATA SDN BHD"
+    assert clean_merged_text("kualalumpur") == "KUALA LUMPUR"
+    assert clean_merged_text("COMMISSIONOFMALAYSLA") == "COMMISSION OF MALAYSIA"
+    assert clean_merged_text("REGISTRAR OF COMPANIES MALAYSLA") == "REGISTRAR OF COMPANIES MALAYSIA"
+    assert clean_merged_text("MAJUTECHBHD") == "MAJUTECH BHD"
+    assert clean_merged_text("NO 12 JALAN 3TMN 5JALAN") == "NO 12 JALAN 3 TMN 5 JALAN"
+    assert clean_merged_text("202003000123") == "202003000123"
+
+if __name__ == "__main__":
+    test_registry_holds_compiled_patterns()
+    test_clean_merged_text_single_pass()
+    print("Test Passed!")
@@ -23,14 +23,14 @@ def test_extract_form_9_minimal():
     fields = extract_form_9(SAMPLE_BLOCKS)
     print("Extracted Fields:", fields)
     
-    assert fields["doc_type"] == "FORM_9"
-    assert fields["entity_name"] == "ANALOG DATA SDN BHD"
-    assert fields["registration_number_new"] == "190933432134"
-    assert fields["registration_number_old"] == "1234567-H"
-    assert fields["incorporation_or_registration_date"] == "2007-06-07"
-    assert fields["issue_place"] == "KL"
-    assert fields["issue_date"] == "2007-06-07"
-    assert fields["signing_officer"].upper().startswith("DATUK")
+    assert fields["docType"] == "FORM_9"
+    assert fields["companyName"] == "ANALOG DATA SDN BHD"
+    assert fields["registrationNumber"] == "190933432134"
+    assert fields["oldRegistrationNumber"] == "1234567-H"
+    assert fields["registrationDate"] == "2007-06-07"
+    assert fields["issuePlace"] == "KL"
+    assert fields["issueDate"] == "2007-06-07"
+    assert fields["signingOfficer"].upper().startswith("DATUK")
     print("Test Passed!")
 
 if __name__ == "__main__":
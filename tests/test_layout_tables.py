@@ -0,0 +1,56 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import pdf_text
+from extractor.corporate_info import extract_corporate_info
+from extractor.layout_tables import parse_officer_tables, table_page_range
+
+SAMPLE_PDF = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert', '1144519-K_CP_19112025_EN.pdf'))
+
+def _word(text, x0, top, width=None):
+    return {"text": text, "x0": x0, "x1": x0 + (width or 6 * len(text)), "top": top, "bottom": top + 10}
+
+def test_sample_tables_match_layout_text():
+    pages, backend, _, page_words = pdf_text.extract_text(SAMPLE_PDF, backend="pdfplumber", words=True)
+    start, stop = table_page_range(pages)
+    assert (start, stop) == (2, 5)
+    text = pdf_text.join_pages(pages)
+    from_text = extract_corporate_info(text)
+    from_words = extract_corporate_info(text, page_words[start:stop])
+    assert from_words["directors"] == from_text["directors"]
+    assert from_words["shareholders"] == from_text["shareholders"]
+    assert len(from_words["directors"]) == 4
+
+def test_wrapped_cells_stay_in_their_column():
+    page = [
+        _word("DIRECTORS/OFFICERS", 243, 125),
+        _word("Name/Address", 77, 210), _word("IC/Passport", 308, 210),
+        _word("Designation", 406, 210), _word("Appointment", 492, 210),
+        _word("ROSTILA", 78, 230), _word("BINTI", 126, 230),
+        _word("771020-06-5908", 308, 230), _word("COMPANY", 406, 230), _word("04-11-2024", 493, 230),
+        _word("25000", 77, 242), _word("KUANTAN", 113, 242), _word("SECRETARY", 406, 242),
+        _word("SHAREHOLDERS/MEMBERS", 237, 300),
+        _word("IC/Passport/", 77, 320), _word("Total", 469, 320),
+        _word("Name/Company", 227, 332), _word("share", 478, 332),
+        _word("710402-06-5330", 77, 350), _word("LEE", 227, 350), _word("YUAN", 251, 350), _word("1", 539, 350),
+        _word("ABDULLAH", 227, 362),
+        _word("COMPANY", 230, 400), _word("CHARGES", 280, 400),
+    ]
+    tables = parse_officer_tables([page])
+    assert tables["directors"] == [{
+        "name": "ROSTILA BINTI", "ic": "771020-06-5908", "designation": "COMPANY SECRETARY",
+        "appointmentDate": "04-11-2024", "address": "25000 KUANTAN",
+    }]
+    assert tables["shareholders"] == [{"name": "LEE YUAN ABDULLAH", "ic": "710402-06-5330", "shares": 1}]
+
+def test_no_tables():
+    assert parse_officer_tables([[_word("FORM", 10, 10), _word("9", 50, 10)]]) == {}
+    assert table_page_range(["CERTIFICATE OF INCORPORATION"]) is None
+
+if __name__ == "__main__":
+    test_sample_tables_match_layout_text()
+    test_wrapped_cells_stay_in_their_column()
+    test_no_tables()
+    print("Test Passed!")
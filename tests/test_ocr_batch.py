@@ -0,0 +1,84 @@
+import sys
+import os
+import asyncio
+import json
+import shutil
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from ocr_batch import iter_inputs, run_batch
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert')
+PDF = "1144519-K_CP_19112025_EN.pdf"
+IMAGE = "sample-cert-form-9-SDN-BHD.jpg"
+
+def _rows(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_iter_inputs_resolves_directories_globs_and_manifests(tmp_path):
+    (tmp_path / "nested").mkdir()
+    for name in ("a.pdf", "nested/b.JPG", "notes.docx"):
+        (tmp_path / name).write_bytes(b"x")
+    a, b = str(tmp_path / "a.pdf"), str(tmp_path / "nested" / "b.JPG")
+
+    assert iter_inputs(str(tmp_path)) == [a, b]
+    assert iter_inputs(str(tmp_path), recursive=False) == [a]
+    assert iter_inputs(str(tmp_path / "*.pdf")) == [a]
+
+    (tmp_path / "list.txt").write_text("# inputs\na.pdf\n\nnested/b.JPG\nmissing.pdf\n")
+    assert iter_inputs(str(tmp_path / "list.txt")) == [a, b]
+    (tmp_path / "list.jsonl").write_text(json.dumps({"path": b}) + "\n")
+    assert iter_inputs(str(tmp_path / "list.jsonl")) == [b]
+
+def test_resume_retries_failed_rows_and_fresh_runs_truncate(tmp_path, monkeypatch):
+    # No remote OCR and no local OCR: the PDF has a text layer, the image fails
+    monkeypatch.delenv("HF_API_URL", raising=False)
+    monkeypatch.setenv("OCR_ENGINE", "remote")
+    # Cache off, here and in the workers
+    import ocr_cache
+    monkeypatch.setenv("OCR_CACHE", "off")
+    monkeypatch.setattr(ocr_cache, "_cache", None)
+    monkeypatch.setattr(ocr_cache, "_cache_loaded", True)
+    monkeypatch.setenv("OCR_QR_FAST_PATH", "0")
+    for name in (PDF, IMAGE):
+        shutil.copy(os.path.join(SAMPLE_DIR, name), tmp_path / name)
+    paths = iter_inputs(str(tmp_path))
+    output = str(tmp_path / "out.jsonl")
+
+    summary = asyncio.run(run_batch(paths, output, workers=1))
+    assert (summary["total"], summary["skipped"], summary["ok"], summary["failed"]) == (2, 0, 1, 1)
+    assert summary["native"] == 1 and summary["remote"] == summary["local"] == 0
+    rows = {os.path.basename(r["path"]): r for r in _rows(output)}
+    assert rows[PDF]["docType"] == "CORPORATE_INFO"
+    assert not rows[IMAGE]["success"] and "HF_API_URL" in rows[IMAGE]["error"]
+
+    # Only the failure is tried again; its new row replaces the old one
+    summary = asyncio.run(run_batch(paths, output, workers=1, resume=True))
+    assert (summary["skipped"], summary["ok"], summary["failed"]) == (1, 0, 1)
+    assert sorted(os.path.basename(r["path"]) for r in _rows(output)) == [PDF, IMAGE]
+
+    # An interrupted run leaves half a line behind; resume skips it
+    with open(output + ".checkpoint", "a", encoding="utf-8") as f:
+        f.write('{"path": "/b", "succ')
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"path": "/b", "docT')
+    summary = asyncio.run(run_batch(paths, output, workers=1, resume=True))
+    assert (summary["skipped"], summary["failed"]) == (1, 1)
+    assert sorted(os.path.basename(r["path"]) for r in _rows(output)) == [PDF, IMAGE]
+    assert len(_rows(output + ".checkpoint")) == 2
+
+    # A fresh run starts both files over
+    asyncio.run(run_batch(paths, output, workers=1))
+    assert len(_rows(output)) == 2
+    assert len(_rows(output + ".checkpoint")) == 2
+
+if __name__ == "__main__":
+    import pytest
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as tmp:
+        test_iter_inputs_resolves_directories_globs_and_manifests(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_resume_retries_failed_rows_and_fresh_runs_truncate(Path(tmp), patch)
+    print("Test Passed!")
@@ -0,0 +1,117 @@
+import sys
+import os
+import time
+
+# Add scripts directory to sys.path (ocr_* modules import each other top-level)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from ocr_cache import MemoryCache, SqliteCache, TieredCache, ocr_key, extraction_key, extractor_version
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(max_entries=2, ttl=60)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}   # 'a' becomes most recent
+    cache.set("c", {"v": 3})            # evicts 'b'
+    assert cache.get("b") is None
+    assert cache.get("c") == {"v": 3}
+
+    short = MemoryCache(ttl=0.01)
+    short.set("x", {"v": 1})
+    time.sleep(0.02)
+    assert short.get("x") is None
+
+def test_sqlite_cache_size_eviction(tmp_path):
+    cache = SqliteCache(path=str(tmp_path / "cache.sqlite"), max_entries=3, max_bytes=10_000)
+    for i in range(5):
+        cache.set(f"k{i}", {"i": i})
+        time.sleep(0.001)
+    assert cache.stats()["entries"] == 3
+    assert cache.get("k0") is None
+    assert cache.get("k4") == {"i": 4}
+
+    big = SqliteCache(path=str(tmp_path / "big.sqlite"), max_bytes=200)
+    big.set("one", {"text": "x" * 150})
+    big.set("two", {"text": "y" * 150})
+    assert big.get("one") is None
+    assert big.get("two") is not None
+
+def test_tiered_cache_promotes_from_disk(tmp_path):
+    back = SqliteCache(path=str(tmp_path / "cache.sqlite"))
+    back.set("k", {"v": 1})
+    cache = TieredCache(MemoryCache(), back)
+    assert cache.get("k") == {"v": 1}
+    assert cache.front.get("k") == {"v": 1}
+
+def test_stage_keys():
+    assert ocr_key("abc").startswith("ocr:") and ocr_key("abc").endswith(":abc")
+    key = extraction_key("SOME OCR TEXT")
+    assert key.startswith("extract:")
+    assert key.endswith(extractor_version())
+    assert key != extraction_key("OTHER OCR TEXT")
+
+def test_ocr_key_follows_stage_1_settings(monkeypatch):
+    for name in ("OCR_QR_FAST_PATH", "OCR_ENGINE", "OCR_RASTER_DPI"):
+        monkeypatch.delenv(name, raising=False)
+    default = ocr_key("abc")
+    # A QR-only entry cached with the fast path on is not served with it off
+    monkeypatch.setenv("OCR_QR_FAST_PATH", "0")
+    no_qr = ocr_key("abc")
+    assert no_qr != default and no_qr.endswith(":abc")
+    monkeypatch.setenv("OCR_RASTER_DPI", "300")
+    assert ocr_key("abc") not in (default, no_qr)
+    # Settings that don't touch stage 1 leave the key alone
+    monkeypatch.delenv("OCR_QR_FAST_PATH")
+    monkeypatch.delenv("OCR_RASTER_DPI")
+    monkeypatch.setenv("OCR_TRACE", "0")
+    assert ocr_key("abc") == default
+
+def test_items_filters_by_stage_prefix(tmp_path):
+    cache = SqliteCache(path=str(tmp_path / "cache.sqlite"))
+    cache.set(ocr_key("d1"), {"lines": []})
+    cache.set(extraction_key("text"), {"docType": "FORM_9", "fields": {}})
+    keys = [k for k, _ in cache.items("ocr:")]
+    assert keys == [ocr_key("d1")]
+
+def test_reextract_refreshes_stage_2_from_cached_text(tmp_path):
+    import io
+    import json
+    from ocr_reextract import reextract
+    from extractor.rules_base import classify_doc
+
+    lines = ["FORM D (RULE 13)", "CERTIFICATE OF REGISTRATION", "THE REGISTRATION OF BUSINESSES ACT 1956",
+             "KEDAI RUNCIT TERUS MAJU", "REGISTRATION NO : 202003000123 (JM0912345-M)"]
+    text = "\n".join(lines)
+    cache = SqliteCache(path=str(tmp_path / "cache.sqlite"))
+    cache.set(ocr_key("d" * 64), {"lines": [{"text": line} for line in lines]})
+    # Fast-path entries hold fields from the QR payload, not text to extract from
+    payload = '{"type": "Form D", "name": "KEDAI RUNCIT TERUS MAJU"}'
+    cache.set(ocr_key("e" * 64), {"source": "qr", "lines": [{"text": "KEDAI RUNCIT TERUS MAJU"}],
+                                  "qr_payload": payload, "qr_fields": {"docType": "FORM_D", "fields": {}}})
+
+    out = io.StringIO()
+    summary = reextract(cache, out=out)
+    assert summary["errors"] == 0 and summary["updated"] == 1 and summary["qr"] == 1
+    assert summary["by_type"] == {"FORM_D": 1}
+    rows = {row["digest"]: row for row in map(json.loads, out.getvalue().splitlines())}
+    assert rows["d" * 64]["docType"] == "FORM_D" == classify_doc(text)
+    assert rows["e" * 64] == {"digest": "e" * 64, "skipped": "qr fast path"}
+    assert cache.get(extraction_key(text))["docType"] == "FORM_D"
+    assert cache.get(extraction_key("KEDAI RUNCIT TERUS MAJU")) is None
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_memory_cache_lru_and_ttl()
+    with tempfile.TemporaryDirectory() as d:
+        test_sqlite_cache_size_eviction(pathlib.Path(d))
+    with tempfile.TemporaryDirectory() as d:
+        test_tiered_cache_promotes_from_disk(pathlib.Path(d))
+    test_stage_keys()
+    import pytest
+    with pytest.MonkeyPatch.context() as patch:
+        test_ocr_key_follows_stage_1_settings(patch)
+    with tempfile.TemporaryDirectory() as d:
+        test_items_filters_by_stage_prefix(pathlib.Path(d))
+    with tempfile.TemporaryDirectory() as d:
+        test_reextract_refreshes_stage_2_from_cached_text(pathlib.Path(d))
+    print("Test Passed!")
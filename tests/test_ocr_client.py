@@ -0,0 +1,203 @@
+import sys
+import os
+import asyncio
+
+# Add scripts directory to sys.path (ocr_* modules import each other top-level)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import httpx
+from ocr_client import RemoteOcrClient, RemoteOcrError, CircuitOpenError
+from ocr_fixtures import load_fixtures
+from ocr_stub_server import create_app
+
+def _client(app, **kwargs):
+    kwargs.setdefault("backoff_base", 0.001)
+    return RemoteOcrClient("http://stub", transport=httpx.ASGITransport(app=app), **kwargs)
+
+def test_retries_on_503_then_succeeds():
+    app = create_app(statuses=[503, 429])
+    client = _client(app)
+    data = asyncio.run(client.ocr(b"fake-image", "cert.jpg"))
+    assert data["result"][0][0][0] == "COMPANIES ACT 2016 (ACT 777)"
+    assert client.retries == 2
+    assert app.state.requests == 3
+    assert client.metrics()["circuit"] == "closed"
+
+def test_non_retryable_status_fails_immediately():
+    app = create_app(statuses=[400])
+    client = _client(app)
+    try:
+        asyncio.run(client.ocr(b"x", "cert.jpg"))
+        assert False, "expected RemoteOcrError"
+    except RemoteOcrError as e:
+        assert e.status == 400
+    assert app.state.requests == 1
+    assert client.breaker.state == "closed"
+
+def test_circuit_opens_and_fails_fast():
+    app = create_app(statuses=[503] * 10)
+    client = _client(app, max_retries=0, breaker_threshold=2, breaker_reset=60)
+
+    async def run():
+        for _ in range(2):
+            try:
+                await client.ocr(b"x", "cert.jpg")
+            except RemoteOcrError:
+                pass
+        try:
+            await client.ocr(b"x", "cert.jpg")
+            assert False, "expected CircuitOpenError"
+        except CircuitOpenError:
+            pass
+
+    asyncio.run(run())
+    assert app.state.requests == 2
+    assert client.metrics()["circuit"] == "open"
+
+def test_concurrency_is_bounded():
+    app = create_app(latency=0.02)
+    client = _client(app, max_concurrency=2)
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, client.in_flight)
+            await asyncio.sleep(0.001)
+
+    async def run():
+        watcher = asyncio.create_task(watch())
+        await asyncio.gather(*(client.ocr(b"x", f"{i}.jpg") for i in range(6)))
+        watcher.cancel()
+
+    asyncio.run(run())
+    assert peak <= 2
+    assert client.metrics()["calls"] == 6
+
+def test_record_mode_fixture_is_replayed_by_hash(tmp_path):
+    recorded = {"result": [[["MAJU JAYA PLT", 0.97]]], "qr_payload": None}
+    recorder = _client(create_app(pages=recorded["result"]), record_dir=str(tmp_path))
+    asyncio.run(recorder.ocr(b"llp-image", "cert-llp.jpg"))
+    fixtures = load_fixtures(str(tmp_path))
+    assert [f["file"] for f in fixtures.values()] == ["cert-llp.jpg"]
+
+    app = create_app(fixtures=fixtures)
+    data = asyncio.run(_client(app).ocr(b"llp-image", "renamed.jpg"))
+    assert data["result"] == recorded["result"]
+    try:
+        asyncio.run(_client(app).ocr(b"other-image", "cert-llp.jpg"))
+        assert False, "expected RemoteOcrError"
+    except RemoteOcrError as e:
+        assert e.status == 404
+    assert app.state.counts["replayed"] == 1 and app.state.counts["misses"] == 1
+
+def test_stub_throttles_and_injects_errors():
+    app = create_app(rate_limit=0.5, burst=2)
+    client = _client(app, max_retries=0)
+
+    async def run():
+        results = await asyncio.gather(*(client.ocr(b"x", f"{i}.jpg") for i in range(4)), return_exceptions=True)
+        return [getattr(r, "status", 200) for r in results]
+
+    assert sorted(asyncio.run(run())) == [200, 200, 429, 429]
+    assert app.state.counts["throttled"] == 2
+
+    app = create_app(error_rate=1.0)
+    try:
+        asyncio.run(_client(app, max_retries=1).ocr(b"x", "cert.jpg"))
+        assert False, "expected RemoteOcrError"
+    except RemoteOcrError as e:
+        assert e.status == 503
+    assert app.state.counts["errors"] == 2
+
+def test_read_timeouts_are_not_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("Space took too long", request=request)
+
+    client = RemoteOcrClient("http://stub", transport=httpx.MockTransport(handler), backoff_base=0.001)
+    try:
+        asyncio.run(client.ocr(b"x", "cert.jpg"))
+        assert False, "expected RemoteOcrError"
+    except RemoteOcrError as e:
+        assert "ReadTimeout" in str(e)
+    assert len(calls) == 1 and client.retries == 0
+
+def test_invalid_body_counts_as_a_failure():
+    client = RemoteOcrClient("http://stub", transport=httpx.MockTransport(lambda r: httpx.Response(200, text="<html>")),
+                             max_retries=0, breaker_threshold=1)
+    try:
+        asyncio.run(client.ocr(b"x", "cert.jpg"))
+        assert False, "expected RemoteOcrError"
+    except RemoteOcrError as e:
+        assert "invalid JSON" in str(e)
+    assert client.breaker.state == "open"
+
+def test_cancelled_half_open_trial_releases_the_breaker():
+    app = create_app(latency=0.5)
+    client = _client(app, breaker_threshold=1, breaker_reset=0)
+    client.breaker.record_failure()
+    assert client.breaker.state == "half_open"
+
+    async def run():
+        trial = asyncio.create_task(client.ocr(b"x", "cert.jpg"))
+        await asyncio.sleep(0.05)
+        trial.cancel()
+        try:
+            await trial
+        except asyncio.CancelledError:
+            pass
+        # The next call is allowed through as a new trial
+        app.state.latency = 0
+        return await client.ocr(b"x", "cert.jpg")
+
+    assert asyncio.run(run())["result"]
+    assert client.breaker.state == "closed"
+
+def test_multi_page_document_waits_for_the_half_open_trial():
+    from ocr_client import register_client, remote_ocr_many_sync
+    pages = [(f"page-{i}".encode(), f"page-{i}.png") for i in range(3)]
+
+    # Async (ocr_batch)
+    app = create_app(latency=0.05)
+    client = _client(app, breaker_threshold=1, breaker_reset=0)
+    client.breaker.record_failure()
+    assert client.breaker.state == "half_open"
+    assert len(asyncio.run(client.ocr_many(pages))) == 3
+    assert app.state.requests == 3 and client.breaker.state == "closed"
+
+    # Sync (process_document)
+    app = create_app(latency=0.05)
+    client = register_client(RemoteOcrClient("http://half-open-stub", transport=httpx.ASGITransport(app=app),
+                                             breaker_threshold=1, breaker_reset=0))
+    client.breaker.record_failure()
+    assert len(remote_ocr_many_sync("http://half-open-stub", None, iter(pages))) == 3
+    assert app.state.requests == 3 and client.breaker.state == "closed"
+
+    # A failed trial re-opens the breaker and the other pages fail fast
+    app = create_app(statuses=[503])
+    client = _client(app, max_retries=0, breaker_threshold=1, breaker_reset=60)
+    client.breaker.record_failure()
+    client.breaker.opened_at -= 60
+    try:
+        asyncio.run(client.ocr_many(pages))
+        assert False, "expected RemoteOcrError"
+    except RemoteOcrError as e:
+        assert e.status == 503
+    assert app.state.requests == 1 and client.breaker.state == "open"
+
+if __name__ == "__main__":
+    test_retries_on_503_then_succeeds()
+    test_non_retryable_status_fails_immediately()
+    test_circuit_opens_and_fails_fast()
+    test_concurrency_is_bounded()
+    import tempfile, pathlib
+    test_record_mode_fixture_is_replayed_by_hash(pathlib.Path(tempfile.mkdtemp()))
+    test_stub_throttles_and_injects_errors()
+    test_read_timeouts_are_not_retried()
+    test_invalid_body_counts_as_a_failure()
+    test_cancelled_half_open_trial_releases_the_breaker()
+    test_multi_page_document_waits_for_the_half_open_trial()
+    print("Test Passed!")
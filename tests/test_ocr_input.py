@@ -0,0 +1,81 @@
+import sys
+import os
+import io
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import ocr_input
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert')
+SAMPLE_PDF = os.path.join(SAMPLE_DIR, '1144519-K_CP_19112025_EN.pdf')
+SAMPLE_JPG = os.path.join(SAMPLE_DIR, 'sample-cert-form-D-ENT.jpg')
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def test_in_memory_pdf_matches_path():
+    import pdf_text
+    data = _read(SAMPLE_PDF)
+    expected = pdf_text.extract_text(SAMPLE_PDF, backend="pdfplumber", early_exit=False)[0]
+    for source in (data, bytearray(data), memoryview(data), io.BytesIO(data)):
+        document = ocr_input.as_input(source)
+        # No name: recognised as a PDF by its header
+        assert ocr_input.is_pdf(document)
+        assert ocr_input.digest(document) == ocr_input.digest(SAMPLE_PDF)
+        assert pdf_text.triage_pages(document) == pdf_text.triage_pages(SAMPLE_PDF)
+        assert pdf_text.extract_text(document, backend="pdfplumber", early_exit=False)[0] == expected
+    # Bytes are used in place, not copied
+    assert ocr_input.as_input(memoryview(data)).data is data
+
+def test_process_document_uploads_image_bytes_unchanged(monkeypatch):
+    import httpx
+    import ocr_service
+    # A stage-1 cache hit would skip the upload under test
+    monkeypatch.setattr(ocr_service, "get_cache", lambda: None)
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app
+
+    uploads = []
+
+    class Recording(httpx.ASGITransport):
+        async def handle_async_request(self, request):
+            uploads.append(await request.aread())
+            return await super().handle_async_request(request)
+
+    url = "http://input-stub"
+    register_client(RemoteOcrClient(url, transport=Recording(app=create_app()), max_retries=0))
+    data = bytearray(_read(SAMPLE_JPG))
+    monkeypatch.setenv("HF_API_URL", url)
+    result = ocr_service.process_document(memoryview(data), filename="cert.jpg", trace=False)
+    assert result["success"]
+    assert len(uploads) == 1 and bytes(data) in uploads[0] and b'filename="cert.jpg"' in uploads[0]
+
+def test_server_reads_multipart_file_in_memory(monkeypatch):
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+    from ocr_server import read_upload
+
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        data, filename = await read_upload(request)
+        return {"size": len(data), "filename": filename, "pdf": ocr_input.is_pdf(ocr_input.as_input(data))}
+
+    data = _read(SAMPLE_PDF)
+    with TestClient(app) as client:
+        response = client.post("/upload", data={"note": "x"}, files={"file": ("profile.pdf", data)})
+        assert response.json() == {"size": len(data), "filename": "profile.pdf", "pdf": True}
+        assert client.post("/upload", files={"other": ("a.pdf", b"%PDF-")}).status_code == 400
+        monkeypatch.setenv("OCR_MAX_UPLOAD_MB", "0")
+        assert client.post("/upload", files={"file": ("a.pdf", data)}).status_code == 413
+
+if __name__ == "__main__":
+    test_in_memory_pdf_matches_path()
+    import pytest
+    with pytest.MonkeyPatch.context() as patch:
+        test_process_document_uploads_image_bytes_unchanged(patch)
+    with pytest.MonkeyPatch.context() as patch:
+        test_server_reads_multipart_file_in_memory(patch)
+    print("Test Passed!")
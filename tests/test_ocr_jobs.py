@@ -0,0 +1,163 @@
+import sys
+import os
+import asyncio
+import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import pytest
+
+from ocr_jobs import JobStore, JobQueue, check_callback_url
+
+def test_store_claims_by_lane_and_deduplicates_in_flight(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    a, _ = store.submit("a" * 64, "a.pdf", data=b"%PDF-a", lane="bulk")
+    b, _ = store.submit("b" * 64, "b.pdf", data=b"%PDF-b", lane="bulk")
+    c, _ = store.submit("c" * 64, "c.pdf", path="/tmp/c.pdf", lane="interactive")
+
+    # Interactive first, then bulk in submission order
+    assert store.claim()["id"] == c
+    claimed = store.claim()
+    assert claimed["id"] == a and claimed["data"] == b"%PDF-a"
+
+    # Same document while in flight: joins the job, an interactive submit promotes it
+    assert store.submit("b" * 64, "copy.pdf", data=b"%PDF-b", lane="interactive",
+                        callback_url="http://cb/1") == (b, True)
+    assert store.get(b)["lane"] == "interactive"
+    assert store.claim(("bulk",)) is None
+    assert store.claim(("interactive",))["id"] == b
+    assert store.submit("b" * 64, "b.pdf", lane="bulk", callback_url="http://cb/2") == (b, True)
+    assert store.get(b)["lane"] == "interactive"
+
+    assert store.finish(b, result={"success": True, "docType": "FORM_9"}) == ["http://cb/1", "http://cb/2"]
+    job = store.get(b)
+    assert job["status"] == "done" and job["result"]["docType"] == "FORM_9"
+    assert store.finish(a, result={"success": False, "error": "no text"}) == []
+    assert store.get(a)["status"] == "failed" and store.get(a)["error"] == "no text"
+
+    # Finished documents are processed again
+    assert store.submit("b" * 64, "b.pdf", data=b"%PDF-b")[1] is False
+
+def test_restart_requeues_running_jobs(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    store = JobStore(path)
+    job_id, _ = store.submit("d" * 64, "d.jpg", data=b"\xff\xd8", lane="bulk")
+    store.claim()
+    assert store.get(job_id)["status"] == "running"
+
+    reopened = JobStore(path)
+    assert reopened.recover() == 1
+    claimed = reopened.claim()
+    assert claimed["id"] == job_id and claimed["data"] == b"\xff\xd8"
+
+def test_concurrent_submits_of_one_document_share_a_job(tmp_path):
+    import threading
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    # Warm the table so every thread starts at the same point
+    store.counts()
+    threads, results = 8, []
+    barrier = threading.Barrier(threads)
+
+    def submit(i):
+        barrier.wait()
+        results.append(store.submit("9" * 64, "same.pdf", data=b"%PDF-9", callback_url=f"http://app/{i}"))
+
+    workers = [threading.Thread(target=submit, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len({job_id for job_id, _ in results}) == 1
+    assert sorted(deduplicated for _, deduplicated in results) == [False] + [True] * (threads - 1)
+    # No joined callback lost to a concurrent read-modify-write
+    assert sorted(store.finish(results[0][0], result={"success": True})) == sorted(
+        f"http://app/{i}" for i in range(threads))
+
+class FakePool:
+    workers = 2
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def process_bytes(self, data, filename):
+        self.calls.append(filename)
+        await self.release.wait()
+        return {"success": True, "docType": "FORM_D", "file": filename}
+
+    async def process_path(self, path):
+        return await self.process_bytes(None, os.path.basename(path))
+
+def test_queue_keeps_a_worker_for_interactive_jobs_and_calls_back(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_JOBS_CALLBACK_HOSTS", "app")
+    import httpx
+    delivered = []
+
+    def callback(request):
+        delivered.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    async def scenario():
+        pool = FakePool()
+        queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), pool, transport=httpx.MockTransport(callback))
+        assert queue.bulk_slots == 1
+        queue.start()
+        try:
+            bulk = [(await queue.submit(f"{i}" * 64, f"bulk{i}.pdf", data=b"%PDF-", lane="bulk"))[0]
+                    for i in range(3)]
+            await asyncio.sleep(0.05)
+            # A full bulk batch only holds one of the two workers
+            assert pool.calls == ["bulk0.pdf"]
+            interactive, _ = await queue.submit("f" * 64, "verify.jpg", data=b"\xff\xd8", callback_url="http://app/hook")
+            await asyncio.sleep(0.05)
+            assert pool.calls == ["bulk0.pdf", "verify.jpg"]
+
+            pool.release.set()
+            for _ in range(100):
+                if all(queue.store.get(j)["status"] == "done" for j in bulk + [interactive]):
+                    break
+                await asyncio.sleep(0.02)
+            assert pool.calls == ["bulk0.pdf", "verify.jpg", "bulk1.pdf", "bulk2.pdf"]
+            assert queue.store.get(interactive)["result"]["file"] == "verify.jpg"
+            assert [d["id"] for d in delivered] == [interactive] and delivered[0]["status"] == "done"
+            assert queue.wait_seconds.snapshot()["bulk"]["count"] == 3
+            assert queue.service_seconds.snapshot()["interactive"]["count"] == 1
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+
+def test_callbacks_only_go_to_allowed_hosts(tmp_path, monkeypatch):
+    monkeypatch.delenv("OCR_JOBS_CALLBACK_HOSTS", raising=False)
+    # Nothing is allowed until hosts are listed
+    with pytest.raises(ValueError):
+        check_callback_url("https://app.example.com/hook")
+    monkeypatch.setenv("OCR_JOBS_CALLBACK_HOSTS", "app.example.com, localhost")
+    check_callback_url("https://APP.example.com/hook")
+    check_callback_url("http://localhost:3000/api/ocr-callback")
+    for url in ("http://169.254.169.254/latest/meta-data/", "http://app.example.com.evil.test/",
+                "file:///etc/passwd", "gopher://localhost/", "not a url"):
+        with pytest.raises(ValueError):
+            check_callback_url(url)
+
+    async def scenario():
+        queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), FakePool())
+        with pytest.raises(ValueError):
+            await queue.submit("e" * 64, "e.pdf", data=b"%PDF-", callback_url="http://10.0.0.1/")
+        assert queue.store.claim() is None
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+    for test in (test_store_claims_by_lane_and_deduplicates_in_flight, test_restart_requeues_running_jobs,
+                 test_concurrent_submits_of_one_document_share_a_job):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    for test in (test_queue_keeps_a_worker_for_interactive_jobs_and_calls_back,
+                 test_callbacks_only_go_to_allowed_hosts):
+        with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+            test(Path(tmp), patch)
+    print("Test Passed!")
@@ -0,0 +1,41 @@
+import sys
+import os
+import math
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import ocr_service
+from ocr_lines import LineTable
+
+def _lines(n, seed=3):
+    rng = random.Random(seed)
+    words = ["SSM", "1", "|", "SURUHANJAYA SYARIKAT MALAYSIA", "MAJU JAYA SDN BHD", "ab"]
+    return [{"text": rng.choice(words), "conf": round(rng.uniform(0.3, 1.0), 3)} for _ in range(n)]
+
+def test_columns_match_dict_loop():
+    lines = _lines(500)
+    table = LineTable.from_lines(lines)
+    assert table.text() == "\n".join(item["text"] for item in lines)
+    assert table.records() == lines
+    assert math.isclose(table.weighted_confidence(), ocr_service.calculate_weighted_confidence(lines), rel_tol=1e-12)
+    assert LineTable.from_lines([{"text": "a", "conf": 0.5}]).weighted_confidence() == 0.0
+
+def test_page_stats():
+    lines = [{"text": "MAJU JAYA", "conf": 0.9}, {"text": "x", "conf": 0.5}, {"text": "SDN BHD", "conf": 0.7}]
+    stats = LineTable.from_lines(lines, [2, 1]).page_stats()
+    assert [s["lines"] for s in stats] == [2, 1]
+    assert stats[0]["noise_lines"] == 1 and stats[0]["chars"] == 10
+    assert stats[0]["weighted_conf"] == 0.9 and stats[1]["mean_conf"] == 0.7
+
+def test_remote_response_page_sizes():
+    data = {"result": [[["A", 0.9], ["B", 0.8]], [[[[0, 0]], ["C", 0.7]]]]}
+    lines, qr, page_sizes = ocr_service.parse_remote_response(data, ocr_service.no_trace)
+    assert [item["text"] for item in lines] == ["A", "B", "C"] and page_sizes == [2, 1]
+    assert ocr_service.line_table(lines, page_sizes) is None  # below OCR_VECTOR_MIN_LINES
+
+if __name__ == "__main__":
+    test_columns_match_dict_loop()
+    test_page_stats()
+    test_remote_response_page_sizes()
+    print("Test Passed!")
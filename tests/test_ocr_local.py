@@ -0,0 +1,109 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import ocr_local
+from ocr_client import RemoteOcrClient
+from ocr_fixtures import load_fixtures
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'ocr')
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert')
+
+# The OCR models are not part of the test environment; a backend that answers
+# with the Space's recorded pages exercises everything around them.
+# `pages` answers every image in turn; None echoes the images back.
+def _use_replay_backend(monkeypatch, pages=None, calls=None):
+    def load(threads, rec_batch):
+        engine = object()
+
+        def recognize(images):
+            if calls is not None:
+                calls.append((engine, len(images)))
+            return list(images) if pages is None else [pages[i % len(pages)] for i in range(len(images))]
+
+        return recognize
+
+    monkeypatch.setitem(ocr_local.BACKENDS, "replay", ("numpy", load))
+    monkeypatch.setenv("OCR_LOCAL_BACKEND", "replay")
+    monkeypatch.setattr(ocr_local, "_pool", None)
+
+def test_choose_engine_follows_remote_health(monkeypatch):
+    _use_replay_backend(monkeypatch, [[]])
+    client = RemoteOcrClient("http://stub", max_concurrency=2)
+    assert ocr_local.choose_engine(client) == ("remote", "remote healthy")
+    assert ocr_local.choose_engine(None)[0] == "local"
+
+    client.breaker.opened_at = time.monotonic()
+    assert ocr_local.choose_engine(client) == ("local", "remote circuit open")
+    client.breaker.opened_at = None
+
+    client.in_flight = 2
+    assert ocr_local.choose_engine(client)[0] == "local"
+    client.in_flight = 0
+
+    client._recent.append((time.perf_counter(), 30.0))
+    assert ocr_local.choose_engine(client)[1] == "remote slow (median 30.0s)"
+    monkeypatch.setenv("OCR_REMOTE_SLOW_MS", "60000")
+    assert ocr_local.choose_engine(client)[0] == "remote"
+
+    monkeypatch.setenv("OCR_ENGINE", "remote")
+    assert ocr_local.choose_engine(None) == ("remote", "OCR_ENGINE=remote")
+    monkeypatch.setenv("OCR_ENGINE", "auto")
+    monkeypatch.setenv("OCR_LOCAL_BACKEND", "not-installed")
+    assert not ocr_local.enabled()
+    assert ocr_local.choose_engine(None) == ("remote", "no local OCR backend")
+
+def test_engine_pool_splits_pages_into_one_batch_per_instance(monkeypatch):
+    calls = []
+    pages = [[[[[0, 0], [1, 0], [1, 1], [0, 1]], [f"page {i}", 0.9]]] for i in range(5)]
+    _use_replay_backend(monkeypatch, calls=calls)
+    pool = ocr_local.EnginePool("replay", size=2, threads=1).start()
+    assert pool.recognize(pages) == pages
+    assert sorted(n for _, n in calls) == [2, 3] and len({id(engine) for engine, _ in calls}) == 2
+    assert pool.stats()["pages"] == 5 and pool.stats()["idle"] == 2
+
+def test_documents_fall_back_to_local_ocr(monkeypatch):
+    import httpx
+    import ocr_service
+    from ocr_client import register_client
+    from ocr_stub_server import create_app
+    from ocr_cache import MemoryCache, OCR_PREFIX
+
+    fixture = next(f for f in load_fixtures(FIXTURE_DIR).values() if f["file"] == "sample-cert-form-D-ENT.jpg")
+    _use_replay_backend(monkeypatch, fixture["response"]["result"])
+    cache = MemoryCache()
+    monkeypatch.setattr(ocr_service, "get_cache", lambda: cache)
+    path = os.path.join(SAMPLE_DIR, fixture["file"])
+    ocr_entries = lambda: [k for k in cache._data if k.startswith(OCR_PREFIX)]
+
+    # No remote OCR configured: local is the engine, and its read is cached
+    monkeypatch.delenv("HF_API_URL", raising=False)
+    result = ocr_service.process_document(path, trace=False)
+    assert result["ocr_engine"] == "local"
+    assert result["extracted_data"]["docType"] == fixture["expected"]["docType"]
+    assert len(ocr_entries()) == 1
+    cache = MemoryCache()
+
+    # The Space is down
+    url = "http://local-fallback-stub"
+    app = create_app(statuses=[503] * 5)
+    register_client(RemoteOcrClient(url, transport=httpx.ASGITransport(app=app), max_retries=0))
+    monkeypatch.setenv("HF_API_URL", url)
+    result = ocr_service.process_document(path, trace=False)
+    assert app.state.requests == 1
+    assert result["ocr_engine"] == "local"
+    assert result["extracted_data"]["registration_number_new"] == fixture["expected"]["fields"]["registration_number_new"]
+    # ...but only stands in for it: not cached, so the next request asks the Space again
+    assert ocr_entries() == []
+    ocr_service.process_document(path, trace=False)
+    assert app.state.requests == 2
+
+if __name__ == "__main__":
+    import pytest
+    for test in (test_choose_engine_follows_remote_health, test_engine_pool_splits_pages_into_one_batch_per_instance,
+                 test_documents_fall_back_to_local_ocr):
+        with pytest.MonkeyPatch.context() as patch:
+            test(patch)
+    print("Test Passed!")
@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Add scripts directory to sys.path (ocr_* modules import each other top-level)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from ocr_metrics import Histogram, collect, span, render
+import ocr_service
+
+def test_spans_accumulate_only_inside_collect():
+    with span("outside"):
+        pass
+    with collect() as timings:
+        for _ in range(3):
+            with span("classify"):
+                sum(range(1000))
+        with span("extract.form_9"):
+            pass
+    ms = timings.as_ms()
+    assert set(ms) == {"classify", "extract.form_9"}
+    assert ms["classify"] > 0
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    h = Histogram("ocr_stage_seconds", "Stage time.", label="stage", buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.01, 0.05, 2.0):
+        h.observe(value, "classify")
+    h.observe(0.2, 'remote "ocr"')
+    lines = render([h]).splitlines()
+    assert lines[:2] == ["# HELP ocr_stage_seconds Stage time.", "# TYPE ocr_stage_seconds histogram"]
+    assert 'ocr_stage_seconds_bucket{stage="classify",le="0.01"} 2' in lines
+    assert 'ocr_stage_seconds_bucket{stage="classify",le="0.1"} 3' in lines
+    assert 'ocr_stage_seconds_bucket{stage="classify",le="+Inf"} 4' in lines
+    assert 'ocr_stage_seconds_count{stage="classify"} 4' in lines
+    assert 'ocr_stage_seconds_sum{stage="classify"} 2.065000' in lines
+    assert 'ocr_stage_seconds_bucket{stage="remote \\"ocr\\"",le="1.0"} 1' in lines
+
+def test_trace_off_formats_nothing():
+    class Loud:
+        def __str__(self):
+            raise AssertionError("formatted with tracing off")
+
+    steps, add_trace, _ = ocr_service.new_trace(enabled=False)
+    add_trace("Document type: %s", Loud())
+    assert add_trace is ocr_service.no_trace and steps == []
+
+    steps, add_trace, _ = ocr_service.new_trace(enabled=True)
+    add_trace("Pages: %d (%s lines)", 2, "boxed")
+    assert steps[0].endswith("Pages: 2 (boxed lines)")
+
+def test_process_document_reports_stage_timings(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_service, "get_cache", lambda: None)
+    path = tmp_path / "missing.pdf"
+    result = ocr_service.process_document(str(path), trace=False)
+    assert "timings_ms" in result and "total" in result["timings_ms"]
+    print("Test Passed!")
+
+if __name__ == "__main__":
+    import tempfile, pathlib, pytest
+    test_spans_accumulate_only_inside_collect()
+    test_histogram_renders_cumulative_prometheus_buckets()
+    test_trace_off_formats_nothing()
+    with pytest.MonkeyPatch.context() as patch:
+        test_process_document_reports_stage_timings(pathlib.Path(tempfile.mkdtemp()), patch)
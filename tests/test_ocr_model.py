@@ -0,0 +1,46 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+from ocr_model import OcrLine, parse_pages, group_rows
+
+def _quad(x0, y0, x1, y1):
+    return [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+
+def test_format_decided_per_response():
+    pages, fmt = parse_pages([[["A", 0.9], ["B", "0.5"]], "skipped", [["C", 1]]])
+    assert fmt == "pair"
+    assert [p.index for p in pages] == [0, 2]
+    assert pages[0].lines == [OcrLine("A", 0.9), OcrLine("B", 0.5)]
+
+    pages, fmt = parse_pages([[[_quad(10, 40, 90, 58), ["SSM", 0.8]]]], str.lower)
+    assert fmt == "boxed"
+    line = pages[0].lines[0]
+    assert (line.text, line.conf, line.bbox) == ("ssm", 0.8, (10, 40, 90, 58))
+    assert line.record() == {"text": "ssm", "conf": 0.8, "bbox": [10, 40, 90, 58]}
+
+    assert parse_pages([["plain", "text"]])[1] == "text"
+
+def test_mixed_formats_fall_back_per_line():
+    pages, fmt = parse_pages([[["A", 0.9], "B", [_quad(0, 0, 5, 5), ["C", 0.7]], ["D"]]])
+    assert fmt == "mixed"
+    assert [(l.text, l.conf) for l in pages[0].lines] == [("A", 0.9), ("B", 0.0), ("C", 0.7), ("D", 0.0)]
+    assert pages[0].lines[2].bbox == (0.0, 0.0, 5.0, 5.0)
+
+def test_group_rows():
+    lines = [
+        OcrLine("SHARES", 1.0, (300, 101, 360, 119)),
+        OcrLine("NAME", 1.0, (10, 100, 80, 120)),
+        OcrLine("CHONG SIW CHIN", 1.0, (10, 140, 160, 160)),
+        OcrLine("650,001", 1.0, (300, 143, 360, 161)),
+        OcrLine("no box", 1.0),
+    ]
+    rows = group_rows(lines)
+    assert [[l.text for l in row] for row in rows] == [["NAME", "SHARES"], ["CHONG SIW CHIN", "650,001"]]
+
+if __name__ == "__main__":
+    test_format_decided_per_response()
+    test_mixed_formats_fall_back_per_line()
+    test_group_rows()
+    print("Test Passed!")
@@ -0,0 +1,38 @@
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import ocr_pool
+from ocr_pool import WorkerPool
+
+def _skip_imports(workers=1):
+    # The real initializer loads ocr_service and the OCR models
+    pass
+
+def test_dead_worker_fails_its_request_and_the_pool_recovers(monkeypatch):
+    monkeypatch.setattr(ocr_pool, "_init_worker", _skip_imports)
+    pool = WorkerPool(workers=1, max_queue=4)
+    pool.start()
+    first_pids = pool.worker_pids
+    try:
+        async def run():
+            # The worker exits mid-job, like an OOM kill
+            crashed = await pool._submit(os._exit, 1)
+            return crashed, await pool._submit(dict)
+
+        crashed, after = asyncio.run(run())
+        assert "crashed" in crashed["error"]
+        assert after == {}
+        stats = pool.stats()
+        assert (stats["restarts"], stats["failed"], stats["completed"]) == (1, 1, 1)
+        assert pool.worker_pids and pool.worker_pids != first_pids
+    finally:
+        pool.shutdown()
+
+if __name__ == "__main__":
+    import pytest
+    with pytest.MonkeyPatch.context() as patch:
+        test_dead_worker_fails_its_request_and_the_pool_recovers(patch)
+    print("Test Passed!")
@@ -0,0 +1,84 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import cv2
+import numpy as np
+import ocr_preprocess
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert')
+SAMPLE_JPG = os.path.join(SAMPLE_DIR, 'sample-cert-form-9-SDN-BHD.jpg')
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def _decode(data):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+def test_small_straight_image_is_uploaded_untouched():
+    data = _read(SAMPLE_JPG)
+    out, info = ocr_preprocess.prepare_image(data)
+    assert out is data and info["kept"]
+
+def test_large_tilted_photo_is_bounded_and_straightened():
+    image = cv2.resize(cv2.imread(SAMPLE_JPG), (2400, 3400), interpolation=cv2.INTER_CUBIC)
+    matrix = cv2.getRotationMatrix2D((1200, 1700), 3.0, 1.0)
+    image = cv2.warpAffine(image, matrix, (2400, 3400), borderValue=(255, 255, 255))
+    photo = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes()
+
+    config = dict(ocr_preprocess.settings(), max_bytes=150 * 1024)
+    out, info = ocr_preprocess.prepare_image(photo, config)
+    assert not info["kept"]
+    assert info["skew"] == -3.0
+    assert len(out) <= 150 * 1024
+    result = _decode(out)
+    assert result.ndim == 2 and max(result.shape) <= ocr_preprocess.MAX_SIDE
+
+def test_scanned_pdf_pages_keep_their_jpeg(tmp_path):
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument.new()
+    image = pdfium.PdfImage.new(pdf)
+    image.load_jpeg(SAMPLE_JPG, inline=False)
+    image.set_matrix(pdfium.PdfMatrix().scale(595, 842))
+    page = pdf.new_page(595, 842)
+    page.insert_obj(image)
+    page.gen_content()
+    # Second page: text only, so it has to be rendered
+    pdf.import_pages(pdfium.PdfDocument(os.path.join(SAMPLE_DIR, '1144519-K_CP_19112025_EN.pdf')), [0])
+    path = str(tmp_path / "scan.pdf")
+    pdf.save(path)
+
+    uploads = list(ocr_preprocess.prepare_uploads(path))
+    assert [name for _, name in uploads] == ["scan-p1.jpg", "scan-p2.jpg"]
+    assert uploads[0][0] == _read(SAMPLE_JPG)
+    rendered = _decode(uploads[1][0])
+    assert rendered.ndim == 2 and max(rendered.shape) <= ocr_preprocess.MAX_SIDE
+
+    only_second = list(ocr_preprocess.prepare_uploads(path, pages=[1]))
+    assert [name for _, name in only_second] == ["scan-p2.jpg"]
+
+def test_pages_upload_in_parallel_and_merge_in_order():
+    import httpx
+    import time
+    from ocr_client import RemoteOcrClient, register_client, remote_ocr_many_sync, merge_responses
+    from ocr_stub_server import create_app, DEFAULT_LINES
+
+    url = "http://preprocess-stub"
+    register_client(RemoteOcrClient(url, transport=httpx.ASGITransport(app=create_app(latency=0.2)),
+                                    max_retries=0, max_concurrency=4))
+    start = time.perf_counter()
+    responses = remote_ocr_many_sync(url, None, ((b"page-%d" % i, f"p{i}.jpg") for i in range(3)))
+    assert time.perf_counter() - start < 0.5
+    merged = merge_responses(responses)
+    assert len(merged["result"]) == 3 and merged["result"][0] == DEFAULT_LINES
+
+if __name__ == "__main__":
+    test_small_straight_image_is_uploaded_untouched()
+    test_large_tilted_photo_is_bounded_and_straightened()
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as tmp:
+        test_scanned_pdf_pages_keep_their_jpeg(pathlib.Path(tmp))
+    test_pages_upload_in_parallel_and_merge_in_order()
+    print("Test Passed!")
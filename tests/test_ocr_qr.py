@@ -0,0 +1,97 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import cv2
+import numpy as np
+import ocr_qr
+from extractor.qr_payload import parse_qr_payload, qr_extraction
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert')
+
+PAYLOAD = '{"type": "Form 9", "companyName": "CONTOH TEKNOLOGI SDN. BHD.", "regNo": "202301012345 (1503456-K)", "incorporationDate": "2023-04-05"}'
+
+def _qr_certificate(path, payload):
+    # QR in the bottom-right corner of the Form 9 sample, quiet zone included
+    image = cv2.imread(os.path.join(SAMPLE_DIR, 'sample-cert-form-9-SDN-BHD.jpg'))
+    code = cv2.QRCodeEncoder.create().encode(payload)
+    code = cv2.resize(code, None, fx=4, fy=4, interpolation=cv2.INTER_NEAREST)
+    code = cv2.copyMakeBorder(code, 16, 16, 16, 16, cv2.BORDER_CONSTANT, value=255)
+    h, w = code.shape
+    image[-h - 20:-20, -w - 20:-20] = cv2.cvtColor(code, cv2.COLOR_GRAY2BGR)
+    cv2.imwrite(path, image)
+
+def test_payload_layouts_map_to_the_same_fields():
+    expected = {"doc_type": "FORM_9", "name": "CONTOH TEKNOLOGI SDN. BHD.", "registration_number": "202301012345",
+                "old_registration_number": "1503456-K", "registration_date": "2023-04-05"}
+    url = ("https://www.ssm.com.my/verify?type=form9&name=CONTOH+TEKNOLOGI+SDN.+BHD."
+           "&registrationNo=202301012345&companyNo=1503456-K&registrationDate=05-04-2023")
+    lines = ("Form: 9\nNama Entiti: CONTOH TEKNOLOGI SDN. BHD.\nNo Pendaftaran: 202301012345 (1503456-K)\n"
+             "Tarikh Pendaftaran: 2023-04-05")
+    for payload in (PAYLOAD, url, lines):
+        assert parse_qr_payload(payload) == expected, payload
+
+    # Entity type read from the number; without a name or date OCR still runs
+    assert qr_extraction("202301012345") == ("FORM_9", None)
+
+def test_entity_type_alone_does_not_take_the_fast_path():
+    # Section 58, Form 24/49 and company profiles carry the same QR fields as
+    # the Form 9; a company number or "type: company" doesn't name the document
+    untyped = PAYLOAD.replace('"type": "Form 9", ', "")
+    assert parse_qr_payload(untyped)["entity_type"] == "FORM_9"
+    assert "doc_type" not in parse_qr_payload(untyped)
+    assert qr_extraction(untyped) == ("FORM_9", None)
+    assert qr_extraction(PAYLOAD.replace("Form 9", "company")) == ("FORM_9", None)
+    assert qr_extraction(PAYLOAD.replace("Form 9", "Section 58"))[1] is None
+
+def test_complete_payload_is_shaped_like_the_extractor():
+    doc_type, fields = qr_extraction(PAYLOAD.replace("Form 9", "Form D"))
+    assert doc_type == "FORM_D"
+    assert fields["entity_name"] == "CONTOH TEKNOLOGI SDN. BHD."
+    assert fields["registration_number_new"] == "202301012345"
+    assert fields["incorporation_or_registration_date"] == "2023-04-05"
+
+def test_decode_and_fast_path_skip_remote_ocr(tmp_path, monkeypatch):
+    import httpx
+    import ocr_service
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app
+
+    path = str(tmp_path / "cert.jpg")
+    _qr_certificate(path, PAYLOAD)
+    assert ocr_qr.decode_document(path) == PAYLOAD
+
+    app = create_app()
+    url = "http://qr-stub"
+    register_client(RemoteOcrClient(url, transport=httpx.ASGITransport(app=app), max_retries=0))
+    monkeypatch.setenv("HF_API_URL", url)
+    # build_result would store the extraction in the real cache
+    monkeypatch.setattr(ocr_service, "get_cache", lambda: None)
+    stage1 = ocr_service.run_ocr(path, ocr_service.no_trace)
+    assert app.state.requests == 0
+    assert stage1["source"] == "qr"
+
+    result = ocr_service.build_result(stage1, ocr_service.no_trace, [], 0.0)
+    assert result["fast_path"] == "qr"
+    data = result["extracted_data"]
+    assert data["docType"] == "FORM_9" and data["registrationNumber"] == "202301012345"
+    assert data["companyName"] == "CONTOH TEKNOLOGI SDN. BHD." and data["qrPayload"] == PAYLOAD
+    # `text` reads like the certificate, so verify-ssm-action's BRN match still works
+    assert result["text"] == "CONTOH TEKNOLOGI SDN. BHD.\n202301012345 (1503456-K)\n2023-04-05"
+    assert data["rawText"] == result["text"]
+
+    # The same QR without a document type (a Section 58 notice, say) is OCR'd
+    _qr_certificate(path, PAYLOAD.replace('"type": "Form 9", ', ""))
+    stage1 = ocr_service.run_ocr(path, ocr_service.no_trace)
+    assert app.state.requests == 1
+    assert stage1["source"] == "remote" and "qr_fields" not in stage1
+
+if __name__ == "__main__":
+    test_payload_layouts_map_to_the_same_fields()
+    test_entity_type_alone_does_not_take_the_fast_path()
+    test_complete_payload_is_shaped_like_the_extractor()
+    import tempfile, pathlib, pytest
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_decode_and_fast_path_skip_remote_ocr(pathlib.Path(tmp), patch)
+    print("Test Passed!")
@@ -0,0 +1,36 @@
+import sys
+import os
+import json
+import subprocess
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+OCR_SERVICE = os.path.join(SCRIPTS_DIR, "ocr_service.py")
+SAMPLE_PDF = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert', '1144519-K_CP_19112025_EN.pdf'))
+
+def _run(*args):
+    # Native PDF text never reaches the remote URL; it only has to be set
+    env = dict(os.environ, OCR_CACHE="off", HF_API_URL="http://127.0.0.1:9")
+    proc = subprocess.run([sys.executable, OCR_SERVICE, SAMPLE_PDF, *args], cwd=SCRIPTS_DIR,
+                          capture_output=True, text=True, env=env)
+    assert proc.returncode == 0, proc.stderr
+    return proc.stdout
+
+def test_stream_emits_progress_then_result():
+    frames = [json.loads(line) for line in _run("--stream").splitlines()]
+    stages = [f["stage"] for f in frames if f["event"] == "progress"]
+    assert stages == ["native_extracted", "classified", "extracted"]
+    assert frames[-1]["event"] == "result"
+    result = frames[-1]["result"]
+    assert result["success"] and result["extracted_data"]["docType"] == "CORPORATE_INFO"
+    assert "raw_result" not in result and "rawText" not in result["extracted_data"]
+
+def test_default_output_is_one_compact_line():
+    out = _run()
+    assert out.count("\n") == 1
+    assert "raw_result" not in json.loads(out)
+    assert "raw_result" in json.loads(_run("--raw"))
+
+if __name__ == "__main__":
+    test_stream_emits_progress_then_result()
+    test_default_output_is_one_compact_line()
+    print("Test Passed!")
@@ -0,0 +1,116 @@
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import pdf_text
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), '..', 'sample', 'SSM Cert', '1144519-K_CP_19112025_EN.pdf')
+
+def test_parallel_pages_match_serial_order():
+    serial = pdf_text.extract_pages(SAMPLE_PDF, workers=1)
+    parallel = pdf_text.extract_pages(SAMPLE_PDF, workers=4)
+    assert len(serial) == pdf_text.page_count(SAMPLE_PDF)
+    assert parallel == serial
+    assert pdf_text.join_pages(parallel).startswith(serial[0])
+
+def test_join_pages_skips_empty_pages():
+    assert pdf_text.join_pages(["a", "", "b"]) == "a\nb\n"
+
+def test_auto_backend_keeps_layout_for_corporate_info():
+    pages, backend, _ = pdf_text.extract_text(SAMPLE_PDF, backend="auto", workers=1)
+    assert backend == "pdfplumber"
+    assert pages == pdf_text.extract_pages(SAMPLE_PDF, workers=1)
+
+def test_pdfium_backend_reads_same_pages():
+    pages, backend, _ = pdf_text.extract_text(SAMPLE_PDF, backend="pdfium")
+    assert backend == "pdfium"
+    assert len(pages) == pdf_text.page_count(SAMPLE_PDF)
+    assert "CORPORATE INFORMATION" in pages[0]
+    assert "\r" not in pdf_text.join_pages(pages)
+
+def test_early_exit_stops_at_end_of_report(tmp_path):
+    import pypdfium2 as pdfium
+    src = pdfium.PdfDocument(SAMPLE_PDF)
+    bundle = pdfium.PdfDocument.new()
+    bundle.import_pages(src)
+    bundle.import_pages(src)
+    bundle_path = str(tmp_path / "bundle.pdf")
+    bundle.save(bundle_path)
+
+    pages, _, n_pages = pdf_text.extract_text(bundle_path, backend="pdfium", early_exit=True)
+    assert n_pages == 2 * len(src)
+    assert len(pages) == len(src)
+    assert "END OF REPORT" in pages[-1].upper()
+    full, _, _ = pdf_text.extract_text(bundle_path, backend="pdfium", early_exit=False)
+    assert len(full) == n_pages
+
+def _mixed_pdf(path):
+    # Scanned certificate as page 1 (image only), then the text profile
+    import pypdfium2 as pdfium
+    src = pdfium.PdfDocument(SAMPLE_PDF)
+    pdf = pdfium.PdfDocument.new()
+    image = pdfium.PdfImage.new(pdf)
+    image.load_jpeg(os.path.join(os.path.dirname(SAMPLE_PDF), 'sample-cert-form-9-SDN-BHD.jpg'), inline=False)
+    image.set_matrix(pdfium.PdfMatrix().scale(595, 842))
+    page = pdf.new_page(595, 842)
+    page.insert_obj(image)
+    page.gen_content()
+    pdf.import_pages(src)
+    pdf.save(path)
+    return len(src)
+
+def test_triage_splits_scanned_and_text_pages(tmp_path):
+    path = str(tmp_path / "mixed.pdf")
+    n_text = _mixed_pdf(path)
+    assert pdf_text.triage_pages(path) == ["image"] + ["text"] * n_text
+    assert pdf_text._triage_pdfplumber(path, pdf_text.TRIAGE_MIN_CHARS) == pdf_text.triage_pages(path)
+    assert pdf_text.triage_pages(SAMPLE_PDF, min_chars=10 ** 6) == ["image"] * n_text
+
+    subset = tmp_path / "cover.pdf"
+    subset.write_bytes(pdf_text.subset_pdf(path, [0]))
+    assert pdf_text.triage_pages(str(subset)) == ["image"]
+
+def test_mixed_pdf_uploads_only_image_pages(tmp_path, monkeypatch):
+    import httpx
+    import ocr_service
+    from ocr_client import RemoteOcrClient, register_client
+    from ocr_stub_server import create_app, DEFAULT_LINES
+
+    path = str(tmp_path / "mixed.pdf")
+    n_text = _mixed_pdf(path)
+    app = create_app()
+    uploads = []
+
+    class Recording(httpx.ASGITransport):
+        async def handle_async_request(self, request):
+            uploads.append(await request.aread())
+            return await super().handle_async_request(request)
+
+    url = "http://triage-stub"
+    register_client(RemoteOcrClient(url, transport=Recording(app=app), max_retries=0))
+    monkeypatch.setenv("HF_API_URL", url)
+    monkeypatch.setenv("OCR_ENGINE", "remote")
+    monkeypatch.setattr(ocr_service, "get_cache", lambda: None)
+    stage1 = ocr_service.run_ocr(path, ocr_service.no_trace)
+
+    assert len(uploads) == 1 and len(uploads[0]) < os.path.getsize(path) / 2
+    assert stage1["source"] == "mixed"
+    assert stage1["page_sources"] == ["ocr"] + ["native"] * n_text
+    assert stage1["page_sizes"][0] == len(DEFAULT_LINES)
+    assert stage1["lines"][0]["text"] == DEFAULT_LINES[0][0]
+    assert "CORPORATE INFORMATION" in stage1["lines"][len(DEFAULT_LINES)]["text"]
+    assert "ocr_pages" not in stage1
+
+if __name__ == "__main__":
+    test_parallel_pages_match_serial_order()
+    test_join_pages_skips_empty_pages()
+    test_auto_backend_keeps_layout_for_corporate_info()
+    test_pdfium_backend_reads_same_pages()
+    import tempfile, pathlib, pytest
+    with tempfile.TemporaryDirectory() as tmp:
+        test_early_exit_stops_at_end_of_report(pathlib.Path(tmp))
+        test_triage_splits_scanned_and_text_pages(pathlib.Path(tmp))
+        with pytest.MonkeyPatch.context() as patch:
+            test_mixed_pdf_uploads_only_image_pages(pathlib.Path(tmp), patch)
+    print("Test Passed!")